@@ -0,0 +1,123 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the time of many small reads made with the indexer
+syntax at each time step, comparing blocking reads, i.e. one collective call
+per indexing ``var[...]``, with the same reads made by the indexer
+``var.lazy[...]`` in File.batch_reads, in which they are posted as nonblocking
+requests and completed by a single call to ncmpi_wait_all per time step.
+
+The file contains NUM_VARS record variables of shape (time, nprocs, X). At
+each time step, each process reads its own row of every variable, in pieces
+of length P. Option -v sets the number of variables, option -l the length of
+dimension X, option -p the length of the pieces and option -n the number of
+time steps. Timings reported are the maximum among all processes, in seconds
+per time step.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 batch_reads.py -v 50 -n 10 /tmp/batch_reads.nc
+  batch_reads.py: number of processes = 4
+  number of variables = 50, length of X = 1024, length of pieces = 128, number of time steps = 10
+  method               read (sec)
+  blocking reads              ...
+  batched reads               ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def benchmark(filename, nvars, xlen, plen, nsteps):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_t = f.def_dim('time', -1)
+    dim_y = f.def_dim('Y', nprocs)
+    dim_x = f.def_dim('X', xlen)
+    variables = [f.def_var('var%d' % i, pnetcdf.NC_DOUBLE, (dim_t, dim_y, dim_x)) for i in range(nvars)]
+    f.enddef()
+
+    bufs = [np.full(xlen, i + rank, dtype='f8') for i in range(nvars)]
+    for step in range(nsteps):
+        f.put_vars_all({v: ([step, rank, 0], [1, 1, xlen], buf) for v, buf in zip(variables, bufs)})
+
+    def read(step):
+        return [v[step, rank, x:x+plen] for v in variables for x in range(0, xlen, plen)]
+
+    def batched_read(step):
+        with f.batch_reads():
+            lazies = [v.lazy[step, rank, x:x+plen] for v in variables for x in range(0, xlen, plen)]
+        return [lazy.value for lazy in lazies]
+
+    results = []
+    for name, func in [("blocking reads", read),
+                       ("batched reads", batched_read)]:
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for step in range(nsteps):
+            func(step)
+        results.append((name, max_time(MPI.Wtime() - t0) / nsteps))
+    f.close()
+    return results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-v nvars] [-l len] [-p len] [-n nsteps] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-v nvars] number of variables (default 50)\n"
+            "       [-l len] length of dimension X (default 1024)\n"
+            "       [-p len] length of the pieces read (default 128)\n"
+            "       [-n nsteps] number of time steps (default 10)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-v", help="Number of variables", type=int, default = 50)
+    parser.add_argument("-l", help="Length of dimension X", type=int, default = 1024)
+    parser.add_argument("-p", help="Length of the pieces read", type=int, default = 128)
+    parser.add_argument("-n", help="Number of time steps", type=int, default = 10)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, args.v, args.l, args.p, args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("number of variables = {}, length of X = {}, length of pieces = {}, number of time steps = {}".format(args.v, args.l, args.p, args.n))
+        print("%-18s %12s" % ("method", "read (sec)"))
+        for name, t_read in results:
+            print("%-18s %12.4f" % (name, t_read))
+
+    MPI.Finalize()
@@ -0,0 +1,163 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the time and memory of writing and reading arrays of
+fixed-length strings to and from an NC_CHAR variable with attribute
+_Encoding, which the indexer syntax converts from and to numpy string arrays
+by stringtochar and chartostring. It is compared with conversions creating a
+Python string per character or per string, e.g. np.array(tuple(...)), as done
+by earlier versions of these functions.
+
+Each process writes and reads its own block of rows of a 2D variable of shape
+(nprocs * NSTRINGS, NCHAR) in collective data mode, i.e. one string of NCHAR
+characters per row. Option -l sets the number of strings per process in Mi
+(2^20 strings), option -c the number of characters per string and option -n
+the number of repeats. The strings are ASCII, plus a non-ASCII character per
+string with option -u, which the conversion then decodes and encodes as
+UTF-8. Timings reported are the maximum among all processes, in seconds per
+repeat. The peak resident memory is measured by the process of rank 0 after
+each method, with the methods run in the order listed.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 char_strings.py -l 4 -c 16 /tmp/char_strings.nc
+  char_strings.py: number of processes = 4
+  strings per process = 4 Mi, characters per string = 16, non-ASCII = False
+  method                  write (sec)  read (sec)  peak RSS (MiB)
+  vectorized                      ...         ...             ...
+  per-character tuples            ...         ...             ...
+"""
+
+import sys, os, argparse, resource
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def peak_rss():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def tuple_stringtochar(src, nchar, encoding):
+    # conversion creating a Python string per character
+    data = b''.join(s.encode(encoding).ljust(nchar, b'\0') for s in src.ravel().tolist())
+    out = np.array(tuple(data[i:i+1] for i in range(len(data))), 'S1')
+    return out.reshape(src.shape + (nchar,))
+
+def tuple_chartostring(src, encoding):
+    # conversion creating a Python string per string
+    data = src.tobytes()
+    slen = src.shape[-1]
+    out = np.array([data[i:i+slen].decode(encoding) for i in range(0, len(data), slen)], 'U' + repr(slen))
+    return out.reshape(src.shape[:-1])
+
+def benchmark(filename, nstrings, nchar, nonascii, nrepeats):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_y = f.def_dim('Y', nstrings * nprocs)
+    dim_c = f.def_dim('NCHAR', nchar)
+    v = f.def_var('names', pnetcdf.NC_CHAR, (dim_y, dim_c))
+    v._Encoding = 'utf-8'
+    raw = f.def_var('raw', pnetcdf.NC_CHAR, (dim_y, dim_c))
+    f.enddef()
+
+    y0 = nstrings * rank
+    # strings of nchar bytes, numbered
+    width = nchar - 2 if nonascii else nchar
+    names = np.char.zfill(np.arange(y0, y0 + nstrings).astype('U'), width)
+    names = np.char.ljust(names, width)
+    if nonascii:
+        # a two-byte character in UTF-8
+        names = np.char.add('é', names)
+    names = names.astype('U%d' % nchar)
+
+    def vectorized_write():
+        v[y0:y0+nstrings] = names
+
+    def vectorized_read():
+        return v[y0:y0+nstrings]
+
+    def tuple_write():
+        raw[y0:y0+nstrings] = tuple_stringtochar(names, nchar, 'utf-8')
+
+    def tuple_read():
+        return tuple_chartostring(raw[y0:y0+nstrings], 'utf-8')
+
+    results = []
+    for name, write, read in [("vectorized", vectorized_write, vectorized_read),
+                              ("per-character tuples", tuple_write, tuple_read)]:
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for i in range(nrepeats):
+            write()
+        t_write = max_time(MPI.Wtime() - t0) / nrepeats
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for i in range(nrepeats):
+            out = read()
+        t_read = max_time(MPI.Wtime() - t0) / nrepeats
+        if not np.array_equal(out, names):
+            raise ValueError("%s: strings read differ from those written" % name)
+        results.append((name, t_write, t_read, peak_rss()))
+    f.close()
+    return results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-n nrepeats] [-l len] [-c nchar] [-u] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-n nrepeats] number of repeats (default 3)\n"
+            "       [-l len] number of strings per process in Mi (default 1)\n"
+            "       [-c nchar] number of characters per string (default 16)\n"
+            "       [-u] add a non-ASCII character to each string\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-n", help="Number of repeats", type=int, default = 3)
+    parser.add_argument("-l", help="Number of strings per process in Mi", type=float, default = 1)
+    parser.add_argument("-c", help="Number of characters per string", type=int, default = 16)
+    parser.add_argument("-u", help="Add a non-ASCII character to each string", action="store_true")
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, max(1, int(args.l * 1048576)), args.c, args.u, args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("strings per process = %g Mi, characters per string = %d, non-ASCII = %s" % (args.l, args.c, args.u))
+        print("%-22s %12s %11s %15s" % ("method", "write (sec)", "read (sec)", "peak RSS (MiB)"))
+        for name, t_write, t_read, rss in results:
+            print("%-22s %12.4f %11.4f %15.1f" % (name, t_write, t_read, rss))
+
+    MPI.Finalize()
@@ -0,0 +1,142 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the per-call latency of reading and writing small
+hyperslabs of a variable using the indexer syntax (numpy-style slicing).
+Indices made of integers, slices and Ellipsis (basic indexing) take a fast
+path calling ncmpi_get_vara/vars and ncmpi_put_vara/vars directly. The same
+selections expressed with one-element lists, e.g. v[[t], [y], :], take the
+general path converting the index with _StartCountStride, and are timed for
+comparison.
+
+Each process accesses its own rows of a 3D variable of shape
+(time, nprocs * 4, X) in collective data mode. Option -l sets the length of
+dimension X and option -n the number of calls timed for each pattern.
+Timings reported are the maximum among all processes, in microseconds per
+call.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 indexing_latency.py -n 10000 /tmp/indexing_latency.nc
+  indexing_latency.py: number of processes = 4
+  pattern             fast read (us) general read (us) fast write (us) general write (us)
+  v[t, y, :]                     ...               ...             ...                ...
+  v[t, y0:y1, :]                 ...               ...             ...                ...
+  v[t, y, ::2]                   ...               ...             ...                ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+NY = 4  # number of rows per process
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def time_calls(func, ncalls):
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    for i in range(ncalls):
+        func(i)
+    return max_time(MPI.Wtime() - t0) / ncalls * 1.0e6
+
+def benchmark(filename, xlen, ncalls):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_t = f.def_dim('time', -1)
+    dim_y = f.def_dim('Y', NY * nprocs)
+    dim_x = f.def_dim('X', xlen)
+    v = f.def_var('var', pnetcdf.NC_DOUBLE, (dim_t, dim_y, dim_x))
+    f.enddef()
+
+    y0 = NY * rank
+    row = np.arange(xlen, dtype='f8')
+    rows = np.tile(row, (NY, 1))
+    half = np.ascontiguousarray(row[::2])
+    v[0, y0:y0+NY, :] = rows
+
+    # (pattern, fast read, general read, fast write, general write)
+    patterns = [
+        ("v[t, y, :]",
+         lambda i: v[0, y0 + i % NY, :],
+         lambda i: v[[0], [y0 + i % NY], :],
+         lambda i: v.__setitem__((0, y0 + i % NY, slice(None)), row),
+         lambda i: v.__setitem__(([0], [y0 + i % NY], slice(None)), row.reshape(1, 1, xlen))),
+        ("v[t, y0:y1, :]",
+         lambda i: v[0, y0:y0+NY, :],
+         lambda i: v[[0], y0:y0+NY, :],
+         lambda i: v.__setitem__((0, slice(y0, y0+NY), slice(None)), rows),
+         lambda i: v.__setitem__(([0], slice(y0, y0+NY), slice(None)), rows.reshape(1, NY, xlen))),
+        ("v[t, y, ::2]",
+         lambda i: v[0, y0 + i % NY, ::2],
+         lambda i: v[[0], [y0 + i % NY], ::2],
+         lambda i: v.__setitem__((0, y0 + i % NY, slice(None, None, 2)), half),
+         lambda i: v.__setitem__(([0], [y0 + i % NY], slice(None, None, 2)), half.reshape(1, 1, -1))),
+    ]
+
+    results = []
+    for name, fast_get, gen_get, fast_put, gen_put in patterns:
+        results.append((name,
+                        time_calls(fast_get, ncalls),
+                        time_calls(gen_get, ncalls),
+                        time_calls(fast_put, ncalls),
+                        time_calls(gen_put, ncalls)))
+    f.close()
+    return results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-n ncalls] [-l len] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-n ncalls] number of calls timed for each pattern (default 10000)\n"
+            "       [-l len] length of dimension X (default 16)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-n", help="Number of calls timed for each pattern", type=int, default = 10000)
+    parser.add_argument("-l", help="Length of dimension X", type=int, default = 16)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, args.l, args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("%-18s %15s %17s %15s %18s" % ("pattern", "fast read (us)", "general read (us)", \
+              "fast write (us)", "general write (us)"))
+        for name, t_fget, t_gget, t_fput, t_gput in results:
+            print("%-18s %15.1f %17.1f %15.1f %18.1f" % (name, t_fget, t_gget, t_fput, t_gput))
+
+    MPI.Finalize()
+
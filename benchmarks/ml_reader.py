@@ -0,0 +1,162 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the throughput of reading shuffled minibatches of
+training samples, as a data loader does in each epoch. The file contains
+NUM_SAMPLES samples of MNIST-like data, i.e. a 28 x 28 NC_UBYTE image and an
+NC_UBYTE label per sample. Each process reads its share of a random
+permutation of the samples in minibatches, by the per-sample class `dataset`
+of examples/MNIST/pnetcdf_io.py, stacking the samples of a batch, by
+pnetcdf.ml.BatchDataset.__getitems__, which reads a batch with one request
+per variable, and by BatchDataset.iter_batches, which also prefetches the
+next batch. The prefetched batches are read by the I/O thread of an
+IOExecutor when MPI provides thread support level MPI_THREAD_SERIALIZED or
+higher, and that method is skipped otherwise.
+
+Option -n sets the number of samples and option -b the number of samples per
+batch. For each method, the number of samples read per second by all
+processes is reported, computed from the maximum time among all processes.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 ml_reader.py -n 60000 -b 64 /tmp/ml_reader.nc
+  ml_reader.py: number of processes = 4
+  number of samples = 60000, batch size = 64
+  method                                 time (sec)    samples/sec
+  dataset, per sample                           ...            ...
+  BatchDataset.__getitems__                     ...            ...
+  BatchDataset.iter_batches                     ...            ...
+  BatchDataset.iter_batches + IOExecutor        ...            ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+from pnetcdf.ml import BatchDataset
+
+# the per-sample dataset class of the MNIST example
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples", "MNIST"))
+from pnetcdf_io import dataset
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def create(filename, nsamples):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_n = f.def_dim('num', nsamples)
+    dim_y = f.def_dim('height', 28)
+    dim_x = f.def_dim('width', 28)
+    images = f.def_var('samples', pnetcdf.NC_UBYTE, (dim_n, dim_y, dim_x))
+    labels = f.def_var('labels', pnetcdf.NC_UBYTE, (dim_n,))
+    f.enddef()
+    # each process writes a contiguous range of samples
+    first = nsamples * rank // nprocs
+    count = nsamples * (rank + 1) // nprocs - first
+    rng = np.random.default_rng(rank)
+    images.put_var_all(rng.integers(0, 256, (count, 28, 28), dtype=np.uint8),
+                       start=[first, 0, 0], count=[count, 28, 28])
+    labels.put_var_all(rng.integers(0, 10, count, dtype=np.uint8), start=[first], count=[count])
+    f.close()
+
+def benchmark(filename, nsamples, batch_size):
+    create(filename, nsamples)
+
+    # the shuffled samples read by this process in minibatches
+    order = np.random.default_rng(0).permutation(nsamples)[rank::nprocs]
+    batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+    def per_sample():
+        ds = dataset(filename, 'samples', 'labels', comm=comm)
+        for batch in batches:
+            samples = [ds[i] for i in batch]
+            images = np.stack([s[0] for s in samples])
+            labels = np.stack([s[1] for s in samples])
+        ds.close()
+
+    def getitems():
+        with BatchDataset(filename, ['samples', 'labels'], comm=comm) as ds:
+            for batch in batches:
+                samples = ds.__getitems__(batch)
+                images = np.stack([s[0] for s in samples])
+                labels = np.stack([s[1] for s in samples])
+
+    def iter_batches(executor=None):
+        with BatchDataset(filename, ['samples', 'labels'], comm=comm, executor=executor) as ds:
+            for images, labels in ds.iter_batches(order, batch_size):
+                pass
+
+    methods = [("dataset, per sample", per_sample),
+               ("BatchDataset.__getitems__", getitems),
+               ("BatchDataset.iter_batches", iter_batches)]
+    executor = None
+    if MPI.Query_thread() >= MPI.THREAD_SERIALIZED:
+        executor = pnetcdf.IOExecutor()
+        methods.append(("BatchDataset.iter_batches + IOExecutor",
+                        lambda: iter_batches(executor)))
+
+    results = []
+    for name, func in methods:
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        func()
+        t = max_time(MPI.Wtime() - t0)
+        results.append((name, t, nsamples / t))
+    if executor is not None:
+        executor.shutdown()
+    return results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-n num] [-b size] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-n num] number of samples (default 60000)\n"
+            "       [-b size] number of samples per batch (default 64)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-n", help="Number of samples", type=int, default = 60000)
+    parser.add_argument("-b", help="Number of samples per batch", type=int, default = 64)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, args.n, args.b)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("number of samples = {}, batch size = {}".format(args.n, args.b))
+        print("%-38s %11s %14s" % ("method", "time (sec)", "samples/sec"))
+        for name, t, rate in results:
+            print("%-38s %11.4f %14.1f" % (name, t, rate))
+
+    MPI.Finalize()
@@ -0,0 +1,131 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the time of writing and reading a subarray of many
+variables at each time step, comparing one collective call per variable
+(Variable.put_var_all and Variable.get_var_all) with a single collective call
+for all variables (File.put_vars_all and File.get_vars_all, which call
+ncmpi_mput_vara_all and ncmpi_mget_vara_all).
+
+The file contains NUM_VARS record variables of shape (time, nprocs, X). At
+each time step, each process writes and reads its own row of every variable.
+Option -v sets the number of variables, option -l the length of dimension X
+and option -n the number of time steps. Timings reported are the maximum among
+all processes, in seconds per time step.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 multi_var_io.py -v 200 -n 10 /tmp/multi_var_io.nc
+  multi_var_io.py: number of processes = 4
+  number of variables = 200, length of X = 1024, number of time steps = 10
+  method                         write (sec)  read (sec)
+  one call per variable                  ...         ...
+  one call for all variables             ...         ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def benchmark(filename, nvars, xlen, nsteps):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_t = f.def_dim('time', -1)
+    dim_y = f.def_dim('Y', nprocs)
+    dim_x = f.def_dim('X', xlen)
+    variables = [f.def_var('var%d' % i, pnetcdf.NC_DOUBLE, (dim_t, dim_y, dim_x)) for i in range(nvars)]
+    f.enddef()
+
+    bufs = [np.full((1, 1, xlen), i + rank, dtype='f8') for i in range(nvars)]
+    out = np.empty((1, 1, xlen), dtype='f8')
+
+    def per_var_write(step):
+        for v, buf in zip(variables, bufs):
+            v.put_var_all(buf, start = [step, rank, 0], count = [1, 1, xlen])
+
+    def per_var_read(step):
+        for v in variables:
+            v.get_var_all(out, start = [step, rank, 0], count = [1, 1, xlen])
+
+    def multi_var_write(step):
+        f.put_vars_all({v: ([step, rank, 0], [1, 1, xlen], buf) for v, buf in zip(variables, bufs)})
+
+    def multi_var_read(step):
+        f.get_vars_all({v: ([step, rank, 0], [1, 1, xlen]) for v in variables})
+
+    results = []
+    for name, write, read in [("one call per variable", per_var_write, per_var_read),
+                              ("one call for all variables", multi_var_write, multi_var_read)]:
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for step in range(nsteps):
+            write(step)
+        t_write = max_time(MPI.Wtime() - t0) / nsteps
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for step in range(nsteps):
+            read(step)
+        t_read = max_time(MPI.Wtime() - t0) / nsteps
+        results.append((name, t_write, t_read))
+    f.close()
+    return results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-v nvars] [-l len] [-n nsteps] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-v nvars] number of variables (default 200)\n"
+            "       [-l len] length of dimension X (default 1024)\n"
+            "       [-n nsteps] number of time steps (default 10)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-v", help="Number of variables", type=int, default = 200)
+    parser.add_argument("-l", help="Length of dimension X", type=int, default = 1024)
+    parser.add_argument("-n", help="Number of time steps", type=int, default = 10)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, args.v, args.l, args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("number of variables = {}, length of X = {}, number of time steps = {}".format(args.v, args.l, args.n))
+        print("%-30s %12s %11s" % ("method", "write (sec)", "read (sec)"))
+        for name, t_write, t_read in results:
+            print("%-30s %12.4f %11.4f" % (name, t_write, t_read))
+
+    MPI.Finalize()
@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the time of opening a netCDF file containing a large
+number of variables, the time of accessing a single variable after the file is
+opened, and the time of accessing all variables. Variable and Dimension
+instances of a File are created only when they are accessed, so the open time
+should grow slowly with the number of variables defined in the file.
+
+For each number of variables given by option -n, a file is created with that
+many 2D variables sharing 3 dimensions, and then opened for read only. Timings
+reported are the maximum among all processes.
+
+Example commands for MPI run and outputs from running this benchmark:
+
+  % mpiexec -n 4 python3 open_time.py -n 1000,10000,50000 /tmp/open_time.nc
+  open_time.py: number of processes = 4
+      nvars     open (sec)   1 var (sec)  all vars (sec)
+       1000            ...           ...             ...
+      10000            ...           ...             ...
+      50000            ...           ...             ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import pnetcdf
+
+def create_file(filename, nvars):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_t = f.def_dim('time', -1)
+    dim_y = f.def_dim('Y', 4)
+    dim_x = f.def_dim('X', 4)
+    for i in range(nvars):
+        dims = (dim_t, dim_x) if i % 2 else (dim_y, dim_x)
+        f.def_var(f'var{i}', pnetcdf.NC_FLOAT, dims)
+    f.enddef()
+    f.close()
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def benchmark(filename, nvars):
+    create_file(filename, nvars)
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    f = pnetcdf.File(filename=filename, mode='r', comm=comm, info=None)
+    t_open = max_time(MPI.Wtime() - t0)
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    v = f.variables[f'var{nvars // 2}']
+    shape = v.shape
+    t_one = max_time(MPI.Wtime() - t0)
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    for v in f.variables.values():
+        shape = v.shape
+    t_all = max_time(MPI.Wtime() - t0)
+
+    f.close()
+    return t_open, t_one, t_all
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-n nvars] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-n nvars] comma separated list of numbers of variables\n"
+            "                  (default 1000,10000,50000)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-n", help="Comma separated list of numbers of variables", \
+                         default = "1000,10000,50000")
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+    nvars_list = [int(n) for n in args.n.split(',')]
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("%11s %14s %13s %15s" % ("nvars", "open (sec)", "1 var (sec)", "all vars (sec)"))
+
+    try:
+        for nvars in nvars_list:
+            t_open, t_one, t_all = benchmark(filename, nvars)
+            if verbose and rank == 0:
+                print("%11d %14.4f %13.4f %15.4f" % (nvars, t_open, t_one, t_all))
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    MPI.Finalize()
+
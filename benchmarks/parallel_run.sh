@@ -0,0 +1,55 @@
+#!/bin/bash
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+# Exit immediately if a command exits with a non-zero status.
+set -e
+
+# Get the directory containing this script
+if test "x$NPROC" = x ; then
+    NPROC=4
+fi
+
+# get output folder from command line
+if test "$#" -gt 0 ; then
+   args=("$@")
+   OUT_DIR="${args[0]}"
+   # check if output folder exists
+   if ! test -d $OUT_DIR ; then
+      echo "Error: output folder \"$OUT_DIR\" does not exist."
+      exit 1
+   fi
+else
+   # output folder is not set at command line, use current folder
+   OUT_DIR="."
+fi
+
+for prog in $check_PROGRAMS; do
+   printf '%-60s' "Testing $prog"
+
+   # run each benchmark with a small problem size
+   case $prog in
+      open_time.py) OPTS="-n 100,1000" ;;
+      indexing_latency.py) OPTS="-n 100" ;;
+      type_conversion.py) OPTS="-n 1 -l 0.25" ;;
+      multi_var_io.py) OPTS="-v 20 -l 16 -n 2" ;;
+      deferred_writes.py) OPTS="-v 4 -l 16 -p 4 -n 2" ;;
+      batch_reads.py) OPTS="-v 4 -l 16 -p 4 -n 2" ;;
+      record_writer.py) OPTS="-v 4 -l 16 -c 0.01 -n 4" ;;
+      char_strings.py) OPTS="-n 1 -l 0.01 -c 8 -u" ;;
+      ml_reader.py) OPTS="-n 1000 -b 16" ;;
+      *)            OPTS="" ;;
+   esac
+
+   CMD="${TESTMPIRUN} -n $NPROC python $prog -q $OPTS $OUT_DIR/${prog%.*}.nc"
+   $CMD
+   status=$?
+   if [ $status -ne 0 ]; then
+      echo " ---- FAIL"
+   else
+      echo " ---- PASS"
+   fi
+done
+
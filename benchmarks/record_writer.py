@@ -0,0 +1,159 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the overlap of the computation of a time step with
+the output of the previous one achieved by RecordWriter. A simulation loop
+computes for a fixed time and then writes one record of every variable, by
+blocking calls to put_var_all, by RecordWriter, and by RecordWriter whose
+writes are carried out by the I/O thread of an IOExecutor. The latter
+requires MPI thread support level MPI_THREAD_SERIALIZED or higher, and is
+skipped otherwise.
+
+The file contains NUM_VARS record variables of shape (time, nprocs, X). At
+each time step, each process writes its own row of every variable. Option -v
+sets the number of variables, option -l the length of dimension X, option -c
+the computation time per time step in seconds and option -n the number of
+time steps. For each method, the time per step and the time the loop spends
+waiting for the writes to complete are reported, together with the overlap,
+i.e. the fraction of the I/O time of blocking writes hidden behind the
+computation. Timings reported are the maximum among all processes, in
+seconds per time step.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 record_writer.py -v 10 -l 1048576 -c 0.1 -n 10 /tmp/record_writer.nc
+  record_writer.py: number of processes = 4
+  number of variables = 10, length of X = 1048576, compute time = 0.1, number of time steps = 10
+  method                     step (sec)   wait (sec)  overlap
+  blocking put_var_all              ...          ...      ...
+  RecordWriter                      ...          ...      ...
+  RecordWriter + IOExecutor         ...          ...      ...
+"""
+
+import sys, os, argparse
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def compute(a, seconds):
+    # numpy work standing for the computation of a time step, which releases
+    # the GIL as a compiled simulation kernel would
+    t0 = MPI.Wtime()
+    while MPI.Wtime() - t0 < seconds:
+        np.sin(a, out=a)
+
+def benchmark(filename, nvars, xlen, tcompute, nsteps):
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_t = f.def_dim('time', -1)
+    dim_y = f.def_dim('Y', nprocs)
+    dim_x = f.def_dim('X', xlen)
+    variables = [f.def_var('var%d' % i, pnetcdf.NC_DOUBLE, (dim_t, dim_y, dim_x)) for i in range(nvars)]
+    f.enddef()
+
+    bufs = {v.name: np.full(xlen, i + rank, dtype='f8') for i, v in enumerate(variables)}
+    work = np.ones(65536)
+
+    def blocking(first):
+        wait = 0.0
+        for step in range(nsteps):
+            compute(work, tcompute)
+            t0 = MPI.Wtime()
+            for v in variables:
+                v.put_var_all(bufs[v.name], start=[first + step, rank, 0], count=[1, 1, xlen])
+            wait += MPI.Wtime() - t0
+        return wait
+
+    def record_writer(first, executor=None):
+        rows = {v: ([rank, 0], [1, xlen]) for v in variables}
+        w = pnetcdf.RecordWriter(f, rows, record=first, executor=executor)
+        for step in range(nsteps):
+            compute(work, tcompute)
+            w.write(bufs)
+        w.close()
+        return w.wait_time
+
+    methods = [("blocking put_var_all", blocking),
+               ("RecordWriter", record_writer)]
+    executor = None
+    if MPI.Query_thread() >= MPI.THREAD_SERIALIZED:
+        executor = pnetcdf.IOExecutor()
+        methods.append(("RecordWriter + IOExecutor",
+                        lambda first: record_writer(first, executor)))
+
+    results = []
+    for n, (name, func) in enumerate(methods):
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        wait = func(n * nsteps)
+        t_step = max_time(MPI.Wtime() - t0) / nsteps
+        results.append((name, t_step, max_time(wait) / nsteps))
+    if executor is not None:
+        executor.shutdown()
+    f.close()
+
+    # the I/O time of blocking writes, hidden by the overlap
+    t_io = results[0][1] - tcompute
+    return [(name, t_step, t_wait, (results[0][1] - t_step) / t_io if t_io > 0 else 0.0)
+            for name, t_step, t_wait in results]
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-v nvars] [-l len] [-c sec] [-n nsteps] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-v nvars] number of variables (default 10)\n"
+            "       [-l len] length of dimension X (default 1048576)\n"
+            "       [-c sec] computation time per time step in seconds (default 0.1)\n"
+            "       [-n nsteps] number of time steps (default 10)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-v", help="Number of variables", type=int, default = 10)
+    parser.add_argument("-l", help="Length of dimension X", type=int, default = 1048576)
+    parser.add_argument("-c", help="Computation time per time step in seconds", type=float, default = 0.1)
+    parser.add_argument("-n", help="Number of time steps", type=int, default = 10)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        results = benchmark(filename, args.v, args.l, args.c, args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("number of variables = {}, length of X = {}, compute time = {}, number of time steps = {}".format(args.v, args.l, args.c, args.n))
+        print("%-26s %11s %12s %8s" % ("method", "step (sec)", "wait (sec)", "overlap"))
+        for name, t_step, t_wait, overlap in results:
+            print("%-26s %11.4f %12.4f %7.0f%%" % (name, t_step, t_wait, 100 * overlap))
+
+    MPI.Finalize()
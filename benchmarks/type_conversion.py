@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+This benchmark measures the time and memory of writing and reading float64
+arrays to and from an NC_FLOAT variable. The conversion between float64 and
+float32 is carried out by PnetCDF during the transfer, which is compared with
+converting the arrays with numpy astype before writing and after reading.
+
+Each process writes and reads its own block of rows of a 2D variable of shape
+(nprocs * NY, NX) in collective data mode. Option -l sets the number of
+elements per process in MiB (2^20 elements) and option -n the number of
+repeats. Timings reported are the maximum among all processes, in seconds per
+repeat. The peak resident memory is measured by the process of rank 0 after
+each method, with the methods run in the order listed.
+
+Example command for MPI run and the format of its output:
+
+  % mpiexec -n 4 python3 type_conversion.py -l 64 /tmp/type_conversion.nc
+  type_conversion.py: number of processes = 4
+  elements per process = 64 Mi (float64 array 512 MiB)
+  method                  write (sec)  read (sec)  peak RSS (MiB)
+  PnetCDF conversion              ...         ...             ...
+  numpy astype                    ...         ...             ...
+"""
+
+import sys, os, argparse, resource
+from mpi4py import MPI
+import numpy as np
+import pnetcdf
+
+NX = 1024  # length of dimension X
+
+def max_time(t):
+    return comm.allreduce(t, op=MPI.MAX)
+
+def peak_rss():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def benchmark(filename, nelems, nrepeats):
+    ny = max(1, nelems // NX)
+    f = pnetcdf.File(filename=filename, mode='w', format="NC_64BIT_DATA", comm=comm, info=None)
+    dim_y = f.def_dim('Y', ny * nprocs)
+    dim_x = f.def_dim('X', NX)
+    v = f.def_var('var', pnetcdf.NC_FLOAT, (dim_y, dim_x))
+    f.enddef()
+
+    y0 = ny * rank
+    buf = np.random.default_rng(rank).random((ny, NX))
+    out = np.empty_like(buf)
+
+    def convert_write():
+        v[y0:y0+ny, :] = buf
+
+    def convert_read():
+        v.read_all(np.s_[y0:y0+ny, :], out = out)
+
+    def astype_write():
+        v[y0:y0+ny, :] = buf.astype(v.dtype)
+
+    def astype_read():
+        out[...] = v[y0:y0+ny, :].astype(out.dtype)
+
+    results = []
+    for name, write, read in [("PnetCDF conversion", convert_write, convert_read),
+                              ("numpy astype", astype_write, astype_read)]:
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for i in range(nrepeats):
+            write()
+        t_write = max_time(MPI.Wtime() - t0) / nrepeats
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        for i in range(nrepeats):
+            read()
+        t_read = max_time(MPI.Wtime() - t0) / nrepeats
+        results.append((name, t_write, t_read, peak_rss()))
+    f.close()
+    return ny * NX, results
+
+def parse_help():
+    help_flag = "-h" in sys.argv or "--help" in sys.argv
+    if help_flag and rank == 0:
+        help_text = (
+        "Usage: {} [-h] | [-q] [-n nrepeats] [-l len] [file_name]\n"
+            "       [-h] Print help\n"
+            "       [-q] Quiet mode (reports when fail)\n"
+            "       [-n nrepeats] number of repeats (default 3)\n"
+            "       [-l len] number of elements per process in Mi (default 16)\n"
+            "       [filename] (Optional) output netCDF file name\n"
+        ).format(sys.argv[0])
+        print(help_text)
+    return help_flag
+
+if __name__ == "__main__":
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    nprocs = comm.Get_size()
+
+    if parse_help():
+        MPI.Finalize()
+        sys.exit(1)
+
+    # get command-line arguments
+    args = None
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=str, help="(Optional) output netCDF file name",\
+                         default = "testfile.nc")
+    parser.add_argument("-q", help="Quiet mode (reports when fail)", action="store_true")
+    parser.add_argument("-n", help="Number of repeats", type=int, default = 3)
+    parser.add_argument("-l", help="Number of elements per process in Mi", type=float, default = 16)
+    args = parser.parse_args()
+
+    verbose = False if args.q else True
+
+    filename = args.dir
+
+    try:
+        nelems, results = benchmark(filename, int(args.l * 1048576), args.n)
+    except BaseException as err:
+        print("Error: type:", type(err), str(err))
+        raise
+
+    if verbose and rank == 0:
+        print("{}: number of processes = {}".format(os.path.basename(__file__), nprocs))
+        print("elements per process = %g Mi (float64 array %g MiB)" % (nelems / 1048576, nelems * 8 / 1048576))
+        print("%-22s %12s %11s %15s" % ("method", "write (sec)", "read (sec)", "peak RSS (MiB)"))
+        for name, t_write, t_read, rss in results:
+            print("%-22s %12.4f %11.4f %15.1f" % (name, t_write, t_read, rss))
+
+    MPI.Finalize()
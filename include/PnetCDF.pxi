@@ -116,6 +116,7 @@ cdef extern from "pnetcdf.h":
         NC_EBADID
         NC_EPERM
         NC_ENOTVAR
+        NC_ENOTATT
         NC_EGLOBAL
         NC_EINVAL
         NC_EBADNAME
@@ -223,6 +224,7 @@ cdef extern from "pnetcdf.h":
     int ncmpi_inq_varndims(int ncid, int varid, int *ndimsp) nogil
     int ncmpi_inq_varname(int ncid, int varid, char *name) nogil
     int ncmpi_inq_vartype(int ncid, int varid, nc_type *xtypep) nogil
+    int ncmpi_inq_var(int ncid, int varid, char *name, nc_type *xtypep, int *ndimsp, int *dimidsp, int *nattsp) nogil
     int ncmpi_put_vara(int ncid, int varid, const MPI_Offset start[], const MPI_Offset count[],\
      const void *buf, MPI_Offset bufcount, MPI_Datatype buftype) nogil
     int ncmpi_put_vara_all(int ncid, int varid, const MPI_Offset start[], const MPI_Offset count[],\
@@ -305,6 +307,15 @@ cdef extern from "pnetcdf.h":
     int ncmpi_bput_varn(int ncid, int varid, int num, MPI_Offset* const starts[], MPI_Offset* const counts[], \
     const void *buf, MPI_Offset bufcount, MPI_Datatype buftype, int *request) nogil
 
+    int ncmpi_mput_vara(int ncid, int nvars, int *varids, MPI_Offset* const *starts, MPI_Offset* const *counts, \
+    const void **bufs, const MPI_Offset *bufcounts, const MPI_Datatype *datatypes) nogil
+    int ncmpi_mput_vara_all(int ncid, int nvars, int *varids, MPI_Offset* const *starts, MPI_Offset* const *counts, \
+    const void **bufs, const MPI_Offset *bufcounts, const MPI_Datatype *datatypes) nogil
+    int ncmpi_mget_vara(int ncid, int nvars, int *varids, MPI_Offset* const *starts, MPI_Offset* const *counts, \
+    void **bufs, const MPI_Offset *bufcounts, const MPI_Datatype *datatypes) nogil
+    int ncmpi_mget_vara_all(int ncid, int nvars, int *varids, MPI_Offset* const *starts, MPI_Offset* const *counts, \
+    void **bufs, const MPI_Offset *bufcounts, const MPI_Datatype *datatypes) nogil
+
     int ncmpi_wait(int ncid, int count, int array_of_requests[], int array_of_statuses[]) nogil
     int ncmpi_wait_all(int ncid, int count, int array_of_requests[], int array_of_statuses[]) nogil
     int ncmpi_inq_var_fill(int ncid, int varid, int *no_fill, void *fill_value) nogil
@@ -99,7 +99,8 @@ pnc_bin_dict = {"pnetcdf_bin_dir": pnc_bindir}
 src_root = os.path.join('src', 'pnetcdf')
 
 
-src_base_all = ["_File", "_Dimension", "_utils", "_Variable"]
+src_base_all = ["_File", "_Dimension", "_utils", "_Variable", "_Request",
+                "_IOExecutor", "_RecordWriter", "ml"]
 src_all = [os.path.join(src_root, x) for x in src_base_all]
 src_all_c = [x + ".c" for x in src_all]
 
@@ -111,6 +111,8 @@ cdef class Dimension:
         # len(`Dimension` instance) returns current size of dimension
         cdef int ierr
         cdef MPI_Offset lengthp
+        if self._dimid == self._file._unlimdimid:
+            return self._file._get_numrecs()
         with nogil:
             ierr = ncmpi_inq_dimlen(self._file_id, self._dimid, &lengthp)
         _check_err(ierr)
@@ -135,13 +137,6 @@ cdef class Dimension:
 
         :rtype: bool
         """
-        cdef int ierr, n, numunlimdims, ndims, nvars, ngatts, xdimid
-        cdef int *unlimdimids
-        with nogil:
-            ierr = ncmpi_inq(self._file_id, &ndims, &nvars, &ngatts, &xdimid)
-        if self._dimid == xdimid:
-            return True
-        else:
-            return False
+        return self._dimid == self._file._unlimdimid
 
 
@@ -12,6 +12,45 @@ cdef class File:
     cdef public int _ncid
     cdef public int _isopen, indep_mode
     cdef public file_format, dimensions, variables
+    # dimension names indexed by dimension ID
+    cdef dict _dimnames
+    # ID of the unlimited dimension (-1 if none) and the number of records,
+    # None when it must be queried again
+    cdef int _unlimdimid
+    cdef object _numrecs
+    cdef _get_numrecs(self)
+    # pending nonblocking requests created by _add_request, by request ID
+    cdef dict _pending
+    cdef _add_request(self, int reqid, buffer, bint put, int varid=*)
+    cdef _complete_requests(self, int num, requests, int *requestp, int *statusp)
+    # IDs, buffers and kinds (0 read, 1 write, 2 buffered write) of the
+    # pending requests posted with track=False, in their first _nraw entries
+    cdef object _raw_ids, _raw_bufs, _raw_kinds
+    cdef Py_ssize_t _nraw
+    cdef _untrack(self, req)
+    cdef _drop_raw(self, ids)
+    # communicator of the file and the state of the deferred write mode (None
+    # when disabled), see deferred_writes
+    cdef object _comm
+    cdef public object _deferred
+    cdef _defer(self, req)
+    # the batch of lazy reads of batch_reads, None when disabled
+    cdef public object _batch
+    # the state of the self-managing attached buffer of auto_buff, None when
+    # disabled
+    cdef public object _auto_buff
+    cdef bint _reserve_buff(self, nbytes, bint collective) except -1
+    # the size limit of a single transfer of set_max_transfer_bytes, None
+    # when disabled
+    cdef public object _max_transfer
+    # the block cache of independent reads of cache_reads, None when
+    # disabled
+    cdef public object _cache
+    cdef _written(self, int varid)
+    # the global attributes by name, read on first access and cleared when
+    # they are modified
+    cdef dict _atts
+    cdef dict _attributes(self)
 
 cdef class Dataset(File):
     pass
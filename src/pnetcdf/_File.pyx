@@ -9,12 +9,15 @@ import sys
 import os
 import subprocess
 import warnings
+from collections import OrderedDict
+from collections.abc import MutableMapping
 include "PnetCDF.pxi"
 
 cimport mpi4py.MPI as MPI
 from mpi4py.libmpi cimport MPI_Comm, MPI_Info, MPI_Comm_dup, MPI_Info_dup, \
                                MPI_Comm_free, MPI_Info_free, MPI_INFO_NULL,\
                                MPI_COMM_WORLD, MPI_Offset
+from mpi4py.MPI import COMM_WORLD, MAX
 
 
 
@@ -23,10 +26,31 @@ from libc.stdlib cimport malloc, free
 
 from ._Dimension cimport Dimension
 from ._Variable cimport Variable
-from ._utils cimport _strencode, _check_err, _set_att, _get_att, _get_att_names, _get_format, _private_atts
+from ._Request cimport Request
+from ._utils cimport _strencode, _check_err, _set_att, _get_att, _get_atts, _cached_att, _get_format, _private_atts, \
+                     _convertible, _buffer_type
 from._utils cimport _nctonptype
+from ._utils import _io_submit
+from cpython.buffer cimport PyObject_CheckBuffer
 import numpy as np
 
+# default size in bytes of the blocks of File.cache_reads
+_READ_CACHE_BLOCK = 65536
+
+# number of deferred writes in collective data mode between the checks of
+# the amount of pending write data of all processes, see File.deferred_writes
+_DEFER_CHECK_INTERVAL = 32
+
+# operations of File._wait_requests
+cdef enum:
+    _WAIT_INDEP, _WAIT_COLL, _CANCEL
+
+cdef int _wait_ids(int ncid, int op, int num, int *requestp, int *statusp) nogil:
+    if op == _WAIT_INDEP:
+        return ncmpi_wait(ncid, num, requestp, statusp)
+    elif op == _WAIT_COLL:
+        return ncmpi_wait_all(ncid, num, requestp, statusp)
+    return ncmpi_cancel(ncid, num, requestp, statusp)
 
 
 cdef class File:
@@ -137,6 +161,23 @@ cdef class File:
         self.indep_mode = 0
         self._ncid = ncid
         self.file_format = _get_format(ncid)
+        self._dimnames = dict()
+        self._numrecs = None
+        self._pending = dict()
+        self._raw_ids = np.empty(0, np.int32)
+        self._raw_bufs = np.empty(0, object)
+        self._raw_kinds = np.empty(0, np.int8)
+        self._nraw = 0
+        self._comm = comm if comm is not None else COMM_WORLD
+        self._deferred = None
+        self._batch = None
+        self._auto_buff = None
+        self._max_transfer = None
+        self._cache = None
+        self._atts = None
+        with nogil:
+            ierr = ncmpi_inq_unlimdim(ncid, &self._unlimdimid)
+        _check_err(ierr)
         self.dimensions = _get_dims(self)
         self.variables = _get_variables(self)
 
@@ -156,6 +197,14 @@ cdef class File:
            f.close()
 
         """
+        if self._deferred is not None:
+            self._flush_deferred()
+            self._deferred = None
+        if self._batch is not None:
+            self._batch.resolve()
+            self._batch = None
+        self._auto_buff = None
+        self._cache = None
         self._close(True)
 
     def _close(self, check_err):
@@ -219,6 +268,12 @@ cdef class File:
 
         Writes all buffered data in the `File` to the disk file."""
         cdef int ierr
+        if self._deferred is not None:
+            self._flush_deferred()
+        self._numrecs = None
+        if self._cache is not None:
+            # the data written by other processes becomes visible
+            self._cache.clear()
         with nogil:
             ierr = ncmpi_sync(self._ncid)
         _check_err(ierr)
@@ -238,11 +293,16 @@ cdef class File:
             is to guarantee the data consistency when running application
             programs in parallel.
         """
+        if self._deferred is not None:
+            self._flush_deferred()
+        if self._batch is not None:
+            self._batch.resolve()
         self._redef()
 
     def _redef(self):
         cdef int ierr
         cdef int fileid= self._ncid
+        self._numrecs = None
         with nogil:
             ierr = ncmpi_redef(fileid)
         _check_err(ierr)
@@ -267,6 +327,7 @@ cdef class File:
     def _enddef(self):
         cdef int ierr
         cdef int fileid = self._ncid
+        self._numrecs = None
         with nogil:
             ierr = ncmpi_enddef(fileid)
         _check_err(ierr)
@@ -281,6 +342,11 @@ cdef class File:
         """
         cdef int ierr
         cdef int fileid = self._ncid
+        if self._deferred is not None:
+            self._flush_deferred()
+        if self._batch is not None:
+            self._batch.resolve()
+        self._numrecs = None
         with nogil:
             ierr = ncmpi_begin_indep_data(fileid)
         _check_err(ierr)
@@ -296,6 +362,11 @@ cdef class File:
         """
         cdef int ierr
         cdef int fileid = self._ncid
+        if self._deferred is not None:
+            self._flush_deferred()
+        if self._batch is not None:
+            self._batch.resolve()
+        self._numrecs = None
         with nogil:
             ierr = ncmpi_end_indep_data(fileid)
         _check_err(ierr)
@@ -309,6 +380,9 @@ cdef class File:
         """
         cdef int ierr
         cdef int fileid = self._ncid
+        if self._deferred is not None:
+            self._flush_deferred()
+        self._numrecs = None
         with nogil:
             ierr = ncmpi_flush(fileid)
         _check_err(ierr)
@@ -341,8 +415,14 @@ cdef class File:
            var = f.def_var("foo", pnetcdf.NC_INT, (dim_y, dim_x))
 
         """
-        self.dimensions[dimname] = Dimension(self, dimname, size=size)
-        return self.dimensions[dimname]
+        cdef int ierr
+        dim = Dimension(self, dimname, size=size)
+        self._dimnames[dim._dimid] = dimname
+        with nogil:
+            ierr = ncmpi_inq_unlimdim(self._ncid, &self._unlimdimid)
+        _check_err(ierr)
+        self.dimensions[dimname] = dim
+        return dim
 
     def createDimension(self, dimname, size=-1):
         """
@@ -430,6 +510,7 @@ cdef class File:
         self.dimensions.pop(oldname)
         # add new key.
         self.dimensions[newname] = dim
+        self._dimnames[_dim_id] = newname
 
     def renameDimension(self, oldname, newname):
         """
@@ -543,6 +624,13 @@ cdef class File:
         return self.def_var(varname, datatype, dimensions, fill_value)
 
 
+    cdef dict _attributes(self):
+        # the global attributes, read in one pass on first access and cached
+        # until put_att, del_att or rename_att modifies them
+        if self._atts is None:
+            self._atts = _get_atts(self, NC_GLOBAL)
+        return self._atts
+
     def ncattrs(self):
         """
         ncattrs(self)
@@ -551,7 +639,7 @@ cdef class File:
 
         :rtype: list
         """
-        return _get_att_names(self._ncid, NC_GLOBAL)
+        return list(self._attributes())
 
     def put_att(self,name,value):
         """
@@ -583,6 +671,7 @@ cdef class File:
         """
         cdef nc_type xtype
         xtype=-99
+        self._atts = None
         _set_att(self, NC_GLOBAL, name, value, xtype=xtype)
 
 
@@ -616,7 +705,9 @@ cdef class File:
            str_att = v.foo_attr
 
         """
-        return _get_att(self, NC_GLOBAL, name, encoding=encoding)
+        if encoding != 'utf-8':
+            return _get_att(self, NC_GLOBAL, name, encoding=encoding)
+        return _cached_att(self._attributes(), name)
 
 
     def __delattr__(self, name):
@@ -643,6 +734,7 @@ cdef class File:
         cdef int ierr
         bytestr = _strencode(name)
         attname = bytestr
+        self._atts = None
         with nogil:
             ierr = ncmpi_del_att(self._ncid, NC_GLOBAL, attname)
         _check_err(ierr)
@@ -665,11 +757,8 @@ cdef class File:
         if name.startswith('__') and name.endswith('__'):
             # if __dict__ requested, return a dict with netCDF attributes.
             if name == '__dict__':
-                names = self.ncattrs()
-                values = []
-                for name in names:
-                    values.append(_get_att(self, NC_GLOBAL, name))
-                return dict(zip(names, values))
+                atts = self._attributes()
+                return {name: _cached_att(atts, name) for name in atts}
             else:
                 raise AttributeError
         elif name in _private_atts:
@@ -700,6 +789,7 @@ cdef class File:
         bytestr = _strencode(newname)
         newnamec = bytestr
 
+        self._atts = None
         with nogil:
             ierr = ncmpi_rename_att(_file_id, NC_GLOBAL, oldnamec, newnamec)
         _check_err(ierr)
@@ -713,54 +803,210 @@ cdef class File:
         self.rename_att(oldname, newname)
 
 
-    def _wait(self, num=None, requests=None, status=None, collective=False):
+    cdef _add_request(self, int reqid, buffer, bint put, int varid=-1):
+        # Private method to create the Request object of a posted nonblocking
+        # request. It is kept, with its buffer, until the request completes.
+        # varid is the ID of the variable written by a write request.
+        if put and self._cache is not None:
+            self._cache.post(varid)
+        req = Request(self, reqid, buffer, put)
+        self._pending[reqid] = req
+        return req
+
+    cdef _untrack(self, req):
+        # Private method of the nonblocking methods of Variable called with
+        # track=False, to keep the ID and the buffer of the request in arrays
+        # instead of its Request object. Returns the request ID.
+        cdef Request r = req
+        cdef Py_ssize_t n = self._nraw
+        del self._pending[r._reqid]
+        if r._reqid == NC_REQ_NULL_C:
+            # nothing to wait for, e.g. a request of zero length
+            return r._reqid
+        if n == self._raw_ids.shape[0]:
+            grow = max(64, n)
+            self._raw_ids = np.concatenate((self._raw_ids, np.empty(grow, np.int32)))
+            self._raw_bufs = np.concatenate((self._raw_bufs, np.empty(grow, object)))
+            self._raw_kinds = np.concatenate((self._raw_kinds, np.empty(grow, np.int8)))
+        self._raw_ids[n] = r._reqid
+        self._raw_bufs[n] = r._buffer
+        self._raw_kinds[n] = 0 if not r.put else 1 if r._buffer is not None else 2
+        self._nraw = n + 1
+        return r._reqid
+
+    cdef _drop_raw(self, ids):
+        # Private method to release the requests posted with track=False
+        # whose IDs are in ids, i.e. those completed or cancelled
+        cdef Py_ssize_t n = self._nraw
+        if n == 0:
+            return
+        keep = ~np.isin(self._raw_ids[:n], ids)
+        self._keep_raw(keep)
+
+    def _keep_raw(self, keep):
+        # Private method to keep only the requests posted with track=False
+        # selected by the boolean array keep, releasing the buffers of the
+        # others
+        n = self._nraw
+        m = int(np.count_nonzero(keep))
+        if m < n:
+            self._raw_ids[:m] = self._raw_ids[:n][keep]
+            self._raw_bufs[:m] = self._raw_bufs[:n][keep]
+            self._raw_kinds[:m] = self._raw_kinds[:n][keep]
+            self._raw_bufs[m:n] = None
+            self._nraw = m
+
+    def _pending_puts(self):
+        # Private method to return whether there are pending write requests
+        return any(req.put for req in self._pending.values()) or \
+               bool(np.any(self._raw_kinds[:self._nraw]))
+
+    cdef _written(self, int varid):
+        # Private method called by the blocking writes of variable varid,
+        # which may add new records and change the blocks of the variable in
+        # the cache of cache_reads.
+        self._numrecs = None
+        if self._cache is not None:
+            self._cache.invalidate(varid)
+
+    cdef _complete_requests(self, int num, requests, int *requestp, int *statusp):
+        # Private method to update the requests completed by ncmpi_wait,
+        # ncmpi_wait_all or ncmpi_cancel, whose IDs and statuses are in
+        # requestp and statusp. Integer IDs in list requests are replaced by
+        # their new values. Returns the statuses as a numpy array.
+        cdef Request req
+        statuses = np.empty(num, np.int32)
+        untracked = []
+        for n from 0 <= n < num:
+            statuses[n] = statusp[n]
+            item = requests[n]
+            req = self._pending.pop(int(item), None)
+            if req is None and isinstance(item, Request):
+                req = item
+            if req is not None:
+                req._complete(requestp[n], statusp[n])
+            else:
+                untracked.append(int(item))
+            if not isinstance(item, Request) and isinstance(requests, list):
+                requests[n] = requestp[n]
+        if untracked:
+            self._drop_raw(untracked)
+        return statuses
+
+    def _complete_all(self, num, int err):
+        # Private method to update the pending requests completed by a wait
+        # or a cancel with num NC_REQ_ALL, NC_PUT_REQ_ALL or NC_GET_REQ_ALL
+        cdef Request req
+        for reqid, req in list(self._pending.items()):
+            if num == NC_REQ_ALL_C or req.put == (num == NC_PUT_REQ_ALL_C):
+                del self._pending[reqid]
+                req._complete(NC_REQ_NULL_C if err == NC_NOERR else reqid, err)
+        if num == NC_REQ_ALL_C:
+            self._keep_raw(np.zeros(self._nraw, bool))
+        else:
+            self._keep_raw((self._raw_kinds[:self._nraw] == 0) == (num == NC_PUT_REQ_ALL_C))
+
+    def _wait(self, num=None, requests=None, status=None, collective=False, failed_only=False):
+        return self._wait_requests(num, requests, status,
+                                   _WAIT_COLL if collective else _WAIT_INDEP, failed_only)
+
+    def _wait_requests(self, num, requests, status, int op, failed_only):
+        # Private method of wait_all, wait and cancel, selected by op
         cdef int _file_id, ierr
         cdef int num_req
-        cdef int *requestp
-        cdef int *statusp
+        cdef int *requestp = NULL
+        cdef int *statusp = NULL
         _file_id = self._ncid
+        if op != _CANCEL:
+            # completed write requests may add new records
+            self._numrecs = None
+        if requests is None and num is not None and not isinstance(num, (int, np.integer)):
+            # wait_all(requests)
+            requests = num
+            num = len(requests)
         if num is None:
             num = NC_REQ_ALL_C
         if num in [NC_REQ_ALL_C, NC_PUT_REQ_ALL_C, NC_GET_REQ_ALL_C]:
             num_req = num
-            if not collective:
-                with nogil:
-                    ierr = ncmpi_wait(_file_id, num_req, NULL, NULL)
-            else:
-                with nogil:
-                    ierr = ncmpi_wait_all(_file_id, num_req, NULL, NULL)
+            with nogil:
+                ierr = _wait_ids(_file_id, op, num_req, NULL, NULL)
+            self._complete_all(num, ierr)
             _check_err(ierr)
-        else:
-            requestp = <int *>malloc(sizeof(int) * num)
-            statusp = <int *>malloc(sizeof(int) * num)
-            num_req = num
-            for n from 0 <= n < num:
+            return None
+        num_req = num
+        if not isinstance(requests, (list, tuple)) and PyObject_CheckBuffer(requests):
+            return self._wait_array(num_req, requests, status, op, failed_only)
+        try:
+            requestp = <int *>malloc(sizeof(int) * (num_req + 1))
+            statusp = <int *>malloc(sizeof(int) * (num_req + 1))
+            for n from 0 <= n < num_req:
                 requestp[n] = requests[n]
-            if not collective:
-                with nogil:
-                    ierr = ncmpi_wait(_file_id, num_req, requestp, statusp)
-            else:
-                with nogil:
-                    ierr = ncmpi_wait_all(_file_id, num_req, requestp, statusp)
-            for n from 0 <= n < num:
-                requests[n] = requestp[n]
-
-            if status is not None:
-                for n from 0 <= n < num:
-                    status[n] = statusp[n]
-            _check_err(ierr)
-        return None
+            with nogil:
+                ierr = _wait_ids(_file_id, op, num_req, requestp, statusp)
+            statuses = self._complete_requests(num_req, requests, requestp, statusp)
+        finally:
+            free(requestp)
+            free(statusp)
+        if status is not None:
+            for n from 0 <= n < num_req:
+                status[n] = statuses[n]
+        _check_err(ierr)
+        return np.flatnonzero(statuses) if failed_only else statuses
+
+    def _wait_array(self, int num_req, requests, status, int op, failed_only):
+        # Private method of wait_all, wait and cancel given the request IDs
+        # as an int32 array, passed to PnetCDF without copying and updated in
+        # place. The requests posted with track=False are released by one
+        # vectorized lookup of their IDs; only the Request objects among the
+        # IDs are updated one by one.
+        cdef int _file_id, ierr, n
+        cdef int *requestp = NULL
+        cdef int *statusp = NULL
+        cdef int[::1] idv, statv
+        cdef Request req
+        _file_id = self._ncid
+        ids = np.asarray(requests)
+        if ids.ndim != 1 or ids.shape[0] < num_req:
+            raise ValueError("requests must be a 1-D array of at least %d request IDs" % num_req)
+        if ids.dtype != np.int32 or not ids.flags.c_contiguous or not ids.flags.writeable:
+            ids = np.array(ids, dtype=np.int32)
+        idv = ids
+        if isinstance(status, np.ndarray) and status.dtype == np.int32 and status.ndim == 1 and \
+           status.flags.c_contiguous and status.flags.writeable and status.shape[0] >= num_req:
+            statuses = status[:num_req]
+            status = None
+        else:
+            statuses = np.empty(num_req, np.int32)
+        statv = statuses
+        # PnetCDF replaces the IDs of the completed requests by NC_REQ_NULL
+        old = ids[:num_req].copy() if self._pending or self._nraw else None
+        if num_req > 0:
+            requestp = &idv[0]
+            statusp = &statv[0]
+        with nogil:
+            ierr = _wait_ids(_file_id, op, num_req, requestp, statusp)
+        if old is not None:
+            self._drop_raw(old)
+        if old is not None and self._pending:
+            tracked = np.fromiter(self._pending, np.int32, len(self._pending))
+            for n in np.flatnonzero(np.isin(old, tracked)):
+                req = self._pending.pop(int(old[n]))
+                req._complete(idv[n], statv[n])
+        if status is not None:
+            status[:num_req] = statuses.tolist()
+        _check_err(ierr)
+        return np.flatnonzero(statuses) if failed_only else statuses
 
-    def wait_all(self, num=None, requests=None, status=None):
+    def wait_all(self, num=None, requests=None, status=None, failed_only=False):
         """
-        wait_all(self, num=None, requests=None, status=None)
+        wait_all(self, num=None, requests=None, status=None, failed_only=False)
 
         This method is a blocking call that wait for the completion of
         nonblocking I/O requests made by one of more method calls to
         :meth:`Variable.iput_var`, :meth:`Variable.iget_var` and
         :meth:`Variable.bput_var`
 
-        :param int num: [Optional]
+        :param num: [Optional]
             number of requests. It is also the array size of the next two
             arguments. Alternatively it can be module-level constants:
 
@@ -768,17 +1014,40 @@ cdef class File:
             - ``pnetcdf.NC_GET_REQ_ALL``: flush all pending nonblocking GET requests
             - ``pnetcdf.NC_PUT_REQ_ALL``: flush all pending nonblocking PUT requests
 
+            It can also be a list or array of requests, i.e.
+            ``wait_all(requests)``, in which case the number of requests is
+            its length.
+        :type num: int or list of :class:`pnetcdf.Request`
+
         :param requests: [Optional]
-            Integers specifying the nonblocking request IDs returned from the
-            nonblocking requests posted earlier.
-        :type requests: list of int
+            The :class:`pnetcdf.Request` objects (or integer request IDs)
+            returned from the nonblocking requests posted earlier. The
+            requests are updated when they complete, see
+            :attr:`Request.status`. Integer request IDs in a list are replaced
+            by their new values, ``pnetcdf.NC_REQ_NULL`` on success. For large
+            numbers of requests, the IDs can be given as a numpy array of type
+            ``np.int32`` (or another object of the buffer protocol), which is
+            passed to PnetCDF without a conversion of each request and
+            updated in place if contiguous and writable.
+        :type requests: list of :class:`pnetcdf.Request` or int, or numpy.ndarray
 
         :param status: [Optional]
             List of integers to hold returned error codes from the call, each
             specifying the status of corresponding nonblocking request. The
             values can be used in a call to :meth:`pnetcdf.strerror` to obtain
-            the error messages.
-        :type status: list
+            the error messages. A contiguous numpy array of type ``np.int32``
+            given with an array of request IDs is filled by PnetCDF directly.
+        :type status: list or numpy.ndarray
+
+        :param bool failed_only: [Optional]
+            Return the indices of the requests that failed instead of the error
+            codes of all the requests. Default is False.
+
+        :return: When requests are given, a numpy array of type ``np.int32``
+            holding the error codes of the requests, or with `failed_only`, a
+            numpy array of the indices of the requests whose error code is not
+            ``pnetcdf.NC_NOERR``. Otherwise None.
+        :rtype: numpy.ndarray
 
         :Operational mode: it is an collective subroutine and must be called
             while the file is in collective data mode.
@@ -794,32 +1063,92 @@ cdef class File:
                reqs.append(req_id)
 
            # commit posted nonblocking requests
-           req_errs = [None] * NUM_VARS
-           f.wait_all(NUM_VARS, reqs, req_errs)
+           req_errs = f.wait_all(reqs)
+
+           # the buffer of each request is kept alive until it completes
+           reqs = [vars[i].iput_var(buf[i] * 2, start = start, count = count)
+                   for i in range(NUM_VARS)]
+           f.wait_all(reqs)
+           assert all(req.status == pnetcdf.NC_NOERR for req in reqs)
 
         """
-        return self._wait(num, requests, status, collective=True)
+        return self._wait(num, requests, status, collective=True, failed_only=failed_only)
 
-    def wait(self, num=None, requests=None, status=None):
+    def wait(self, num=None, requests=None, status=None, failed_only=False):
         """
-        wait(self, num=None, requests=None, status=None)
+        wait(self, num=None, requests=None, status=None, failed_only=False)
 
         Same as :meth:`File.wait_all` but called in independent data mode
 
         :Operational mode: it is an independent subroutine and must be called
             while the file is in independent data mode.
         """
-        return self._wait(num, requests, status, collective=False)
+        return self._wait(num, requests, status, collective=False, failed_only=failed_only)
 
-    def cancel(self, num=None, requests=None, status=None):
+    def wait_all_async(self, num=None, requests=None, status=None):
         """
-        cancel(self, num=None, requests=None, status=None)
+        wait_all_async(self, num=None, requests=None, status=None)
+
+        Asynchronous version of :meth:`File.wait_all` for :mod:`asyncio`
+        programs. The wait is carried out by the I/O thread, shared with the
+        :class:`pnetcdf.IOExecutor` instances, while the event loop keeps
+        running other tasks, e.g. network or compute tasks, and the returned
+        future is resolved on the event loop when the wait completes. The arguments are the same as
+        :meth:`File.wait_all`. It must be called from a coroutine, i.e.
+        while an event loop is running.
+
+        :return: An :class:`asyncio.Future` whose result is the value
+            returned by :meth:`File.wait_all`.
+
+        .. note:: The asynchronous operations of all files, including
+            :meth:`Variable.aget` and :meth:`Variable.aput`, and the
+            operations of the :class:`pnetcdf.IOExecutor` instances not
+            funneled are carried out one after another by the same I/O
+            thread, in the order they are called. As PnetCDF is called from
+            a thread other than the main thread, MPI must be initialized
+            with thread support level ``MPI_THREAD_SERIALIZED`` or higher
+            (``MPI_THREAD_MULTIPLE`` is the default of mpi4py), otherwise a
+            ``RuntimeError`` is raised.
+            Unless the level is ``MPI_THREAD_MULTIPLE``, the program must
+            not call PnetCDF or MPI in other threads while asynchronous
+            operations are in progress.
+
+        :Operational mode: it is an collective subroutine and must be called
+            while the file is in collective data mode.
+
+        :Example:
+
+         ::
+
+           async def write_step(f, v, buf):
+               req = v.iput_var(buf, start = start, count = count)
+               # other tasks run while the requests are written
+               errs = await f.wait_all_async([req])
+
+        """
+        return _io_submit(self.wait_all, num, requests, status)
+
+    def wait_async(self, num=None, requests=None, status=None):
+        """
+        wait_async(self, num=None, requests=None, status=None)
+
+        Same as :meth:`File.wait_all_async` but calls :meth:`File.wait`, in
+        independent data mode.
+
+        :Operational mode: it is an independent subroutine and must be called
+            while the file is in independent data mode.
+        """
+        return _io_submit(self.wait, num, requests, status)
+
+    def cancel(self, num=None, requests=None, status=None, failed_only=False):
+        """
+        cancel(self, num=None, requests=None, status=None, failed_only=False)
 
         This method cancels a list of pending nonblocking requests made by the
         nonblocking methods, such as :meth:`Variable.iput_var`,
         :meth:`Variable.iget_var`, and :meth:`Variable.bput_var`
 
-        :param int num: [Optional]
+        :param num: [Optional]
             Number of requests. It is also the array size of the next two
             arguments. Alternatively it can be module-level constants:
 
@@ -827,47 +1156,184 @@ cdef class File:
             - ``pnetcdf.NC_GET_REQ_ALL``: flush all pending nonblocking GET requests
             - ``pnetcdf.NC_PUT_REQ_ALL``: flush all pending nonblocking PUT requests
 
+            It can also be a list or array of requests, i.e.
+            ``cancel(requests)``.
+        :type num: int or list of :class:`pnetcdf.Request`
+
         :param requests: [Optional]
-            Integers specifying the nonblocking request IDs that were made
-            earlier.
-        :type requests: list of int
+            The :class:`pnetcdf.Request` objects (or integer request IDs)
+            that were made earlier, or a numpy array of type ``np.int32`` of
+            request IDs, same as :meth:`File.wait_all`.
+        :type requests: list of :class:`pnetcdf.Request` or int, or numpy.ndarray
 
         :param status: [Optional]
             List of integers to hold returned error codes from the call, each
             specifying the status of corresponding nonblocking request. The
             values can be used in a call to :meth:`pnetcdf.strerror` to obtain
             the status messages.
-        :type status: list
+        :type status: list or numpy.ndarray
+
+        :param bool failed_only: [Optional]
+            Return the indices of the requests that failed instead of the error
+            codes of all the requests, same as :meth:`File.wait_all`.
+
+        :return: When requests are given, a numpy array of type ``np.int32``
+            holding the error codes of the requests, or with `failed_only`,
+            the indices of the requests that failed, otherwise None.
+        :rtype: numpy.ndarray
 
         :Operational mode: it can be called in either independent or collective
             data mode or define mode.
         """
-        cdef int _file_id, ierr
-        cdef int num_req
-        cdef int *requestp
-        cdef int *statusp
-        _file_id = self._ncid
-        if num is None:
-            num = NC_REQ_ALL_C
-        if num in [NC_REQ_ALL_C, NC_PUT_REQ_ALL_C, NC_GET_REQ_ALL_C]:
-            num_req = num
-            with nogil:
-                ierr = ncmpi_cancel(_file_id, num_req, NULL, NULL)
-            _check_err(ierr)
-        else:
-            requestp = <int *>malloc(sizeof(int) * num)
-            statusp = <int *>malloc(sizeof(int) * num)
-            num_req = num
-            for n from 0 <= n < num:
-                requestp[n] = requests[n]
-            with nogil:
-                ierr = ncmpi_cancel(_file_id, num_req, requestp, statusp)
-            for n from 0 <= n < num:
-                requests[n] = requestp[n]
-            if status is not None:
-                for n from 0 <= n < num:
-                    status[n] = statusp[n]
-            _check_err(ierr)
+        return self._wait_requests(num, requests, status, _CANCEL, failed_only)
+
+    def deferred_writes(self, max_bytes=None, max_requests=None, copy=False):
+        """
+        deferred_writes(self, max_bytes=None, max_requests=None, copy=False)
+
+        Return a context manager enabling the deferred write mode of the file.
+        Within the ``with`` block, writes made by :meth:`Variable.__setitem__`,
+        :meth:`Variable.put_var_all`, :meth:`Variable.put_var`,
+        :meth:`Variable.put_varn_all` and :meth:`Variable.put_varn` post
+        nonblocking write requests instead of writing the data immediately.
+        The pending requests are completed altogether by a single call to
+        :meth:`File.wait_all` (:meth:`File.wait` in independent data mode),
+        which aggregates many small writes into a large one. The deferred
+        writes are flushed
+
+            - at the exit of the ``with`` block,
+            - when the number of pending requests reaches `max_requests` or
+              the amount of pending write data reaches `max_bytes`,
+            - before :meth:`File.sync`, :meth:`File.flush`, :meth:`File.close`,
+              :meth:`File.redef`, :meth:`File.begin_indep` and
+              :meth:`File.end_indep`,
+            - before the data of the file is read by the blocking read methods
+              of :class:`Variable` and by :meth:`File.get_vars_all`, and
+              before :meth:`File.put_vars_all`,
+            - when :meth:`flush` of the returned context manager is called.
+
+        :param int max_bytes: [Optional]
+            Flush the deferred writes when the size in bytes of the pending
+            write data reaches this amount. In collective data mode, all
+            processes must flush together, so the amounts of all processes
+            are reduced by an ``MPI_Allreduce`` every 32 writes, and the
+            deferred writes are flushed when any of them has reached the
+            threshold. The pending write data may then exceed `max_bytes` by
+            the data of up to 31 writes. `None` means no limit.
+
+        :param int max_requests: [Optional]
+            Flush the deferred writes when the number of pending requests
+            reaches this number. `None` means no limit.
+
+        :param bool copy: [Optional]
+            Copy the write buffers when the requests are posted. By default,
+            the write buffers are used by PnetCDF until the requests are
+            flushed and their contents must not be modified in the meantime.
+            They are kept alive by the :class:`pnetcdf.Request` objects of the
+            requests.
+
+        :return: The context manager of the deferred write mode. Its method
+            ``flush()`` flushes the pending deferred writes.
+
+        .. note:: Same as for other nonblocking requests, the order in which
+            overlapping write requests flushed together are carried out is
+            undefined, so data written more than once in the block must be
+            flushed in between. The number of records of a record variable
+            is only updated when the writes are flushed. In collective data
+            mode, all processes must make the same sequence of write calls,
+            as required for the blocking collective methods.
+
+        :Operational mode: The deferred writes are posted and flushed in the
+            data mode of the file (collective or independent) at the time of
+            the call. The calls of the methods of collective data mode must be
+            made by all processes.
+
+        :Example:
+
+         ::
+
+           with f.deferred_writes(max_bytes = 64 * 1048576):
+               for i in range(NUM_VARS):
+                   f.variables['var%d' % i][rank, :] = buf[i]
+           # all the writes are flushed at the exit of the block
+
+        """
+        if self._deferred is not None:
+            raise RuntimeError("deferred write mode is already enabled")
+        return _DeferredWrites(self, max_bytes, max_requests, copy)
+
+    cdef _defer(self, req):
+        # Private method to add a write request posted in deferred write mode
+        # and flush the deferred writes when a threshold is reached.
+        state = self._deferred
+        state.requests.append(req)
+        state.nbytes += req.buffer.nbytes
+        if state.max_requests is not None and len(state.requests) >= state.max_requests:
+            # the numbers of requests are the same on all processes in
+            # collective mode
+            self._flush_deferred()
+        elif state.max_bytes is not None:
+            if self.indep_mode:
+                if state.nbytes >= state.max_bytes:
+                    self._flush_deferred()
+            elif len(state.requests) % _DEFER_CHECK_INTERVAL == 0:
+                # all processes must take part in the collective flush, so
+                # they agree on the amount of pending write data at the
+                # same numbers of requests
+                if self._comm.allreduce(state.nbytes, op=MAX) >= state.max_bytes:
+                    self._flush_deferred()
+        return req
+
+    def _flush_deferred(self):
+        # Private method to complete the write requests posted in deferred
+        # write mode by a single call to ncmpi_wait_all (or ncmpi_wait).
+        state = self._deferred
+        requests = state.requests
+        state.requests = []
+        state.nbytes = 0
+        statuses = self._wait(requests, collective=not self.indep_mode)
+        for err in statuses:
+            _check_err(err)
+
+    def batch_reads(self):
+        """
+        batch_reads(self)
+
+        Return a context manager in which the reads made by the indexer
+        :attr:`Variable.lazy` are batched. ``var.lazy[...]`` takes the same
+        indices as ``var[...]``, but instead of reading the data, it posts a
+        nonblocking read request and returns a :class:`pnetcdf.LazyArray`
+        placeholder of the data. The pending read requests of the batch are
+        completed altogether by a single call to :meth:`File.wait_all`
+        (:meth:`File.wait` in independent data mode), which aggregates the
+        reads, when the ``with`` block exits or when the data of one of the
+        placeholders is first accessed, whichever comes first. Placeholders
+        created afterwards form a new batch. The pending reads are also
+        completed before :meth:`File.close`, :meth:`File.redef`,
+        :meth:`File.begin_indep` and :meth:`File.end_indep`.
+
+        :return: The context manager of the batch. Its method ``resolve()``
+            completes the pending read requests.
+
+        .. note:: In collective data mode, completing the batch is
+            collective. All processes must exit the ``with`` block, or access
+            their first placeholder of a batch, at the same point of the
+            program. Posting the read requests is independent.
+
+        :Example:
+
+         ::
+
+           with f.batch_reads():
+               lat = f.variables['lat'].lazy[:]
+               temp = [f.variables['temp'].lazy[t, rank, :] for t in range(nt)]
+           # all the reads are carried out at the exit of the block
+           print(np.asarray(lat), temp[0].value)
+
+        """
+        if self._batch is not None:
+            raise RuntimeError("batch reads are already enabled")
+        return _BatchReads(self)
 
 
     def inq_nreqs(self):
@@ -886,6 +1352,252 @@ cdef class File:
         _check_err(ierr)
         return num_req
 
+    def inq_pending_ids(self):
+        """
+        inq_pending_ids(self)
+
+        Method to return the IDs of the pending nonblocking requests posted
+        by the nonblocking methods of :class:`pnetcdf.Variable`, including
+        those posted with ``track=False``. The array can be given to
+        :meth:`File.wait_all` or :meth:`File.wait` to complete the requests.
+
+        :rtype: numpy.ndarray of type ``np.int32``
+        """
+        tracked = np.fromiter(self._pending, np.int32, len(self._pending))
+        return np.concatenate((tracked, self._raw_ids[:self._nraw]))
+
+    def _mput_mget(self, requests, bint put, bint collective):
+        # Private method to write or read subarrays of multiple variables by
+        # a single call to ncmpi_mput_vara/ncmpi_mget_vara (or the collective
+        # _all versions). requests maps variables (or their names) to tuples
+        # (start, count, data) for writes and (start, count[, out]) for reads.
+        cdef int ierr, i, n, ndim, nvars
+        cdef int *varidsp = NULL
+        cdef MPI_Offset **startsp = NULL
+        cdef MPI_Offset **countsp = NULL
+        cdef void **bufsp = NULL
+        cdef MPI_Offset *bufcountsp = NULL
+        cdef MPI_Datatype *buftypesp = NULL
+        cdef MPI_Offset *offsetp
+        cdef ndarray offsets, buf
+        cdef MPI.Datatype buftype
+        cdef Variable var
+        if self._deferred is not None:
+            self._flush_deferred()
+        keys = list(requests)
+        nvars = len(keys)
+        variables = []
+        bufs = []
+        bufcounts = []
+        buftypes = []
+        # the starts and counts of all variables, one after another
+        offsets = np.zeros(2 * sum(self._mvariable(key).ndim for key in keys) + 1, np.int64)
+        n = 0
+        for key in keys:
+            var = self._mvariable(key)
+            value = requests[key]
+            if put:
+                if len(value) != 3:
+                    raise ValueError("requests of variable %s must be a tuple (start, count, data)" % var.name)
+                start, count, data = value
+            else:
+                if len(value) not in (2, 3):
+                    raise ValueError("requests of variable %s must be a tuple (start, count[, out])" % var.name)
+                start, count = value[:2]
+                data = value[2] if len(value) == 3 else None
+            shape = var.shape
+            start = np.zeros(var.ndim, np.int64) if start is None else np.asarray(start, np.int64)
+            count = np.subtract(shape, start, dtype=np.int64) if count is None else np.asarray(count, np.int64)
+            if start.shape != (var.ndim,) or count.shape != (var.ndim,):
+                raise ValueError("start and count of variable %s must have %d elements" % (var.name, var.ndim))
+            size = int(np.prod(count))
+            if put:
+                buf = np.asarray(data)
+                if not _convertible(buf.dtype, var.dtype):
+                    buf = buf.astype(var.dtype)
+                # the datatypes of non-contiguous arrays are not kept by the
+                # derived datatype cache for the duration of the call
+                buf = np.ascontiguousarray(buf)
+                if PyArray_SIZE(buf) != size:
+                    raise ValueError("size of data of variable %s does not conform to count %s" % \
+                                     (var.name, tuple(count)))
+            elif data is None:
+                buf = np.empty(tuple(count), var.dtype)
+            else:
+                buf = data
+                if PyArray_SIZE(buf) != size:
+                    raise ValueError("size of out array of variable %s does not conform to count %s" % \
+                                     (var.name, tuple(count)))
+                if not buf.flags.writeable:
+                    raise ValueError("out array of variable %s is read-only" % var.name)
+            bufcount, buftype = _buffer_type(buf, var.dtype, strided=False)
+            offsets[n:n + var.ndim] = start
+            offsets[n + var.ndim:n + 2 * var.ndim] = count
+            n += 2 * var.ndim
+            variables.append(var)
+            bufs.append(buf)
+            bufcounts.append(bufcount)
+            buftypes.append(buftype)
+        if put:
+            # writes may add new records
+            for var in variables:
+                self._written(var._varid)
+
+        try:
+            varidsp = <int *>malloc((nvars + 1) * sizeof(int))
+            startsp = <MPI_Offset **>malloc((nvars + 1) * sizeof(MPI_Offset *))
+            countsp = <MPI_Offset **>malloc((nvars + 1) * sizeof(MPI_Offset *))
+            bufsp = <void **>malloc((nvars + 1) * sizeof(void *))
+            bufcountsp = <MPI_Offset *>malloc((nvars + 1) * sizeof(MPI_Offset))
+            buftypesp = <MPI_Datatype *>malloc((nvars + 1) * sizeof(MPI_Datatype))
+            if varidsp == NULL or startsp == NULL or countsp == NULL or bufsp == NULL or \
+               bufcountsp == NULL or buftypesp == NULL:
+                raise MemoryError()
+            offsetp = <MPI_Offset *>PyArray_DATA(offsets)
+            for i in range(nvars):
+                var = variables[i]
+                ndim = var.ndim
+                varidsp[i] = var._varid
+                startsp[i] = offsetp
+                countsp[i] = offsetp + ndim
+                offsetp += 2 * ndim
+                bufsp[i] = PyArray_DATA(bufs[i])
+                bufcountsp[i] = bufcounts[i]
+                if buftypes[i] is None:
+                    buftypesp[i] = MPI_DATATYPE_NULL
+                else:
+                    buftype = buftypes[i]
+                    buftypesp[i] = buftype.ob_mpi
+            if put and collective:
+                with nogil:
+                    ierr = ncmpi_mput_vara_all(self._ncid, nvars, varidsp,
+                                               <const MPI_Offset **>startsp, <const MPI_Offset **>countsp,
+                                               <const void **>bufsp, <const MPI_Offset *>bufcountsp,
+                                               <const MPI_Datatype *>buftypesp)
+            elif put:
+                with nogil:
+                    ierr = ncmpi_mput_vara(self._ncid, nvars, varidsp,
+                                           <const MPI_Offset **>startsp, <const MPI_Offset **>countsp,
+                                           <const void **>bufsp, <const MPI_Offset *>bufcountsp,
+                                           <const MPI_Datatype *>buftypesp)
+            elif collective:
+                with nogil:
+                    ierr = ncmpi_mget_vara_all(self._ncid, nvars, varidsp,
+                                               <const MPI_Offset **>startsp, <const MPI_Offset **>countsp,
+                                               bufsp, <const MPI_Offset *>bufcountsp,
+                                               <const MPI_Datatype *>buftypesp)
+            else:
+                with nogil:
+                    ierr = ncmpi_mget_vara(self._ncid, nvars, varidsp,
+                                           <const MPI_Offset **>startsp, <const MPI_Offset **>countsp,
+                                           bufsp, <const MPI_Offset *>bufcountsp,
+                                           <const MPI_Datatype *>buftypesp)
+        finally:
+            free(varidsp)
+            free(startsp)
+            free(countsp)
+            free(bufsp)
+            free(bufcountsp)
+            free(buftypesp)
+        _check_err(ierr)
+        if not put:
+            return dict(zip(keys, bufs))
+
+    def _mvariable(self, key):
+        # the Variable of a key of the requests of put_vars_all/get_vars_all
+        if isinstance(key, Variable):
+            return key
+        return self.variables[key]
+
+    def put_vars_all(self, requests):
+        """
+        put_vars_all(self, requests)
+
+        Method to write subarrays of multiple variables by a single call to
+        PnetCDF, ``ncmpi_mput_vara_all``. All the requests are carried out by
+        one collective I/O operation, which is usually much faster than
+        writing the variables one at a time with :meth:`Variable.put_var_all`,
+        e.g. when writing many small variables at each time step.
+
+        :param requests: A dictionary mapping variables, given as instances
+            of :class:`pnetcdf.Variable` or as names, to tuples ``(start,
+            count, data)``. `start` and `count` are sequences of integers of
+            the length of the variable's number of dimensions, specifying the
+            subarray to write as in :meth:`Variable.put_var_all`. `start`
+            None means the first element, and `count` None up to the end of
+            every dimension. `data` is a numpy array of any shape whose size
+            is the number of elements of the subarray. Its values are converted
+            to the variable's data type if necessary. An empty dictionary is
+            allowed, for processes which write no data.
+        :type requests: dict
+
+        :Operational mode: it is an collective subroutine and must be called
+            while the file is in collective data mode.
+
+        :Example: A example code fragment is given below.
+
+         ::
+
+           # write the subarray of each process of all variables at once
+           reqs = {v: (start, count, buf[i]) for i, v in enumerate(vars)}
+           f.put_vars_all(reqs)
+
+        """
+        self._mput_mget(requests, True, True)
+
+    def put_vars(self, requests):
+        """
+        put_vars(self, requests)
+
+        Same as :meth:`File.put_vars_all` but called in independent data mode,
+        using ``ncmpi_mput_vara``.
+
+        :Operational mode: it is an independent subroutine and must be called
+            while the file is in independent data mode.
+        """
+        self._mput_mget(requests, True, False)
+
+    def get_vars_all(self, requests):
+        """
+        get_vars_all(self, requests)
+
+        Method to read subarrays of multiple variables by a single call to
+        PnetCDF, ``ncmpi_mget_vara_all``. All the requests are carried out by
+        one collective I/O operation. It is the read counterpart of
+        :meth:`File.put_vars_all`.
+
+        :param requests: A dictionary mapping variables, given as instances
+            of :class:`pnetcdf.Variable` or as names, to tuples ``(start,
+            count)`` or ``(start, count, out)``. `start` and `count` are as in
+            :meth:`File.put_vars_all`. `out` is a C-contiguous numpy array
+            whose size is the number of elements of the subarray, into which
+            the values are read, converted from the variable's data type if
+            necessary. If `out` is not given, a new array of shape `count` and
+            of the variable's data type is allocated. NC_CHAR variables are
+            read as arrays of characters.
+        :type requests: dict
+
+        :return: A dictionary mapping the keys of `requests` to the arrays
+            read.
+        :rtype: dict
+
+        :Operational mode: it is an collective subroutine and must be called
+            while the file is in collective data mode.
+        """
+        return self._mput_mget(requests, False, True)
+
+    def get_vars(self, requests):
+        """
+        get_vars(self, requests)
+
+        Same as :meth:`File.get_vars_all` but called in independent data mode,
+        using ``ncmpi_mget_vara``.
+
+        :Operational mode: it is an independent subroutine and must be called
+            while the file is in independent data mode.
+        """
+        return self._mput_mget(requests, False, False)
+
     def attach_buff(self, bufsize):
         """
         attach_buff(self, bufsize)
@@ -923,7 +1635,7 @@ cdef class File:
         detach_buff(self)
 
         Detach the write buffer previously attached for buffered non-blocking
-        write
+        write, by :meth:`File.attach_buff` or :meth:`File.auto_buff`
 
         :Example: A example is available in ``examples/nonblocking/nonblocking_write.py``
 
@@ -937,6 +1649,10 @@ cdef class File:
            f.detach_buff()
 
         """
+        self._detach_buff()
+        self._auto_buff = None
+
+    def _detach_buff(self):
         cdef int _file_id = self._ncid
         with nogil:
             ierr = ncmpi_buffer_detach(_file_id)
@@ -977,6 +1693,125 @@ cdef class File:
         _check_err(ierr)
         return buffsize
 
+    def auto_buff(self, max_size, init_size=None):
+        """
+        auto_buff(self, max_size, init_size=None)
+
+        Attach a self-managing buffer for buffered non-blocking writes, as an
+        alternative to :meth:`File.attach_buff`, whose size does not need to
+        be known in advance. Before each call to :meth:`Variable.bput_var` or
+        :meth:`Variable.bput_varn`, the usage of the buffer is checked by
+        :meth:`File.inq_buff_usage`. When the request would overflow the
+        buffer, the pending buffered write requests are flushed by
+        :meth:`File.wait_all` (or :meth:`File.wait` in independent data mode)
+        and the buffer is grown to fit the request, up to `max_size` bytes.
+        When the buffer is empty and much larger than the recent usage, it is
+        shrunk. A request larger than `max_size` is written from a copy of its
+        data by a :meth:`Variable.iput_var` request instead. Call
+        :meth:`File.detach_buff` when the buffer is no longer needed.
+
+        :param int max_size: The maximum size of the buffer in bytes.
+
+        :param int init_size: [Optional] The initial size of the buffer in
+            bytes, also the smallest size it is shrunk to. Default is 1 MiB,
+            or `max_size` if smaller.
+
+        :Operational mode: While the file is in collective data mode, the
+            buffered write methods :meth:`Variable.bput_var` and
+            :meth:`Variable.bput_varn` become collective, i.e. all processes
+            must call them the same number of times, as the decision to flush
+            is agreed among the processes. The statistics of the buffer are
+            given by :meth:`File.inq_buff_stats`.
+
+        :Example:
+
+         ::
+
+           f.auto_buff(max_size = 256 * 1048576)
+           for step in range(nsteps):
+               for v in variables:
+                   v.bput_var(buf, start = start, count = count)
+           f.wait_all()
+           print(f.inq_buff_stats())
+           f.detach_buff()
+        """
+        if init_size is None:
+            init_size = min(1048576, max_size)
+        if init_size <= 0 or init_size > max_size:
+            raise ValueError("init_size must be positive and at most max_size")
+        self.attach_buff(init_size)
+        self._auto_buff = _AutoBuffer(init_size, max_size)
+
+    def inq_buff_stats(self):
+        """
+        inq_buff_stats(self)
+
+        Return the statistics of the self-managing buffer attached by
+        :meth:`File.auto_buff`, to tune its maximum size.
+
+        :return: A dictionary with the following keys.
+
+            - ``size``: the current size of the buffer in bytes
+            - ``max_size``: the maximum size of the buffer
+            - ``high_water``: the highest usage of the buffer in bytes
+            - ``largest``: the largest size the buffer has been grown to
+            - ``flushes``: the number of flushes of the pending requests made
+              to make room for new requests
+            - ``resizes``: the number of times the buffer was grown or shrunk
+            - ``spills``: the number of requests larger than ``max_size``,
+              written by :meth:`Variable.iput_var` requests
+        :rtype: dict
+        """
+        auto = self._auto_buff
+        if auto is None:
+            raise RuntimeError("no buffer is attached by File.auto_buff")
+        return {'size': auto.size, 'max_size': auto.max_size,
+                'high_water': auto.high_water, 'largest': auto.largest,
+                'flushes': auto.flushes, 'resizes': auto.resizes,
+                'spills': auto.spills}
+
+    cdef bint _reserve_buff(self, nbytes, bint collective) except -1:
+        # Make room in the buffer of auto_buff for a buffered write request of
+        # nbytes bytes. Return False if the request is larger than the maximum
+        # size and must be written by an iput request instead.
+        auto = self._auto_buff
+        # the space taken by a request in the buffer is rounded up
+        need = (nbytes + 7) // 8 * 8
+        usage = self.inq_buff_usage()
+        overflow = need <= auto.max_size and usage + need > auto.size
+        if collective:
+            # all processes take part in the collective flush
+            overflow = self._comm.allreduce(overflow, op=MAX)
+        if overflow:
+            requests = [req for req in self._pending.values() if req.put and req.buffer is None]
+            if self._nraw:
+                raw = self._raw_ids[:self._nraw]
+                requests += raw[self._raw_kinds[:self._nraw] == 2].tolist()
+            self._wait(requests, collective=collective)
+            auto.flushes += 1
+            usage = 0
+        if need > auto.max_size:
+            auto.spills += 1
+            return False
+        if usage == 0:
+            # no pending buffered requests, the buffer can be resized
+            size = auto.size
+            recent = max(auto.peak, need)
+            if need > size:
+                size = min(auto.max_size, max(need, 2 * size))
+            elif size > 4 * recent and size > auto.init_size:
+                size = max(auto.init_size, 2 * recent)
+            if size != auto.size:
+                self._detach_buff()
+                self.attach_buff(size)
+                auto.size = size
+                auto.largest = max(auto.largest, size)
+                auto.resizes += 1
+            auto.peak = 0
+        auto.peak = max(auto.peak, usage + need)
+        auto.high_water = max(auto.high_water, auto.peak)
+        return True
+
     def inq_unlimdim(self):
         """
         inq_unlimdim(self)
@@ -987,15 +1822,37 @@ cdef class File:
         :rtype: :class:`pnetcdf.Dimension`
         """
 
-        cdef int ierr, unlimdimid
-        with nogil:
-            ierr = ncmpi_inq_unlimdim(self._ncid, &unlimdimid)
-        _check_err(ierr)
-        if unlimdimid == -1:
+        if self._unlimdimid == -1:
             return None
-        for name, dim in self.dimensions.items():
-            if dim._dimid == unlimdimid:
-                return dim
+        return self.dimensions[self._dimnames[self._unlimdimid]]
+
+    cdef _get_numrecs(self):
+        # Private method to get the current number of records. The number is
+        # cached until an operation that may change it, such as a write,
+        # wait, sync or enddef, is called.
+        cdef int ierr
+        cdef MPI_Offset numrecs
+        if self._numrecs is None:
+            if self._unlimdimid == -1:
+                numrecs = 0
+            else:
+                with nogil:
+                    ierr = ncmpi_inq_dimlen(self._ncid, self._unlimdimid, &numrecs)
+                _check_err(ierr)
+            self._numrecs = numrecs
+        return self._numrecs
+
+    def _load_dimension(self, name, dimid):
+        # Private method to create the `Dimension` instance of an entry in
+        # `File.dimensions` read from the file header
+        return Dimension(file = self, name = name, id = dimid)
+
+    def _load_variable(self, name, meta):
+        # Private method to create the `Variable` instance of an entry in
+        # `File.variables` read from the file header
+        varid, xtype, dimids = meta
+        dimensions = [self.dimensions[self._dimnames[dimid]] for dimid in dimids]
+        return Variable(self, name, xtype, dimensions, id=varid)
 
 
     def set_fill(self, fillmode):
@@ -1063,6 +1920,141 @@ cdef class File:
         for var in _vars.values():
             var.set_auto_chartostring(value)
 
+    def set_max_transfer_bytes(self, nbytes):
+        """
+        set_max_transfer_bytes(self, nbytes)
+
+        Set the maximum number of bytes transferred by a single request of
+        :meth:`Variable.put_var_all`, :meth:`Variable.get_var_all`,
+        :meth:`Variable.put_var`, :meth:`Variable.get_var` and of the indexer
+        syntax, e.g. ``var[...] = buf``, when writing or reading an entire
+        variable or a subarray, with or without `stride`. A larger request is
+        split along its slowest varying dimensions into pieces of at most
+        `nbytes` bytes, posted as nonblocking requests and completed together
+        by a single call to :meth:`File.wait_all` (or :meth:`File.wait` in
+        independent data mode). This keeps the size of each piece below the
+        2 GiB limit of the counts of MPI-IO and bounds the size of the
+        temporary buffers PnetCDF allocates per request, e.g. to convert or
+        byte-swap the elements, so arrays of any size can be written and
+        read. The limit can be overridden per call by the argument
+        `max_transfer_bytes` of these methods. Requests giving `imap`,
+        `bufcount` or `buftype` are not split.
+
+        :param nbytes: The maximum size in bytes of a single transfer, or
+            `None` to disable splitting, which is the default.
+        :type nbytes: int or None
+
+        :return: The previous limit.
+        :rtype: int or None
+
+        :Operational mode: The limit must be the same on all processes. While
+            it is set, the collective methods always complete their requests
+            by :meth:`File.wait_all`, including on processes whose request
+            needs no splitting.
+
+        :Example:
+
+         ::
+
+           # transfer at most 1 GiB per request
+           f.set_max_transfer_bytes(1 << 30)
+           var.put_var_all(buf, start = start, count = count)
+        """
+        if nbytes is not None and nbytes <= 0:
+            raise ValueError("nbytes must be positive or None, got %s" % nbytes)
+        old = self._max_transfer
+        self._max_transfer = nbytes
+        return old
+
+    def cache_reads(self, max_bytes, block_shape=None):
+        """
+        cache_reads(self, max_bytes, block_shape=None)
+
+        Enable a cache of the independent reads of the indexer syntax, e.g.
+        ``var[i, 2:5]``, for programs reading small, overlapping or
+        neighbouring subarrays of the same variables repeatedly. A read of
+        integers, slices and Ellipsis made in independent data mode is served
+        from the blocks of the variable it overlaps, aligned to multiples of
+        `block_shape`. The blocks not in the cache are read entirely by
+        :meth:`Variable.get_var`. The least recently used blocks are evicted
+        to keep the size of the cache within `max_bytes`. Reads whose blocks
+        do not fit in the cache are made directly.
+
+        The blocks of a variable are dropped when it is written through this
+        `File`, by blocking or nonblocking methods, and reads of a variable
+        with pending nonblocking writes are not cached. All blocks are dropped
+        by :meth:`File.sync`, which makes the data written by other processes
+        visible.
+
+        :param max_bytes: The maximum size in bytes of the blocks cached, or
+            `None` to disable the cache and drop its blocks, which is the
+            default.
+        :type max_bytes: int or None
+
+        :param block_shape: [Optional] The lengths of the blocks along the
+            leading dimensions of the variables. The blocks cover the
+            remaining dimensions entirely. An integer gives the number of
+            records, i.e. of entries of the first dimension, per block. By
+            default, a block holds as many entries of the first dimension as
+            fit in 64 KiB, at least one.
+        :type block_shape: int or tuple of int
+
+        :Operational mode: This method is independent. Reads in collective
+            data mode are not cached, as every process must take part in the
+            collective calls.
+
+        :Example:
+
+         ::
+
+           f.cache_reads(64 * 1048576, block_shape = 16)
+           f.begin_indep()
+           for i in indices:
+               image = f.variables['images'][i]
+           print(f.inq_cache_stats())
+        """
+        if max_bytes is None:
+            self._cache = None
+            return
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive or None, got %s" % max_bytes)
+        if block_shape is not None:
+            if isinstance(block_shape, (int, np.integer)):
+                block_shape = (block_shape,)
+            block_shape = tuple(int(n) for n in block_shape)
+            if not block_shape or min(block_shape) <= 0:
+                raise ValueError("block_shape must be positive, got %s" % (block_shape,))
+        self._cache = _ReadCache(max_bytes, block_shape)
+
+    def inq_cache_stats(self):
+        """
+        inq_cache_stats(self)
+
+        Return the statistics of the read cache enabled by
+        :meth:`File.cache_reads`, to tune its size and block shape.
+
+        :return: A dictionary with the following keys.
+
+            - ``size``: the size of the blocks cached in bytes
+            - ``max_bytes``: the maximum size of the cache
+            - ``blocks``: the number of blocks cached
+            - ``hits``: the number of blocks served from the cache
+            - ``misses``: the number of blocks read from the file
+            - ``evictions``: the number of blocks evicted to make room
+            - ``invalidations``: the number of blocks dropped by writes
+            - ``bypasses``: the number of reads made without the cache, as
+              their blocks do not fit in it or the variable has pending
+              nonblocking writes
+        :rtype: dict
+        """
+        cache = self._cache
+        if cache is None:
+            raise RuntimeError("no read cache is enabled by File.cache_reads")
+        return {'size': cache.nbytes, 'max_bytes': cache.max_bytes,
+                'blocks': len(cache.blocks), 'hits': cache.hits,
+                'misses': cache.misses, 'evictions': cache.evictions,
+                'invalidations': cache.invalidations, 'bypasses': cache.bypasses}
+
 
     def inq_num_rec_vars(self):
         """
@@ -1228,91 +2220,259 @@ cdef class File:
         _check_err(ierr)
         return extent
 
-cdef _get_dims(file):
-    # Private method to create `Dimension` instances for all the
-    # dimensions in a `File`
+class _MetadataDict(MutableMapping):
+    # Private dictionary holding the `Dimension` or `Variable` instances of a
+    # `File`, keyed by name. Entries read from the file header when opening a
+    # file only keep their metadata, and their instances are created by
+    # `loader` the first time they are accessed.
+    def __init__(self, loader, entries):
+        self._loader = loader
+        # name -> instance, or None if not created yet
+        self._objs = dict.fromkeys(entries)
+        # name -> metadata of entries not created yet
+        self._meta = entries
+
+    def __getitem__(self, name):
+        obj = self._objs[name]
+        if obj is None:
+            obj = self._loader(name, self._meta.pop(name))
+            self._objs[name] = obj
+        return obj
+
+    def __setitem__(self, name, obj):
+        self._meta.pop(name, None)
+        self._objs[name] = obj
+
+    def __delitem__(self, name):
+        del self._objs[name]
+        self._meta.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._objs
+
+    def __iter__(self):
+        return iter(self._objs)
+
+    def __len__(self):
+        return len(self._objs)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+class _DeferredWrites(object):
+    # Private context manager of the deferred write mode of a `File`, see
+    # File.deferred_writes. It holds the requests posted since the last flush
+    # and the size of their write data.
+    def __init__(self, file, max_bytes, max_requests, copy):
+        self.file = file
+        self.max_bytes = max_bytes
+        self.max_requests = max_requests
+        self.copy = copy
+        self.requests = []
+        self.nbytes = 0
+
+    def __enter__(self):
+        if self.file._deferred is not None:
+            raise RuntimeError("deferred write mode is already enabled")
+        self.file._deferred = self
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        if self.file._deferred is not self:
+            # the file was closed in the block
+            return
+        try:
+            # after an exception, the pending requests are left to
+            # File.wait_all or File.cancel, as the other processes may not
+            # take part in a collective flush
+            if atype is None:
+                self.file._flush_deferred()
+        finally:
+            self.file._deferred = None
+
+    def flush(self):
+        """Flush the pending deferred writes."""
+        if self.file._deferred is self:
+            self.file._flush_deferred()
+
+class _AutoBuffer(object):
+    # Private state of the self-managing attached buffer of a `File`, see
+    # File.auto_buff and File._reserve_buff.
+    def __init__(self, init_size, max_size):
+        self.init_size = init_size
+        self.max_size = max_size
+        self.size = init_size
+        self.largest = init_size
+        # highest usage since the buffer was last empty, and overall
+        self.peak = 0
+        self.high_water = 0
+        self.flushes = 0
+        self.resizes = 0
+        self.spills = 0
+
+class _ReadCache(object):
+    # Private LRU cache of the blocks of variables read in independent data
+    # mode, see File.cache_reads and Variable._cached_get. The blocks are
+    # keyed by variable ID and block index.
+    def __init__(self, max_bytes, block_shape):
+        self.max_bytes = max_bytes
+        self.block_shape = block_shape
+        self.blocks = OrderedDict()
+        # the keys of the blocks cached, and the block shape, by variable ID
+        self.keys = {}
+        self.shapes = {}
+        self.nbytes = 0
+        # IDs of the variables written by pending nonblocking requests
+        self.writing = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypasses = 0
+
+    def shape(self, var, dimlens):
+        # the block shape of a variable of dimension lengths dimlens
+        shape = self.shapes.get(var._varid)
+        if shape is None:
+            if self.block_shape is None:
+                row = var.dtype.itemsize
+                for n in dimlens[1:]:
+                    row *= max(n, 1)
+                lead = (max(_READ_CACHE_BLOCK // row, 1),)
+            else:
+                lead = self.block_shape[:len(dimlens)]
+            shape = lead + tuple(max(n, 1) for n in dimlens[len(lead):])
+            self.shapes[var._varid] = shape
+        return shape
+
+    def get(self, key):
+        block = self.blocks.get(key)
+        if block is not None:
+            self.blocks.move_to_end(key)
+        return block
+
+    def put(self, key, block):
+        self.misses += 1
+        self.pop(key)
+        self.blocks[key] = block
+        self.keys.setdefault(key[0], set()).add(key)
+        self.nbytes += block.nbytes
+        while self.nbytes > self.max_bytes and len(self.blocks) > 1:
+            self.pop(next(iter(self.blocks)))
+            self.evictions += 1
+
+    def pop(self, key):
+        block = self.blocks.pop(key, None)
+        if block is not None:
+            self.nbytes -= block.nbytes
+            self.keys[key[0]].discard(key)
+        return block
+
+    def invalidate(self, varid):
+        for key in self.keys.pop(varid, ()):
+            self.nbytes -= self.blocks.pop(key).nbytes
+            self.invalidations += 1
+
+    def post(self, varid):
+        # a nonblocking write of variable varid is posted
+        self.invalidate(varid)
+        self.writing.add(varid)
+
+    def cacheable(self, file, varid):
+        # whether the reads of variable varid can be cached, i.e. it has no
+        # pending nonblocking writes, given the file
+        if self.writing and not file._pending_puts():
+            self.writing.clear()
+        return varid not in self.writing
+
+    def clear(self):
+        self.blocks.clear()
+        self.keys.clear()
+        self.nbytes = 0
+
+class _BatchReads(object):
+    # Private context manager of the batch of lazy reads of a `File`, see
+    # File.batch_reads. It holds the read requests posted by Variable.lazy
+    # since they were last completed.
+    def __init__(self, file):
+        self.file = file
+        self.requests = []
+
+    def __enter__(self):
+        if self.file._batch is not None:
+            raise RuntimeError("batch reads are already enabled")
+        self.file._batch = self
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        if self.file._batch is not self:
+            # the file was closed in the block
+            return
+        try:
+            # after an exception, the pending requests are completed when a
+            # placeholder is accessed, as the other processes may not take
+            # part in a collective wait
+            if atype is None:
+                self.resolve()
+        finally:
+            self.file._batch = None
+
+    def resolve(self):
+        """Complete the pending read requests of the batch."""
+        requests = self.requests
+        self.requests = []
+        # errors of the requests are raised when their placeholders are
+        # accessed
+        self.file._wait(requests, collective=not self.file.indep_mode)
+
+cdef _get_dims(File file):
+    # Private method to index all the dimensions in a `File` by name and ID.
+    # `Dimension` instances are created on first access.
     cdef int ierr, numdims, n, _file_id
-    cdef int *dimids
     cdef char namstring[NC_MAX_NAME+1]
     # get number of dimensions in this file.
     _file_id = file._ncid
     with nogil:
         ierr = ncmpi_inq_ndims(_file_id, &numdims)
     _check_err(ierr)
-    # create empty dictionary for dimensions.
-    dimensions = dict()
-    if numdims > 0:
-        dimids = <int *>malloc(sizeof(int) * numdims)
-        for n from 0 <= n < numdims:
-            dimids[n] = n
-        for n from 0 <= n < numdims:
-            with nogil:
-                ierr = ncmpi_inq_dimname(_file_id, dimids[n], namstring)
-            _check_err(ierr)
-            name = namstring.decode('utf-8')
-            dimensions[name] = Dimension(file = file, name = name, id=dimids[n])
-        free(dimids)
-    return dimensions
-
-cdef _get_variables(file):
-    # Private method to create `Variable` instances for all the
-    # variables in a `File`
-    cdef int ierr, numvars, n, nn, numdims, varid, classp, iendian, _file_id
-    cdef int *varids
-    cdef int *dimids
+    entries = dict()
+    # dimension IDs are 0, 1, ... numdims-1
+    for n from 0 <= n < numdims:
+        with nogil:
+            ierr = ncmpi_inq_dimname(_file_id, n, namstring)
+        _check_err(ierr)
+        name = namstring.decode('utf-8')
+        entries[name] = n
+        file._dimnames[n] = name
+    return _MetadataDict(file._load_dimension, entries)
+
+cdef _get_variables(File file):
+    # Private method to build the metadata table (ID, type and dimension IDs)
+    # of all the variables in a `File` in a single pass over the file header.
+    # `Variable` instances are created on first access.
+    cdef int ierr, numvars, numdims, varid, n, _file_id
+    cdef int dimids[NC_MAX_VAR_DIMS]
     cdef nc_type xtype
     cdef char namstring[NC_MAX_NAME+1]
-    cdef char namstring_cmp[NC_MAX_NAME+1]
     # get number of variables in this File.
     _file_id = file._ncid
     with nogil:
         ierr = ncmpi_inq_nvars(_file_id, &numvars)
     _check_err(ierr, err_cls=AttributeError)
-    # create empty dictionary for variables.
-    variables = dict()
-    if numvars > 0:
-        # get variable ids.
-        varids = <int *>malloc(sizeof(int) * numvars)
-        for n from 0 <= n < numvars:
-            varids[n] = n
-        # loop over variables.
-        for n from 0 <= n < numvars:
-            varid = varids[n]
-            # get variable name.
-            with nogil:
-                ierr = ncmpi_inq_varname(_file_id, varid, namstring)
-            _check_err(ierr)
-            name = namstring.decode('utf-8')
-            # get variable type.
-            with nogil:
-                ierr = ncmpi_inq_vartype(_file_id, varid, &xtype)
-            _check_err(ierr)
-            # check to see if it is a supported user-defined type.
-            try:
-                datatype = _nctonptype[xtype]
-            except KeyError:
-                msg="WARNING: variable '%s' has unsupported datatype, skipping .." % name
-                warnings.warn(msg)
-                continue
-            # get number of dimensions.
-            with nogil:
-                ierr = ncmpi_inq_varndims(_file_id, varid, &numdims)
-            _check_err(ierr)
-            dimids = <int *>malloc(sizeof(int) * numdims)
-            # get dimension ids.
-            with nogil:
-                ierr = ncmpi_inq_vardimid(_file_id, varid, dimids)
-            _check_err(ierr)
-            dimensions = []
-            for nn from 0 <= nn < numdims:
-                for key, value in file.dimensions.items():
-                    if value._dimid == dimids[nn]:
-                        dimensions.append(value)
-                        break
-            # create variable instance
-            variables[name] = Variable(file, name, xtype, dimensions, id=varid)
-        free(varids) # free pointer holding variable ids.
-    return variables
+    entries = dict()
+    for varid from 0 <= varid < numvars:
+        # get variable name, type, number of dimensions and dimension ids.
+        with nogil:
+            ierr = ncmpi_inq_var(_file_id, varid, namstring, &xtype, &numdims, dimids, NULL)
+        _check_err(ierr)
+        name = namstring.decode('utf-8')
+        # check to see if it is a supported user-defined type.
+        if xtype not in _nctonptype:
+            msg="WARNING: variable '%s' has unsupported datatype, skipping .." % name
+            warnings.warn(msg)
+            continue
+        entries[name] = (varid, xtype, tuple([dimids[n] for n in range(numdims)]))
+    return _MetadataDict(file._load_variable, entries)
 
 cdef class Dataset(File):
     pass
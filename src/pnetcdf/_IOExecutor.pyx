@@ -0,0 +1,372 @@
+###############################################################################
+#
+#  Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+#  See COPYRIGHT notice in top-level directory.
+#
+###############################################################################
+
+from ._utils cimport _check_err
+from ._utils import _thread_level_names
+from concurrent.futures import Future
+from mpi4py import MPI
+import numpy as np
+import queue
+import threading
+
+
+class _PendingIO(object):
+    # a put or get queued to an IOExecutor, posted at the next wait of its file
+    __slots__ = ('variable', 'put', 'data', 'start', 'count', 'future')
+
+    def __init__(self, variable, put, data, start, count, future):
+        self.variable = variable
+        self.put = put
+        self.data = data
+        self.start = start
+        self.count = count
+        self.future = future
+
+
+# the queue of the operations carried out by the I/O thread, shared by all
+# IOExecutor instances not funneled and by the asynchronous operations of
+# File and Variable, so that PnetCDF is called by one thread at a time
+_io_queue = None
+_io_thread = None
+_io_lock = threading.Lock()
+
+def _shared_queue():
+    # return the queue of the I/O thread, started on first use
+    global _io_queue, _io_thread
+    with _io_lock:
+        if _io_queue is None:
+            _io_queue = queue.SimpleQueue()
+            _io_thread = threading.Thread(target=_serve, args=(_io_queue, None),
+                                          name="pnetcdf-io", daemon=True)
+            _io_thread.start()
+    return _io_queue
+
+def _serve(q, stop):
+    # carry out the operations of the executors feeding q until the
+    # shutdown of executor stop, forever if stop is None
+    while True:
+        executor, op, args, future = q.get()
+        if op is None:
+            # shutdown of executor
+            executor._fail_pending()
+            executor._done.set()
+            if executor is stop:
+                return
+            continue
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            op(future, *args)
+        except BaseException as e:
+            future.set_exception(e)
+
+
+class IOExecutor(object):
+    """
+    An ``IOExecutor`` carries out the PnetCDF operations submitted by any
+    thread of a program in a single I/O thread, one after another in the
+    order they are submitted, and returns a
+    :class:`concurrent.futures.Future` for each of them. As only one thread
+    calls PnetCDF and MPI at a time, a multithreaded program only needs MPI
+    thread support level ``MPI_THREAD_SERIALIZED``, in which case the
+    executor runs its own thread, or ``MPI_THREAD_FUNNELED``, in which case
+    the main thread carries out the operations by calling
+    :meth:`IOExecutor.serve`. The other threads keep computing while the
+    I/O is in progress. All executors owning a thread share the same I/O
+    thread, also used by :meth:`File.wait_all_async`,
+    :meth:`Variable.aget` and :meth:`Variable.aput`, so PnetCDF is never
+    called by two of them at the same time.
+
+    Reads and writes submitted by :meth:`IOExecutor.get` and
+    :meth:`IOExecutor.put` are queued until a :meth:`IOExecutor.wait_all`
+    (or :meth:`IOExecutor.wait`) of their file is carried out. All the queued
+    requests to the same variable are then merged into a single
+    :meth:`Variable.iput_varn` or :meth:`Variable.iget_varn` request, and
+    the requests of all variables are completed by a single call to
+    :meth:`File.wait_all`.
+
+    .. note:: Collective operations, including :meth:`IOExecutor.wait_all`
+        and the operations carried out on files in collective data mode,
+        must be submitted in the same order on all processes, and programs
+        must not call PnetCDF or MPI outside the executor while it runs.
+
+    :Example:
+
+     ::
+
+       with pnetcdf.IOExecutor() as ex:
+           # in any thread
+           ex.put(v, buf, start = [step, rank, 0], count = [1, 1, xdim])
+           fut = ex.get(t, start = [step])
+           ex.wait_all(f).result()
+           print(fut.result())
+    """
+    def __init__(self, funneled=None):
+        """
+        __init__(self, funneled=None)
+
+        The constructor for :class:`pnetcdf.IOExecutor`.
+
+        :param funneled: [Optional]
+            Whether the operations are carried out by the main thread in
+            :meth:`IOExecutor.serve`, as required by thread support level
+            ``MPI_THREAD_FUNNELED``, instead of the shared I/O thread. By
+            default, the operations are carried out by the I/O thread if MPI
+            provides ``MPI_THREAD_SERIALIZED`` or higher.
+        :type funneled: bool
+
+        :raises RuntimeError: If MPI does not provide the thread support
+            level required.
+        """
+        level = MPI.Query_thread()
+        if funneled is None:
+            funneled = level < MPI.THREAD_SERIALIZED
+        required = MPI.THREAD_FUNNELED if funneled else MPI.THREAD_SERIALIZED
+        if level < required:
+            raise RuntimeError("IOExecutor requires MPI thread support level %s or higher, "
+                               "but MPI provides %s" % (_thread_level_names[required],
+                               _thread_level_names.get(level, level)))
+        self.funneled = funneled
+        self._queue = queue.SimpleQueue() if funneled else _shared_queue()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        # set once the operations submitted before shutdown are carried out
+        self._done = threading.Event()
+        # queued puts and gets of each file, accessed by the I/O thread only
+        self._pending = {}
+
+    def _submit(self, op, args):
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit operations after IOExecutor.shutdown")
+            self._queue.put((self, op, args, future))
+        return future
+
+    def submit(self, func, *args, **kwargs):
+        """
+        submit(self, func, *args, **kwargs)
+
+        Call ``func(*args, **kwargs)`` in the I/O thread, e.g. a blocking read
+        or write method of :class:`pnetcdf.Variable` or :meth:`File.sync`.
+
+        :return: A future whose result is the value returned by `func`.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        return self._submit(self._call, (func, args, kwargs))
+
+    def put(self, variable, data, start=None, count=None):
+        """
+        put(self, variable, data, start=None, count=None)
+
+        Queue a write of `data` to the subarray of `variable` given by `start`
+        and `count`, same as :meth:`Variable.iput_var`. The write is carried
+        out by the next :meth:`IOExecutor.wait_all` or :meth:`IOExecutor.wait`
+        of the file of `variable`. The contents of `data` must not be
+        modified until then.
+
+        :param variable: The variable to write.
+        :type variable: :class:`pnetcdf.Variable`
+
+        :param data: The numpy array to write, of ``numpy.prod(count)``
+            elements.
+        :type data: numpy.ndarray
+
+        :param start: [Optional] The starting indices of the subarray. The
+            entire variable is written when it is None.
+        :type start: list of int
+
+        :param count: [Optional] The lengths of the subarray along each
+            dimension. A single element is written when it is None.
+        :type count: list of int
+
+        :return: A future whose result is None once the data is written.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        return self._submit(self._queue_io, (variable, True, data, start, count))
+
+    def get(self, variable, start=None, count=None):
+        """
+        get(self, variable, start=None, count=None)
+
+        Queue a read of the subarray of `variable` given by `start` and
+        `count`, carried out by the next :meth:`IOExecutor.wait_all` or
+        :meth:`IOExecutor.wait` of the file of `variable`.
+
+        :param variable: The variable to read.
+        :type variable: :class:`pnetcdf.Variable`
+
+        :param start: [Optional] The starting indices of the subarray. The
+            entire variable is read when it is None.
+        :type start: list of int
+
+        :param count: [Optional] The lengths of the subarray along each
+            dimension. A single element is read when it is None.
+        :type count: list of int
+
+        :return: A future whose result is a numpy array of shape `count`
+            holding the data read.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        return self._submit(self._queue_io, (variable, False, None, start, count))
+
+    def wait_all(self, file):
+        """
+        wait_all(self, file)
+
+        Post the reads and writes queued to `file`, merged by variable, and
+        complete them by :meth:`File.wait_all`.
+
+        :param file: The file whose queued requests are completed.
+        :type file: :class:`pnetcdf.File`
+
+        :return: A future whose result is None once the requests complete.
+            Errors of individual requests are set to their own futures.
+        :rtype: :class:`concurrent.futures.Future`
+
+        :Operational mode: it is an collective subroutine and the file must be
+            in collective data mode when it is carried out.
+        """
+        return self._submit(self._wait, (file, True))
+
+    def wait(self, file):
+        """
+        wait(self, file)
+
+        Same as :meth:`IOExecutor.wait_all` but calls :meth:`File.wait`, in
+        independent data mode.
+
+        :Operational mode: it is an independent subroutine and the file must
+            be in independent data mode when it is carried out.
+        """
+        return self._submit(self._wait, (file, False))
+
+    def serve(self):
+        """
+        serve(self)
+
+        Carry out the submitted operations in the calling thread, which must
+        be the main thread, until :meth:`IOExecutor.shutdown` is called. Only
+        used when the executor is created with ``funneled=True``.
+        """
+        if not self.funneled:
+            raise RuntimeError("IOExecutor.serve is only used by funneled executors")
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("IOExecutor.serve must be called by the main thread")
+        _serve(self._queue, self)
+
+    def shutdown(self, wait=True):
+        """
+        shutdown(self, wait=True)
+
+        Stop accepting operations. The operations already submitted are
+        carried out before :meth:`IOExecutor.serve` returns, or by the I/O
+        thread, which keeps running for the other executors. Reads and
+        writes not followed by a wait of their file fail with a
+        ``RuntimeError``.
+
+        :param bool wait: Whether to wait for the operations already
+            submitted to be carried out. Not used by funneled executors.
+        """
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                self._queue.put((self, None, None, None))
+        if wait and not self.funneled and \
+           threading.current_thread() is not _io_thread:
+            self._done.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=True)
+
+    def _fail_pending(self):
+        # reads and writes never waited for
+        for ops in self._pending.values():
+            for io in ops:
+                io.future.set_exception(RuntimeError("IOExecutor shut down before "
+                                        "a wait of the file of the request"))
+        self._pending.clear()
+
+    def _call(self, future, func, args, kwargs):
+        future.set_result(func(*args, **kwargs))
+
+    def _queue_io(self, future, variable, put, data, start, count):
+        self._pending.setdefault(variable._file, []).append(
+            _PendingIO(variable, put, data, start, count, future))
+
+    def _wait(self, future, file, collective):
+        ops = self._pending.pop(file, [])
+        # merge the requests of the same variable, direction and data type
+        groups = {}
+        for io in ops:
+            try:
+                if io.start is None:
+                    shape = io.variable.shape
+                    io.start, io.count = [0] * len(shape), list(shape)
+                elif io.count is None:
+                    io.count = [1] * len(io.start)
+                if io.put:
+                    io.data = np.asarray(io.data)
+                    if io.data.size != np.prod(io.count):
+                        raise ValueError("size of data array does not conform to count")
+                    dtype = io.data.dtype
+                else:
+                    dtype = io.variable.dtype
+            except BaseException as e:
+                io.future.set_exception(e)
+                continue
+            groups.setdefault((id(io.variable), io.put, dtype), []).append(io)
+
+        posted = []
+        for (key, put, dtype), group in groups.items():
+            variable = group[0].variable
+            starts = [io.start for io in group]
+            counts = [io.count for io in group]
+            try:
+                if put:
+                    if len(group) == 1:
+                        buf = group[0].data
+                    else:
+                        buf = np.concatenate([io.data.ravel() for io in group])
+                    req = variable.iput_varn(buf, len(group), starts, counts)
+                else:
+                    buf = np.empty(sum(int(np.prod(c)) for c in counts), dtype)
+                    req = variable.iget_varn(buf, len(group), starts, counts)
+            except BaseException as e:
+                for io in group:
+                    io.future.set_exception(e)
+                continue
+            posted.append((req, group, buf))
+
+        try:
+            file._wait([req for req, group, buf in posted], collective=collective)
+        except BaseException as e:
+            # the error codes of the failed requests are set below
+            if not any(req.status is not None for req, group, buf in posted):
+                for req, group, buf in posted:
+                    for io in group:
+                        io.future.set_exception(e)
+                raise
+        for req, group, buf in posted:
+            try:
+                _check_err(req.status)
+            except BaseException as e:
+                for io in group:
+                    io.future.set_exception(e)
+                continue
+            offset = 0
+            for io in group:
+                if io.put:
+                    io.future.set_result(None)
+                else:
+                    n = int(np.prod(io.count))
+                    io.future.set_result(buf[offset:offset + n].reshape(io.count))
+                    offset += n
+        future.set_result(None)
@@ -0,0 +1,234 @@
+###############################################################################
+#
+#  Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+#  See COPYRIGHT notice in top-level directory.
+#
+###############################################################################
+
+from ._utils cimport _check_err
+import numpy as np
+import time
+
+
+class RecordWriter(object):
+    """
+    A ``RecordWriter`` writes one record per time step to a set of record
+    variables, i.e. variables whose first dimension is unlimited, with double
+    buffering. :meth:`RecordWriter.write` copies the data of a step into one
+    of two staging buffers, which are used in turns, and posts nonblocking
+    write requests of the step. The requests of a step are completed when the
+    next step is written, so the caller can compute the next step while the
+    write of the previous one is pending.
+
+    As PnetCDF carries out nonblocking requests when they are waited for, the
+    I/O only overlaps the computation when the writes are completed by the
+    I/O thread of an :class:`pnetcdf.IOExecutor`, given as `executor`.
+    Otherwise, the requests of all the variables of a step are completed by a
+    single call to :meth:`File.wait_all` in the next call to
+    :meth:`RecordWriter.write`.
+
+    :Example:
+
+     ::
+
+       # each process writes its row of the records of 'temp' and 'pres'
+       sub = ([rank, 0], [1, nx])
+       with pnetcdf.RecordWriter(f, {'temp': sub, 'pres': sub}) as w:
+           for step in range(nsteps):
+               temp, pres = compute(step)
+               w.write({'temp': temp, 'pres': pres})
+    """
+    def __init__(self, file, variables, record=None, buffered=False, executor=None):
+        """
+        __init__(self, file, variables, record=None, buffered=False, executor=None)
+
+        The constructor for :class:`pnetcdf.RecordWriter`.
+
+        :param file: The file to write, in data mode.
+        :type file: :class:`pnetcdf.File`
+
+        :param variables: The record variables written at each step, given
+            by name or as :class:`pnetcdf.Variable`. When this process writes
+            a subarray of each record, a dictionary mapping the variables to
+            tuples ``(start, count)``, the starting indices and lengths of the
+            subarray along the dimensions other than the record dimension.
+            Otherwise, the entire records are written.
+        :type variables: list or dict
+
+        :param int record: [Optional] The index of the first record to write.
+            Default is the current number of records of the file.
+
+        :param bool buffered: [Optional] Whether the writes are posted by
+            :meth:`Variable.bput_var`, which copies the data into a buffer
+            attached by :meth:`File.attach_buff` for two steps, instead of
+            :meth:`Variable.iput_var` from staging buffers. The buffer is
+            detached by :meth:`RecordWriter.close`. Default is False.
+
+        :param executor: [Optional] The executor whose I/O thread posts and
+            completes the writes of each step, so that they overlap the
+            computation of the next step. It cannot be used with
+            ``buffered=True``.
+        :type executor: :class:`pnetcdf.IOExecutor`
+
+        :Operational mode: The methods of ``RecordWriter`` are collective when
+            the file is in collective data mode, i.e. all processes must write
+            the same number of steps.
+        """
+        if buffered and executor is not None:
+            raise ValueError("buffered and executor cannot be used together")
+        self.file = file
+        if not isinstance(variables, dict):
+            variables = dict.fromkeys(variables)
+        if not variables:
+            raise ValueError("no variable to write")
+        self.variables = []
+        # the start and count of the subarray of a record written, by variable
+        self._starts = []
+        self._shapes = []
+        for v, sub in variables.items():
+            if isinstance(v, str):
+                v = file.variables[v]
+            dims = v.get_dims()
+            if len(dims) == 0 or not dims[0].isunlimited():
+                raise ValueError("variable %s is not a record variable" % v.name)
+            if sub is None:
+                sub = ([0] * (len(dims) - 1), v.shape[1:])
+            start, count = sub
+            if len(start) != len(dims) - 1 or len(count) != len(dims) - 1:
+                raise ValueError("start and count of variable %s must have %d elements" %
+                                 (v.name, len(dims) - 1))
+            self.variables.append(v)
+            self._starts.append([0] + list(start))
+            self._shapes.append((1,) + tuple(count))
+        self.record = self.variables[0].shape[0] if record is None else record
+        self.buffered = buffered
+        self.executor = executor
+        # the staging buffers of each variable, used in turns
+        self._staging = None
+        if not buffered:
+            self._staging = [[np.empty(shape, v.dtype) for v, shape in zip(self.variables, self._shapes)]
+                             for slot in range(2)]
+        else:
+            nbytes = sum(int(np.prod(shape)) * v.dtype.itemsize
+                         for v, shape in zip(self.variables, self._shapes))
+            # the space of a request in the buffer is rounded up
+            file.attach_buff(2 * (nbytes + 8 * len(self.variables)))
+        # the pending requests (or the future of the executor) of the last
+        # two steps, by staging buffer
+        self._pending = [None, None]
+        self._slot = 0
+        self.steps = 0
+        # time spent by the caller waiting for the writes to complete
+        self.wait_time = 0.0
+        self._closed = False
+
+    def write(self, data):
+        """
+        write(self, data)
+
+        Write a record of each variable. The data is copied (or, with
+        ``buffered=True``, copied by :meth:`Variable.bput_var`), so the arrays
+        can be modified once the method returns. The writes of the previous
+        step are completed first, unless they are carried out by the
+        executor.
+
+        :param data: The data of each variable, by variable name, of the
+            shape of the subarray of a record written.
+        :type data: dict
+
+        :return: The index of the record written.
+        :rtype: int
+        """
+        if self._closed:
+            raise RuntimeError("RecordWriter is closed")
+        if len(data) != len(self.variables):
+            unknown = set(data) - set(v.name for v in self.variables)
+            raise KeyError("data must be given for all variables and no other, got %s" %
+                           (sorted(unknown) if unknown else sorted(data)))
+        slot = self._slot
+        # the staging buffers of this slot were used two steps ago
+        self._complete(slot)
+        record = self.record
+        if self.buffered:
+            arrays = [np.asarray(data[v.name]) for v in self.variables]
+        else:
+            arrays = self._staging[slot]
+            for v, buf in zip(self.variables, arrays):
+                np.copyto(buf, np.reshape(data[v.name], buf.shape), casting='same_kind')
+        if self.executor is not None:
+            self._pending[slot] = self.executor.submit(self._write_step, record, arrays)
+        else:
+            self._pending[slot] = self._post(record, arrays)
+            # complete the previous step, while this one stays pending
+            self._complete(1 - slot)
+        self._slot = 1 - slot
+        self.record += 1
+        self.steps += 1
+        return record
+
+    def flush(self):
+        """
+        flush(self)
+
+        Complete the writes of all the steps written.
+        """
+        # the older step first
+        self._complete(self._slot)
+        self._complete(1 - self._slot)
+
+    def close(self):
+        """
+        close(self)
+
+        Complete the pending writes, and detach the buffer attached when
+        ``buffered=True``. It is called at the exit of a ``with`` block.
+        """
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self.buffered:
+            self.file.detach_buff()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        if atype is None:
+            self.close()
+
+    def _post(self, record, arrays):
+        requests = []
+        for v, buf, start, shape in zip(self.variables, arrays, self._starts, self._shapes):
+            start = [record] + start[1:]
+            if self.buffered:
+                requests.append(v.bput_var(buf.reshape(shape), start=start, count=list(shape)))
+            else:
+                requests.append(v.iput_var(buf, start=start, count=list(shape)))
+        return requests
+
+    def _wait(self, requests):
+        if self.file.indep_mode:
+            self.file.wait(requests)
+        else:
+            self.file.wait_all(requests)
+        for req in requests:
+            _check_err(req.status)
+
+    def _write_step(self, record, arrays):
+        # run by the I/O thread of the executor
+        self._wait(self._post(record, arrays))
+
+    def _complete(self, slot):
+        pending = self._pending[slot]
+        if pending is None:
+            return
+        self._pending[slot] = None
+        t = time.perf_counter()
+        try:
+            if self.executor is not None:
+                pending.result()
+            else:
+                self._wait(pending)
+        finally:
+            self.wait_time += time.perf_counter() - t
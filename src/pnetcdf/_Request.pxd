@@ -0,0 +1,29 @@
+###############################################################################
+#
+#  Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+#  See COPYRIGHT notice in top-level directory.
+#
+###############################################################################
+
+from ._File cimport File
+
+cdef class Request:
+    cdef public File _file
+    # request ID, set to NC_REQ_NULL by PnetCDF when the request completes
+    cdef int _reqid
+    # the user buffer of the request, kept alive while the request is pending
+    cdef object _buffer
+    cdef readonly bint put
+    # error code of the completed request, None while pending
+    cdef object _status
+    cdef _complete(self, int reqid, int status)
+
+cdef class LazyArray:
+    # the batch of File.batch_reads the read request is posted in
+    cdef object _batch
+    cdef Request _request
+    # function converting the buffer of the request into the value, None
+    # once the value has been computed
+    cdef object _finalize
+    cdef object _value
+    cdef readonly object shape, dtype
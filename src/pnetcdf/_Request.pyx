@@ -0,0 +1,215 @@
+###############################################################################
+#
+#  Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+#  See COPYRIGHT notice in top-level directory.
+#
+###############################################################################
+
+from ._File cimport File
+
+include "PnetCDF.pxi"
+
+from ._utils cimport _check_err
+import operator
+import numpy as np
+
+
+cdef class Request:
+    def __init__(self, File file, int reqid, buffer, bint put):
+        """
+        __init__(self, File file, int reqid, buffer, bint put)
+
+        The constructor for :class:`pnetcdf.Request`.
+
+        :param file: The :class:`pnetcdf.File` instance the request is posted to.
+        :type file: :class:`pnetcdf.File`
+
+        :param int reqid: The request ID returned by PnetCDF.
+
+        :param buffer: The numpy array used by the request, which is kept
+            alive until the request completes. None for buffered write
+            requests, whose data is copied into the attached buffer.
+
+        :param bool put: True for a write request, False for a read request.
+
+        .. note:: ``Request`` instances are returned by the nonblocking
+            methods of :class:`pnetcdf.Variable`, such as
+            :meth:`Variable.iput_var`, :meth:`Variable.iget_var` and
+            :meth:`Variable.bput_var`, and should not be created directly.
+        """
+        self._file = file
+        self._reqid = reqid
+        self._buffer = buffer
+        self.put = put
+        self._status = None
+
+    cdef _complete(self, int reqid, int status):
+        # called by File when the request is completed by a wait or a cancel
+        self._reqid = reqid
+        self._status = status
+
+    def __int__(self):
+        return self._reqid
+
+    def __index__(self):
+        return self._reqid
+
+    def __eq__(self, other):
+        # a request compares equal to its integer request ID, which becomes
+        # NC_REQ_NULL once it completes
+        if isinstance(other, Request):
+            return self is other
+        try:
+            return self._reqid == operator.index(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self):
+        # as the request ID changes when the request completes, a request
+        # cannot hash equal to the integers it compares equal to
+        raise TypeError("unhashable type: 'Request'")
+
+    def __repr__(self):
+        state = "pending" if self._status is None else "completed, status %d" % self._status
+        return "<%s request %d (%s)>" % ("write" if self.put else "read", self._reqid, state)
+
+    property id:
+        """The request ID, ``pnetcdf.NC_REQ_NULL`` once completed successfully."""
+        def __get__(self):
+            return self._reqid
+
+    property buffer:
+        """The numpy array read into or written from by the request."""
+        def __get__(self):
+            return self._buffer
+
+    property status:
+        """The error code of the completed request (``pnetcdf.NC_NOERR`` on
+        success), which can be given to :meth:`pnetcdf.strerror`, or None
+        while the request is pending."""
+        def __get__(self):
+            return self._status
+
+    def test(self):
+        """
+        test(self)
+
+        Check, without blocking, whether the request has completed, i.e.
+        whether it has been committed by :meth:`Request.wait`,
+        :meth:`File.wait_all`, :meth:`File.wait` or cancelled by
+        :meth:`File.cancel`. PnetCDF carries out pending requests only in
+        these calls.
+
+        :rtype: bool
+        """
+        return self._status is not None
+
+    def wait(self):
+        """
+        wait(self)
+
+        Wait for the completion of this request. When the file is in
+        collective data mode, this method calls :meth:`File.wait_all` and is
+        collective, i.e. all processes must call it (processes with no request
+        to complete can call :meth:`File.wait_all` with an empty list).
+        In independent data mode, it calls :meth:`File.wait`. It returns
+        immediately if the request has already completed.
+
+        :return: The error code of the request, ``pnetcdf.NC_NOERR`` on success.
+        :rtype: int
+        """
+        if self._status is None:
+            self._file._wait(1, [self], collective = not self._file.indep_mode)
+        return self._status
+
+
+cdef class LazyArray:
+    """
+    A ``LazyArray`` is a placeholder of the data read by the indexer
+    :attr:`Variable.lazy` in :meth:`File.batch_reads`. Its data is read by a
+    nonblocking request, resolved together with the other pending requests of
+    the batch by a single call to :meth:`File.wait_all` when the batch ends or
+    when the data of a ``LazyArray`` of the batch is first accessed, e.g. by
+    ``numpy.asarray``, indexing or :attr:`LazyArray.value`.
+
+    .. note:: ``LazyArray`` instances are returned by :attr:`Variable.lazy`
+        and should not be created directly. In collective data mode,
+        accessing the data of a pending ``LazyArray`` calls
+        :meth:`File.wait_all` and is collective.
+    """
+    def __init__(self, batch, Request request, shape, dtype, finalize):
+        self._batch = batch
+        self._request = request
+        self.shape = shape
+        self.dtype = dtype
+        self._finalize = finalize
+        self._value = None
+
+    def resolve(self):
+        """
+        resolve(self)
+
+        Complete the pending read requests of the batch, if this array is
+        not resolved yet, and return its data.
+
+        :return: The data, same as returned by indexing the variable.
+        :rtype: numpy.ndarray
+        """
+        if self._finalize is not None:
+            buffer = None
+            # no request is posted for an empty selection
+            if self._request is not None:
+                if self._request.status is None:
+                    self._batch.resolve()
+                _check_err(self._request.status)
+                buffer = self._request.buffer
+            self._value = self._finalize(buffer)
+            self._finalize = None
+        return self._value
+
+    property value:
+        """The data, read from the file when first accessed, see
+        :meth:`LazyArray.resolve`."""
+        def __get__(self):
+            return self.resolve()
+
+    property resolved:
+        """Whether the read request of the array has completed."""
+        def __get__(self):
+            return self._finalize is None or self._request is None or \
+                   self._request.status is not None
+
+    property ndim:
+        """The number of dimensions of the array."""
+        def __get__(self):
+            return len(self.shape)
+
+    property size:
+        """The number of elements of the array."""
+        def __get__(self):
+            n = 1
+            for length in self.shape:
+                n *= length
+            return n
+
+    def __array__(self, dtype=None, copy=None):
+        value = np.asarray(self.resolve())
+        if dtype is not None and value.dtype != dtype:
+            return value.astype(dtype)
+        return value.copy() if copy else value
+
+    def __getitem__(self, elem):
+        return self.resolve()[elem]
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __repr__(self):
+        if self._finalize is None:
+            return "<LazyArray %r>" % (self._value,)
+        return "<LazyArray shape=%s, dtype=%s (pending)>" % (self.shape, self.dtype)
@@ -12,3 +12,26 @@ cdef class Variable:
     cdef public int _varid, _file_id, _nunlimdim
     cdef public File _file
     cdef public _name, ndim, dtype, xtype, chartostring
+    # dimension IDs and lengths, cached at construction. _recdim is the
+    # index of the unlimited dimension (-1 if none), whose length is the
+    # number of records cached by the File
+    cdef tuple _dimids, _dimlens
+    cdef int _recdim
+    cdef tuple _getshape(self)
+    cdef Py_ssize_t _dimlen(self, int i) except -1
+    # fast path of __getitem__ and __setitem__ for basic indexing
+    cdef tuple _basic_index(self, elem, bint put, size_t *startp, size_t *countp,
+                            ptrdiff_t *stridep, bint *strided, list rev)
+    cdef int _basic_io(self, data, bint put, bint collective, size_t *startp,
+                       size_t *countp, ptrdiff_t *stridep, bint strided) except -1
+    cdef _get_basic(self, elem)
+    cdef _cached_get(self, tuple shape, size_t *startp, size_t *countp,
+                     ptrdiff_t *stridep, list rev)
+    cdef int _put_basic(self, elem, data) except -1
+    # writes in the deferred write mode of the File, see File.deferred_writes
+    cdef bint _deferring(self, bint collective)
+    cdef _deferred_buffer(self, data)
+    # the attributes by name, read on first access and cleared when they are
+    # modified
+    cdef dict _atts
+    cdef dict _attributes(self)
@@ -16,17 +16,84 @@ cimport mpi4py.MPI as MPI
 from mpi4py.libmpi cimport MPI_Comm, MPI_Info, MPI_Comm_dup, MPI_Info_dup, \
                                MPI_Comm_free, MPI_Info_free, MPI_INFO_NULL,\
                                MPI_COMM_WORLD, MPI_Offset, MPI_DATATYPE_NULL
+from mpi4py.MPI import COMM_TYPE_SHARED, UNDEFINED
 from libc.stdlib cimport malloc, free
 from libc.string cimport memcpy, memset
+from cpython.slice cimport PySlice_GetIndicesEx
 from ._Dimension cimport Dimension
-from ._utils cimport _strencode, _check_err, _set_att, _get_att, _get_att_names, _tostr, _safecast, stringtochar
-from ._utils import chartostring
+from ._Request cimport LazyArray
+from ._utils cimport _strencode, _check_err, _set_att, _get_att, _get_atts, _cached_att, _tostr, _safecast, stringtochar, \
+                     _strided_buftype, _convertible, _buffer_type, _varn_offsets, _varn_table
+from ._utils import chartostring, _io_submit, _alloc_shared
 from ._utils cimport _nptonctype, _notcdf2dtypes, _nctonptype, _nptompitype, _supportedtypes, _supportedtypescdf2, \
-                     default_fillvals, _StartCountStride, _out_array_shape, _private_atts
+                     default_fillvals, _StartCountStride, _out_array_shape, _private_atts, \
+                     _orthogonal_varn
 
 cimport numpy
 numpy.import_array()
 
+# maximum number of dimensions of the variables whose basic indexing (integers,
+# slices and Ellipsis) is handled by the fast path of __getitem__/__setitem__,
+# which uses start/count/stride arrays allocated on the stack.
+cdef enum:
+    _MAX_FAST_NDIMS = 32
+
+cdef _reversed(arr, list rev):
+    # Return a view of arr with the axes listed in rev reversed.
+    if not rev:
+        return arr
+    sl = [slice(None)] * arr.ndim
+    for axis in rev:
+        sl[axis] = slice(None, None, -1)
+    return arr[tuple(sl)]
+
+cdef list _squeeze_index(put_ind, int ndim):
+    # Return the index removing the dimensions of the data read for the
+    # start, count and stride arrays of _StartCountStride which are indexed by
+    # an integer scalar. The convention used is that for those cases, put_ind
+    # for this dimension is set to -1 by _StartCountStride.
+    squeeze = ndim * [slice(None),]
+    for i,n in enumerate(put_ind.shape[:-1]):
+        if n == 1 and put_ind.size > 0 and put_ind[...,i].ravel()[0] == -1:
+            squeeze[i] = 0
+    return squeeze
+
+def _transfer_pieces(count, itemsize, limit):
+    # Split a subarray of lengths count, of elements of itemsize bytes, into
+    # pieces of at most limit bytes along the slowest varying dimensions.
+    # Return the index of the first element and the lengths of each piece,
+    # relative to the subarray. A single element larger than limit makes a
+    # piece on its own.
+    cdef int ndims = len(count)
+    if 0 in count:
+        return []
+    # the first dimension d whose blocks, i.e. the elements sharing the
+    # indices of the dimensions before d, fit in limit
+    d = ndims
+    nbytes = itemsize
+    while d > 0 and nbytes * count[d-1] <= limit:
+        d -= 1
+        nbytes *= count[d]
+    if d == 0:
+        return [([0] * ndims, list(count))]
+    # split dimension d-1 into runs of blocks, for each index of the
+    # dimensions before it
+    axis = d - 1
+    run = max(1, limit // nbytes)
+    pieces = []
+    for lead in np.ndindex(*count[:axis]):
+        for i in range(0, count[axis], run):
+            pieces.append((list(lead) + [i] + [0] * (ndims - d),
+                           [1] * axis + [min(run, count[axis] - i)] + list(count[d:])))
+    return pieces
+
+class _LazyIndexer(object):
+    # Private indexer returned by Variable.lazy
+    def __init__(self, var):
+        self._var = var
+
+    def __getitem__(self, elem):
+        return self._var._lazy_get(elem)
 
 
 
@@ -151,15 +218,21 @@ cdef class Variable:
             if ierr != NC_NOERR:
                 _check_err(ierr)
 
-        # count how many unlimited dimensions there are.
-        self._nunlimdim = 0
-        for dim in dimensions:
-            if dim.isunlimited(): self._nunlimdim = self._nunlimdim + 1
+        # cache dimension IDs and lengths of fixed-size dimensions. Only the
+        # length of the unlimited dimension can change.
+        self._recdim = -1
+        dimlens = []
+        for n, dim in enumerate(dimensions):
+            if dim._dimid == self._file._unlimdimid:
+                self._recdim = n
+                dimlens.append(0)
+            else:
+                dimlens.append(len(dim))
+        self._dimids = tuple([dim._dimid for dim in dimensions])
+        self._dimlens = tuple(dimlens)
+        self._nunlimdim = 1 if self._recdim >= 0 else 0
         # set ndim attribute (number of dimensions).
-        with nogil:
-            ierr = ncmpi_inq_varndims(_file_id, self._varid, &numdims)
-        _check_err(ierr)
-        self.ndim = numdims
+        self.ndim = len(self._dimids)
         self._name = name
 
         # default is to automatically convert to/from character
@@ -221,29 +294,27 @@ cdef class Variable:
         return '\n'.join(ncdump)
 
     def _getdims(self):
-        # Private method to get variable's dimension names
-        cdef int ierr, numdims, n, nn
-        cdef char namstring[NC_MAX_NAME+1]
-        cdef int *dimids
-        # get number of dimensions for this variable.
-        with nogil:
-            ierr = ncmpi_inq_varndims(self._file_id, self._varid, &numdims)
-        _check_err(ierr)
-        dimids = <int *>malloc(sizeof(int) * numdims)
-        # get dimension ids.
-        with nogil:
-            ierr = ncmpi_inq_vardimid(self._file_id, self._varid, dimids)
-        _check_err(ierr)
-        # loop over dimensions, retrieve names.
-        dimensions = ()
-        for nn from 0 <= nn < numdims:
-            with nogil:
-                ierr = ncmpi_inq_dimname(self._file_id, dimids[nn], namstring)
-            _check_err(ierr)
-            name = namstring.decode('utf-8')
-            dimensions = dimensions + (name,)
-        free(dimids)
-        return dimensions
+        # Private method to get variable's dimension names, looked up from the
+        # dimension names of the file indexed by dimension ID
+        dimnames = self._file._dimnames
+        return tuple([dimnames[dimid] for dimid in self._dimids])
+
+    cdef tuple _getshape(self):
+        # Private method to get variable's current shape. Only the number of
+        # records is retrieved from the file.
+        cdef list shape
+        if self._recdim < 0:
+            return self._dimlens
+        shape = list(self._dimlens)
+        shape[self._recdim] = self._file._get_numrecs()
+        return tuple(shape)
+
+    cdef Py_ssize_t _dimlen(self, int i) except -1:
+        # Private method to get the current length of the i-th dimension of
+        # the variable.
+        if i == self._recdim:
+            return self._file._get_numrecs()
+        return self._dimlens[i]
 
     def _getname(self):
         # Private method to get name associated with instance
@@ -270,12 +341,7 @@ cdef class Variable:
     property shape:
         """Find current sizes of all variable dimensions"""
         def __get__(self):
-            shape = ()
-            for dimname in self._getdims():
-                # look in current group, and parents for dim.
-                dim = self._file.dimensions[dimname]
-                shape = shape + (len(dim),)
-            return shape
+            return self._getshape()
         def __set__(self,value):
             raise AttributeError("shape cannot be altered")
 
@@ -290,6 +356,13 @@ cdef class Variable:
             return self._getdims()
         def __set__(self,value):
             raise AttributeError("dimensions cannot be altered")
+
+    property lazy:
+        """Indexer posting nonblocking reads in :meth:`File.batch_reads`.
+        ``var.lazy[...]`` takes the same indices as ``var[...]`` and returns
+        a :class:`pnetcdf.LazyArray` placeholder of the data."""
+        def __get__(self):
+            return _LazyIndexer(self)
     def file(self):
         """
         file(self)
@@ -300,6 +373,13 @@ cdef class Variable:
         """
         return self._file
 
+    cdef dict _attributes(self):
+        # the attributes of the variable, read in one pass on first access and
+        # cached until put_att, del_att, rename_att or def_fill modifies them
+        if self._atts is None:
+            self._atts = _get_atts(self._file, self._varid)
+        return self._atts
+
     def ncattrs(self):
         """
         ncattrs(self)
@@ -307,7 +387,7 @@ cdef class Variable:
         :return: all attribute names of this variable in a list.
         :rtype: list
         """
-        return _get_att_names(self._file_id, self._varid)
+        return list(self._attributes())
 
     def put_att(self,name,value):
         """
@@ -339,6 +419,7 @@ cdef class Variable:
         """
         cdef nc_type xtype
         xtype=-99
+        self._atts = None
         _set_att(self._file, self._varid, name, value, xtype=xtype)
 
 
@@ -371,7 +452,9 @@ cdef class Variable:
            str_att = v.foo_attr
 
         """
-        return _get_att(self._file, self._varid, name, encoding=encoding)
+        if encoding != 'utf-8':
+            return _get_att(self._file, self._varid, name, encoding=encoding)
+        return _cached_att(self._attributes(), name)
 
     def del_att(self, name):
         """
@@ -388,6 +471,7 @@ cdef class Variable:
         cdef char *attname
         bytestr = _strencode(name)
         attname = bytestr
+        self._atts = None
         with nogil:
             ierr = ncmpi_del_att(self._file_id, self._varid, attname)
         _check_err(ierr)
@@ -418,11 +502,8 @@ cdef class Variable:
         if name.startswith('__') and name.endswith('__'):
             # if __dict__ requested, return a dict with netCDF attributes.
             if name == '__dict__':
-                names = self.ncattrs()
-                values = []
-                for name in names:
-                    values.append(_get_att(self._file, self._varid, name))
-                return dict(zip(names, values))
+                atts = self._attributes()
+                return {name: _cached_att(atts, name) for name in atts}
 
             else:
                 raise AttributeError
@@ -451,6 +532,7 @@ cdef class Variable:
         oldnamec = bytestr
         bytestr = _strencode(newname)
         newnamec = bytestr
+        self._atts = None
         with nogil:
             ierr = ncmpi_rename_att(self._file_id, self._varid, oldnamec, newnamec)
         _check_err(ierr)
@@ -500,6 +582,8 @@ cdef class Variable:
         cdef ndarray data
         cdef int ierr, _no_fill
         _no_fill = no_fill
+        # the fill value is stored in attribute _FillValue
+        self._atts = None
         if fill_value is None:
             with nogil:
                 ierr = ncmpi_def_var_fill(self._file_id, self._varid, _no_fill, NULL)
@@ -546,6 +630,7 @@ cdef class Variable:
         """
         cdef int recno, ierr
         recno = rec_no
+        self._file._written(self._varid)
         with nogil:
             ierr = ncmpi_fill_var_rec(self._file_id, self._varid, recno)
         _check_err(ierr)
@@ -579,19 +664,31 @@ cdef class Variable:
         # "extended slice syntax". The extended slice syntax is a perfect match
         # for the "start", "count" and "stride" arguments to the C function
         # ncmpi_get_var(), and is much more easy to use.
+
+        if self._file._deferred is not None:
+            # read the data written by the pending deferred writes
+            self._file._flush_deferred()
+
+        # basic indexing (integers, slices and Ellipsis) is read directly by
+        # ncmpi_get_vara/vars
+        data = self._get_basic(elem)
+        if data is not None:
+            return data
+
         start, count, stride, put_ind =\
-        _StartCountStride(elem,self.shape,dimensions=self.dimensions,file=self._file)
+        _StartCountStride(elem,self._getshape())
         datashape = _out_array_shape(count)
         data = np.empty(datashape, dtype=self.dtype)
 
         # Determine which dimensions need to be
         # squeezed (those for which elem is an integer scalar).
-        # The convention used is that for those cases,
-        # put_ind for this dimension is set to -1 by _StartCountStride.
-        squeeze = data.ndim * [slice(None),]
-        for i,n in enumerate(put_ind.shape[:-1]):
-            if n == 1 and put_ind.size > 0 and put_ind[...,i].ravel()[0] == -1:
-                squeeze[i] = 0
+        squeeze = _squeeze_index(put_ind, data.ndim)
+
+        # 1-d index arrays select multiple data chunks, which are read
+        # altogether in a single varn call.
+        orthogonal = start.size != start.shape[-1]
+        if orthogonal:
+            data = self._get_orthogonal(start, count, stride)
 
         # Reshape the arrays so we can iterate over them.
         start = start.reshape((-1, self.ndim or 1))
@@ -601,6 +698,8 @@ cdef class Variable:
 
         # Fill output array with data chunks.
         for (a,b,c,i) in zip(start, count, stride, put_ind):
+            if orthogonal:
+                break
             datout = self._get(a,b,c)
             if not hasattr(datout,'shape') or data.shape == datout.shape:
                 data = datout
@@ -646,6 +745,12 @@ cdef class Variable:
         # for the "start", "count" and "stride" arguments to the C function
         # ncmpi_put_var(), and is much more easy to use.
 
+        # basic indexing (integers, slices and Ellipsis) with data of the
+        # same shape as the selection is written directly by
+        # ncmpi_put_vara/vars
+        if self._put_basic(elem, data):
+            return
+
         # if _Encoding is specified for a character variable, convert
         # numpy array of strings to a numpy array of characters with one more
         # dimension.
@@ -665,7 +770,7 @@ cdef class Variable:
                     data = stringtochar(data, encoding=encoding)
 
         start, count, stride, put_ind =\
-        _StartCountStride(elem,self.shape,self.dimensions,self._file,datashape=data.shape,put=True)
+        _StartCountStride(elem,self._getshape(),recdim=self._recdim,datashape=data.shape,put=True)
         datashape = _out_array_shape(count)
 
         # if a numpy scalar, create an array of the right size
@@ -682,6 +787,12 @@ cdef class Variable:
             except ValueError: # otherwise broadcast
                 data = np.broadcast_to(data, datashape)
 
+        # 1-d index arrays select multiple data chunks, which are written
+        # altogether in a single varn call.
+        if start.size != start.shape[-1]:
+            self._put_orthogonal(data, start, count, stride)
+            return
+
         # Reshape these arrays so we can iterate over them.
         start = start.reshape((-1, self.ndim or 1))
         count = count.reshape((-1, self.ndim or 1))
@@ -698,16 +809,551 @@ cdef class Variable:
             self._put(dataput,a,b,c)
 
 
+    cdef tuple _basic_index(self, elem, bint put, size_t *startp, size_t *countp,
+                            ptrdiff_t *stridep, bint *strided, list rev):
+        # Private method to convert an index made of integers, slices and at
+        # most one Ellipsis into the start, count and stride arguments of a
+        # subarray request. Return the shape of the selected data, without
+        # the dimensions indexed by integers, or None if elem must go through
+        # the general path of _StartCountStride. Slices with negative steps
+        # are converted into positive strides, and the axes of the data to
+        # reverse are appended to rev.
+        cdef int ndims, nkey, i, k
+        cdef bint ellipsis = False
+        cdef Py_ssize_t idx, dimlen, beg, end, inc, n
+        cdef tuple key
+        cdef list shape = []
+        ndims = self.ndim
+        if ndims == 0 or ndims > _MAX_FAST_NDIMS:
+            return None
+        if type(elem) is tuple:
+            key = <tuple>elem
+        else:
+            key = (elem,)
+        nkey = len(key)
+        strided[0] = False
+        i = 0
+        for e in key:
+            if e is Ellipsis:
+                if ellipsis:
+                    return None
+                ellipsis = True
+                # the Ellipsis expands into full slices
+                for k in range(ndims - nkey + 1):
+                    if put and i == self._recdim:
+                        return None
+                    dimlen = self._dimlen(i)
+                    startp[i] = 0
+                    countp[i] = dimlen
+                    stridep[i] = 1
+                    shape.append(dimlen)
+                    i += 1
+                continue
+            if i >= ndims:
+                return None
+            if type(e) is slice:
+                # writes to a slice of the unlimited dimension may add records
+                if put and i == self._recdim:
+                    return None
+                dimlen = self._dimlen(i)
+                PySlice_GetIndicesEx(e, dimlen, &beg, &end, &inc, &n)
+                if n == 0:
+                    beg = 0
+                elif inc < 0:
+                    # access the same elements in increasing order, and
+                    # reverse this axis of the data
+                    beg += inc * (n - 1)
+                    inc = -inc
+                    if n > 1:
+                        rev.append(len(shape))
+                startp[i] = beg
+                countp[i] = n
+                stridep[i] = inc
+                if inc != 1 and n > 1:
+                    strided[0] = True
+                shape.append(n)
+            elif type(e) is int or isinstance(e, np.integer):
+                idx = e
+                if idx < 0:
+                    dimlen = self._dimlen(i)
+                    if idx + dimlen < 0:
+                        raise IndexError("Index out of range")
+                    idx += dimlen
+                elif not (put and i == self._recdim) and idx >= self._dimlen(i):
+                    raise IndexError('index exceeds dimension bounds')
+                startp[i] = idx
+                countp[i] = 1
+                stridep[i] = 1
+            else:
+                return None
+            i += 1
+        # dimensions not given in the index are read entirely
+        while i < ndims:
+            if put and i == self._recdim:
+                return None
+            dimlen = self._dimlen(i)
+            startp[i] = 0
+            countp[i] = dimlen
+            stridep[i] = 1
+            shape.append(dimlen)
+            i += 1
+        return tuple(shape)
+
+    cdef int _basic_io(self, data, bint put, bint collective, size_t *startp,
+                       size_t *countp, ptrdiff_t *stridep, bint strided) except -1:
+        # Private method to read or write data of the subarray request set by
+        # _basic_index with ncmpi_get/put_vara or _vars. A non-contiguous data
+        # array, e.g. a view with reversed axes, is described by an MPI derived
+        # datatype, so PnetCDF accesses it directly, converting the elements
+        # from/to the data type of the array.
+        cdef int ierr, i, ndims
+        cdef MPI_Offset bufcount
+        cdef ndarray arr = data
+        cdef MPI.Datatype buftype
+        cdef MPI_Datatype bufftype
+        if not collective and PyArray_SIZE(arr) == 0:
+            return 0
+        if self._file._max_transfer is not None:
+            # a request larger than File.set_max_transfer_bytes is split
+            ndims = self.ndim
+            if self._split_transfer(put, arr, [startp[i] for i in range(ndims)],
+                                    [countp[i] for i in range(ndims)],
+                                    [stridep[i] for i in range(ndims)] if strided else None,
+                                    self._file._max_transfer, collective):
+                return 0
+        bufcount, buftype = _buffer_type(arr, self.dtype)
+        if buftype is None:
+            bufftype = MPI_DATATYPE_NULL
+        else:
+            bufftype = buftype.ob_mpi
+        if put:
+            # writes may add new records
+            self._file._written(self._varid)
+        # in collective mode, processes accessing no data still take part in
+        # the collective call
+        if put and collective and strided:
+            with nogil:
+                ierr = ncmpi_put_vars_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(arr), bufcount, bufftype)
+        elif put and collective:
+            with nogil:
+                ierr = ncmpi_put_vara_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, PyArray_DATA(arr), bufcount, bufftype)
+        elif put and strided:
+            with nogil:
+                ierr = ncmpi_put_vars(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(arr), bufcount, bufftype)
+        elif put:
+            with nogil:
+                ierr = ncmpi_put_vara(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, PyArray_DATA(arr), bufcount, bufftype)
+        elif collective and strided:
+            with nogil:
+                ierr = ncmpi_get_vars_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(arr), bufcount, bufftype)
+        elif collective:
+            with nogil:
+                ierr = ncmpi_get_vara_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, PyArray_DATA(arr), bufcount, bufftype)
+        elif strided:
+            with nogil:
+                ierr = ncmpi_get_vars(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(arr), bufcount, bufftype)
+        else:
+            with nogil:
+                ierr = ncmpi_get_vara(self._file_id, self._varid, <const MPI_Offset *>startp, \
+                <const MPI_Offset *>countp, PyArray_DATA(arr), bufcount, bufftype)
+        if ierr == NC_EINVALCOORDS and not put:
+            raise IndexError('index exceeds dimension bounds')
+        elif ierr != NC_NOERR:
+            _check_err(ierr)
+        return 0
+
+    cdef _get_basic(self, elem):
+        # Private method implementing the fast path of __getitem__ for basic
+        # indexing. Return None if elem must go through the general path.
+        cdef bint strided
+        cdef size_t startp[_MAX_FAST_NDIMS]
+        cdef size_t countp[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t stridep[_MAX_FAST_NDIMS]
+        cdef list rev = []
+        # NC_CHAR variables may be converted to strings
+        if self.chartostring and self.dtype.char == 'S':
+            return None
+        shape = self._basic_index(elem, False, startp, countp, stridep, &strided, rev)
+        if shape is None:
+            return None
+        data = None
+        if self._file._cache is not None and self._file.indep_mode:
+            data = self._cached_get(shape, startp, countp, stridep, rev)
+        if data is None:
+            data = np.empty(shape, self.dtype)
+            self._basic_io(_reversed(data, rev), False, not self._file.indep_mode,
+                           startp, countp, stridep, strided)
+        if not shape:
+            # all dimensions indexed by integers, return a numpy scalar
+            return data[()]
+        return data
+
+    cdef _cached_get(self, tuple shape, size_t *startp, size_t *countp,
+                     ptrdiff_t *stridep, list rev):
+        # Private method of _get_basic to serve an independent read from the
+        # blocks of the cache of File.cache_reads, reading the blocks missing.
+        # Return None if the read must be made directly, i.e. the blocks do
+        # not fit in the cache or the variable has pending nonblocking writes.
+        cdef int i, ndims = self.ndim
+        cdef size_t bstart[_MAX_FAST_NDIMS]
+        cdef size_t bcount[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t bstride[_MAX_FAST_NDIMS]
+        cache = self._file._cache
+        if not cache.cacheable(self._file, self._varid):
+            cache.bypasses += 1
+            return None
+        dimlens = [self._dimlen(i) for i in range(ndims)]
+        bshape = cache.shape(self, dimlens)
+        start = [startp[i] for i in range(ndims)]
+        count = [countp[i] for i in range(ndims)]
+        stride = [stridep[i] for i in range(ndims)]
+        if 0 in count:
+            return None
+        # the first block and the number of blocks along each dimension
+        first = [s // b for s, b in zip(start, bshape)]
+        nblocks = [(s + (n - 1) * st) // b - f + 1
+                   for s, n, st, b, f in zip(start, count, stride, bshape, first)]
+        if int(np.prod(nblocks)) * int(np.prod(bshape)) * self.dtype.itemsize > cache.max_bytes:
+            cache.bypasses += 1
+            return None
+        data = np.empty(count, self.dtype)
+        for offsets in np.ndindex(*nblocks):
+            index = tuple(f + o for f, o in zip(first, offsets))
+            origin = [k * b for k, b in zip(index, bshape)]
+            lengths = [min(b, n - o) for b, n, o in zip(bshape, dimlens, origin)]
+            # the elements of the selection in this block, as slices of the
+            # data and of the block
+            dst = []
+            src = []
+            for s, n, st, o, m in zip(start, count, stride, origin, lengths):
+                lo = max(0, -((s - o) // st))
+                hi = min(n, -((s - o - m) // st))
+                if lo >= hi:
+                    # a stride skipping the block
+                    break
+                dst.append(slice(lo, hi))
+                src.append(slice(s + lo * st - o, s + (hi - 1) * st - o + 1, st))
+            if len(dst) < ndims:
+                continue
+            key = (self._varid, index)
+            block = cache.get(key)
+            # a block of the last records is read again once records are added
+            if block is not None and list(block.shape) == lengths:
+                cache.hits += 1
+            else:
+                for i in range(ndims):
+                    bstart[i] = origin[i]
+                    bcount[i] = lengths[i]
+                    bstride[i] = 1
+                block = np.empty(lengths, self.dtype)
+                self._basic_io(block, False, False, bstart, bcount, bstride, False)
+                cache.put(key, block)
+            data[tuple(dst)] = block[tuple(src)]
+        # without the dimensions indexed by integers, in the order of the
+        # slices with negative steps
+        data = data.reshape(shape)
+        if rev:
+            data = np.ascontiguousarray(_reversed(data, rev))
+        return data
+
+    cdef int _put_basic(self, elem, data) except -1:
+        # Private method implementing the fast path of __setitem__ for basic
+        # indexing, when data is an array of the same shape as the selection.
+        # Return 0 if elem and data must go through the general path.
+        cdef bint strided
+        cdef int i, ndims
+        cdef size_t startp[_MAX_FAST_NDIMS]
+        cdef size_t countp[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t stridep[_MAX_FAST_NDIMS]
+        cdef list rev = []
+        if not isinstance(data, np.ndarray):
+            return 0
+        # strings may be converted to NC_CHAR arrays
+        if self.chartostring and self.dtype.char == 'S':
+            return 0
+        shape = self._basic_index(elem, True, startp, countp, stridep, &strided, rev)
+        if shape is None or data.shape != shape:
+            return 0
+        if not _convertible(data.dtype, self.dtype):
+            data = data.astype(self.dtype)
+        if self._deferring(not self._file.indep_mode):
+            ndims = self.ndim
+            self._file._defer(self._iput_vars([startp[i] for i in range(ndims)],
+                                              [countp[i] for i in range(ndims)],
+                                              [stridep[i] for i in range(ndims)],
+                                              self._deferred_buffer(_reversed(data, rev)), None, None))
+            return 1
+        self._basic_io(_reversed(data, rev), True, not self._file.indep_mode,
+                       startp, countp, stridep, strided)
+        return 1
+
+    cdef bint _deferring(self, bint collective):
+        # Private method to check whether a write made in collective or
+        # independent mode is deferred, i.e. posted as a nonblocking request
+        # completed later together with the other deferred writes. Writes
+        # made in the wrong data mode are not deferred, so they fail.
+        return self._file._deferred is not None and collective != self._file.indep_mode
+
+    cdef _deferred_buffer(self, data):
+        # Private method to copy the write buffer of a deferred write, if
+        # requested. Non-contiguous buffers and buffers whose elements are
+        # converted are packed by PnetCDF when the request is posted.
+        if self._file._deferred.copy and data.flags.c_contiguous and data.dtype == self.dtype:
+            return data.copy()
+        return data
+
+    def _transfer(self, bint put, data, start, count, stride, imap, bufcount, buftype,
+                  max_transfer_bytes, bint collective):
+        # Private method of put_var_all, put_var, get_var_all and get_var to
+        # split the request of an entire variable or a subarray larger than
+        # the limit of File.set_max_transfer_bytes. Return False if the
+        # request is not split, i.e. is made by a single blocking call.
+        limit = self._file._max_transfer if max_transfer_bytes is None else max_transfer_bytes
+        if not limit or imap is not None or bufcount is not None or buftype is not None \
+           or not isinstance(data, np.ndarray) or self.ndim == 0:
+            return False
+        if start is None:
+            if count is not None or stride is not None:
+                return False
+            # the entire variable, up to the current number of records
+            start = [0] * self.ndim
+            count = self.shape
+        elif count is None:
+            # a single element
+            return False
+        if put and self._deferring(collective):
+            return False
+        return self._split_transfer(put, data, start, count, stride, limit, collective)
+
+    def _split_transfer(self, bint put, ndarray data, start, count, stride, limit, bint collective):
+        # Private method to write or read a subarray as pieces of at most
+        # limit bytes, posted as nonblocking requests and completed by a
+        # single wait. In collective mode, all processes take this path, so
+        # that each makes the same collective call: the decision depends only
+        # on the arguments, not on the memory layout of data. In independent
+        # mode, return False if data does not hold the elements of the
+        # subarray or is smaller than limit.
+        count = [int(n) for n in count]
+        if PyArray_SIZE(data) != int(np.prod(count)):
+            if collective:
+                raise ValueError("size of data array %d does not match the number of elements %d of the subarray" % \
+                                 (PyArray_SIZE(data), int(np.prod(count))))
+            return False
+        itemsize = max(data.dtype.itemsize, self.dtype.itemsize)
+        if not collective and PyArray_SIZE(data) * itemsize <= limit:
+            return False
+        out = None
+        if data.shape != tuple(count):
+            # e.g. without the dimensions indexed by an integer, which only
+            # a view of data can add back
+            view = data.reshape(count)
+            if not np.may_share_memory(view, data):
+                # data cannot be viewed in the shape of the subarray, it is
+                # staged through a contiguous copy
+                if put:
+                    view = np.ascontiguousarray(data).reshape(count)
+                else:
+                    out = data
+                    view = np.empty(count, data.dtype)
+            data = view
+        if stride is None:
+            stride = [1] * len(count)
+        reqs = []
+        # the non-contiguous pieces read and the contiguous arrays read into
+        copies = []
+        try:
+            for first, lengths in _transfer_pieces(count, itemsize, limit):
+                piece = data[tuple(slice(i, i + n) for i, n in zip(first, lengths))]
+                pstart = [s + i * st for s, i, st in zip(start, first, stride)]
+                if put:
+                    reqs.append(self._iput_vars(pstart, lengths, stride, piece, None, None))
+                else:
+                    # the cached derived datatypes describing strided arrays
+                    # may be freed while a read is pending, so a
+                    # non-contiguous piece is read into a contiguous array
+                    buff = piece
+                    if not PyArray_ISCONTIGUOUS(piece):
+                        buff = np.empty(lengths, piece.dtype)
+                        copies.append((piece, buff))
+                    bufcount, buftype = _buffer_type(buff, self.dtype, strided=False)
+                    reqs.append(self._iget_vars(buff, pstart, lengths, stride, bufcount, buftype))
+        except:
+            if reqs:
+                self._file.cancel(reqs)
+            raise
+        for err in self._file._wait(reqs, collective=collective):
+            _check_err(err)
+        for piece, buff in copies:
+            piece[...] = buff
+        if out is not None:
+            out[...] = data.reshape(out.shape)
+        return True
+
+    def _read(self, key, out, collective):
+        # Private method to read the selection of a basic index into the array
+        # out, which may be strided.
+        cdef bint strided
+        cdef size_t startp[_MAX_FAST_NDIMS]
+        cdef size_t countp[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t stridep[_MAX_FAST_NDIMS]
+        cdef list rev = []
+        cdef ndarray data
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
+        shape = self._basic_index(key, False, startp, countp, stridep, &strided, rev)
+        if shape is None:
+            raise IndexError("only integers, slices and Ellipsis are valid "
+                             "indices for reading into an array")
+        if out is None:
+            data = np.empty(shape, self.dtype)
+        else:
+            if not isinstance(out, np.ndarray):
+                raise TypeError("out must be a numpy array")
+            data = out
+            if data.shape != shape:
+                raise ValueError("shape of out array %s does not conform to the selection %s" % \
+                                 (data.shape, shape))
+            if not _convertible(data.dtype, self.dtype):
+                raise TypeError("cannot convert data type %s of out array from variable's data type %s" % \
+                                (data.dtype, self.dtype))
+            if not data.flags.writeable:
+                raise ValueError("out array is read-only")
+            if not PyArray_ISALIGNED(data):
+                raise ValueError("out array is not aligned")
+        self._basic_io(_reversed(data, rev), False, collective,
+                       startp, countp, stridep, strided)
+        return data
+
+    def _lazy_get(self, elem):
+        # Private method implementing Variable.lazy. Post a nonblocking read
+        # request of the selection elem in the batch of File.batch_reads and
+        # return a LazyArray placeholder of the data, which converts the data
+        # read into the value returned by __getitem__.
+        cdef bint strided
+        cdef int i, ndims
+        cdef size_t startp[_MAX_FAST_NDIMS]
+        cdef size_t countp[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t stridep[_MAX_FAST_NDIMS]
+        cdef list rev = []
+        batch = self._file._batch
+        if batch is None:
+            raise RuntimeError("Variable.lazy can only be used in File.batch_reads")
+        if self._file._deferred is not None:
+            # read the data written by the pending deferred writes
+            self._file._flush_deferred()
+        ndims = self.ndim
+        dtype = self.dtype
+        if ndims == 0:
+            data = np.empty((), dtype)
+            request = self._iget_var(data, None, None)
+            batch.requests.append(request)
+            return LazyArray(batch, request, (), dtype, lambda buf: buf[()])
+
+        # NC_CHAR variables may be converted to strings
+        encoding = None
+        if self.chartostring and dtype.char == 'S':
+            encoding = getattr(self,'_Encoding',None)
+        if encoding is None:
+            shape = self._basic_index(elem, False, startp, countp, stridep, &strided, rev)
+            if shape is not None:
+                # basic indexing, read by ncmpi_iget_vars in increasing order
+                # of the indices
+                data = np.empty(shape, dtype)
+                request = self._iget_vars(data, [startp[i] for i in range(ndims)],
+                                          [countp[i] for i in range(ndims)],
+                                          [stridep[i] for i in range(ndims)], None, None)
+                batch.requests.append(request)
+                def finalize(buf):
+                    buf = _reversed(buf, rev)
+                    # all dimensions indexed by integers, return a numpy scalar
+                    return buf if shape else buf[()]
+                return LazyArray(batch, request, shape, dtype, finalize)
+
+        # other selections are read by a single ncmpi_iget_varn request, same
+        # as orthogonal indexing
+        start, count, stride, put_ind = _StartCountStride(elem,self._getshape())
+        datashape = _out_array_shape(count)
+        squeeze = _squeeze_index(put_ind, len(datashape))
+        starts, counts, uniqshape, gathers = _orthogonal_varn(start, count, stride)
+        data = np.empty(uniqshape, dtype)
+        request = None
+        if len(starts) > 0:
+            request = self.iget_varn(data, len(starts), starts, counts)
+            batch.requests.append(request)
+        shape = tuple(n for n, sq in zip(datashape, squeeze) if isinstance(sq, slice))
+        # only convert to strings if the slice is along the whole rightmost
+        # dimension of the char variable
+        tostring = encoding is not None and len(shape) > 0 and \
+                   shape[-1] == self.shape[-1] and np.all(count[..., -1] == self.shape[-1])
+        if tostring:
+            dtype = np.dtype(('S' if encoding in ['none','None','bytes'] else 'U') + repr(shape[-1]))
+            shape = shape[:-1]
+        def finalize(buf):
+            if buf is None:
+                # empty selection, no request posted
+                buf = data
+            for axis, inv, last in gathers:
+                buf = buf.take(inv, axis=axis)
+            buf = buf[tuple(squeeze)]
+            if tostring:
+                buf = chartostring(buf, encoding=encoding)
+            return buf
+        return LazyArray(batch, request, shape, dtype, finalize)
+
+    def _get_orthogonal(self, start, count, stride):
+        # Private method to read an orthogonal selection of multiple data
+        # chunks, described by the arrays returned by _StartCountStride, in a
+        # single call to ncmpi_get_varn_all (or ncmpi_get_varn). The data is
+        # read for the sorted, unique indices and then gathered into the
+        # order of the selection.
+        starts, counts, uniqshape, gathers = _orthogonal_varn(start, count, stride)
+        data = np.empty(uniqshape, self.dtype)
+        self._get_varn(data, len(starts), starts, counts, None, None,
+                       collective = not self._file.indep_mode)
+        for axis, inv, last in gathers:
+            data = data.take(inv, axis=axis)
+        return data
+
+    def _put_orthogonal(self, data, start, count, stride):
+        # Private method to write an orthogonal selection of multiple data
+        # chunks in a single call to ncmpi_put_varn_all (or ncmpi_put_varn).
+        # When an index is selected more than once, the value of its last
+        # occurrence is written, same as numpy assignment.
+        starts, counts, uniqshape, gathers = _orthogonal_varn(start, count, stride)
+        for axis, inv, last in gathers:
+            data = data.take(last, axis=axis)
+        if not _convertible(data.dtype, self.dtype):
+            data = data.astype(self.dtype)
+        self._put_varn(data, len(starts), starts, counts,
+                       collective = not self._file.indep_mode)
+
     def _put_var1(self, value, tuple index, bufcount, MPI.Datatype buftype, collective = True):
         cdef int ierr, ndims
         cdef size_t *indexp
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
         cdef ndarray data
+        if self._deferring(collective):
+            # a copy of value is made by np.array
+            self._file._defer(self._iput_var1(value, index, bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
         # rank of variable.
         data = np.array(value)
         ndim_index = len(index)
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         indexp = <size_t *>malloc(sizeof(size_t) * ndim_index)
         if bufcount is None:
@@ -738,7 +1384,16 @@ cdef class Variable:
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
-        if not PyArray_ISCONTIGUOUS(data):
+        if self._deferring(collective):
+            self._file._defer(self._iput_var(self._deferred_buffer(data), bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -770,13 +1425,22 @@ cdef class Variable:
         cdef MPI_Datatype bufftype
         cdef size_t *startp
         cdef size_t *countp
-        ndims = len(self.dimensions)
+        if self._deferring(collective):
+            self._file._defer(self._iput_vara(start, count, self._deferred_buffer(data), bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         for n from 0 <= n < ndims:
             countp[n] = count[n]
             startp[n] = start[n]
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -805,26 +1469,27 @@ cdef class Variable:
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
-        cdef size_t **startsp
-        cdef size_t **countsp
+        cdef MPI_Offset **startsp = NULL
+        cdef MPI_Offset **countsp = NULL
         cdef int num_req
+        if self._deferring(collective):
+            self._file._defer(self._iput_varn(self._deferred_buffer(data), num, starts, counts, bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
         num_req = num
-        ndims = len(self.dimensions)
-        max_num_req = len(starts)
-
-        startsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            startsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                startsp[i][j] = starts[i, j]
-
-        countsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            countsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                countsp[i][j] = counts[i, j]
-
-        if not PyArray_ISCONTIGUOUS(data):
+        ndims = self.ndim
+        # starts and counts are passed to PnetCDF as int64 arrays of shape
+        # (num, ndims), without copying them element by element
+        starts = _varn_offsets(starts, num_req, ndims, "starts")
+        if counts is not None:
+            counts = _varn_offsets(counts, num_req, ndims, "counts")
+
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -839,9 +1504,24 @@ cdef class Variable:
             bufftype = MPI_DATATYPE_NULL
         else:
             bufftype = buftype.ob_mpi
-        if collective:
-            with nogil:
-                ierr = ncmpi_put_varn_all(self._file_id,
+        try:
+            startsp = _varn_table(starts, num_req, ndims)
+            if counts is not None:
+                # NULL counts select a single element per request
+                countsp = _varn_table(counts, num_req, ndims)
+            if collective:
+                with nogil:
+                    ierr = ncmpi_put_varn_all(self._file_id,
+                                              self._varid,
+                                              num_req,
+                                              <const MPI_Offset **>startsp,
+                                              <const MPI_Offset **>countsp,
+                                              PyArray_DATA(data),
+                                              buffcount,
+                                              bufftype)
+            else:
+                with nogil:
+                    ierr = ncmpi_put_varn(self._file_id,
                                           self._varid,
                                           num_req,
                                           <const MPI_Offset **>startsp,
@@ -849,16 +1529,9 @@ cdef class Variable:
                                           PyArray_DATA(data),
                                           buffcount,
                                           bufftype)
-        else:
-            with nogil:
-                ierr = ncmpi_put_varn(self._file_id,
-                                      self._varid,
-                                      num_req,
-                                      <const MPI_Offset **>startsp,
-                                      <const MPI_Offset **>countsp,
-                                      PyArray_DATA(data),
-                                      buffcount,
-                                      bufftype)
+        finally:
+            free(startsp)
+            free(countsp)
         _check_err(ierr)
 
     def put_varn_all(self, data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None):
@@ -920,7 +1593,8 @@ cdef class Variable:
             The elements of `starts[i][*]` must correspond to the variable’s
             dimensions in order.  Hence, if the variable is a record variable,
             the first index, `starts[i][0]` would correspond to the starting
-            record number for writing the data values.
+            record number for writing the data values. A C-contiguous array of
+            type ``np.int64`` is passed to PnetCDF without being copied.
         :type starts: numpy.ndarray
 
         :param counts: [Optional]
@@ -978,9 +1652,9 @@ cdef class Variable:
         self._put_varn(data, num, starts, counts, bufcount = bufcount,
                        buftype = buftype, collective = False)
 
-    def iput_varn(self, data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None):
+    def iput_varn(self, data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None, track=True):
         """
-        iput_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None)
+        iput_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None, track=True)
 
         This method call is the nonblocking counterpart of
         :meth:`Variable.put_varn`. The syntax is the same as
@@ -999,17 +1673,26 @@ cdef class Variable:
             returned. Any change to the buffer contents in between will result
             in unexpected error.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
         """
-        return self._iput_varn(data, num, starts, counts, bufcount, buftype,
-                               buffered=False)
+        req = self._iput_varn(data, num, starts, counts, bufcount, buftype,
+                              buffered=False)
+        return req if track else self._file._untrack(req)
 
-    def bput_varn(self, data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None):
+    def bput_varn(self, data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None, track=True):
         """
-        bput_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None)
+        bput_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None, track=True)
 
         This method call is the nonblocking, buffered counterpart of
         :meth:`Variable.put_varn`. For the argument usage, please refer to
@@ -1027,12 +1710,27 @@ cdef class Variable:
             sure :meth:`File.attach_buff` is called to allocate an internal
             buffer for accommodating the write requests.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
         """
-        return self._iput_varn(data, num, starts, counts, bufcount, buftype, buffered=True)
+        if self._file._auto_buff is not None:
+            nelems = num if counts is None else \
+                     int(np.prod(np.asarray(counts, dtype=np.int64)[:num], axis=-1).sum())
+            if not self._file._reserve_buff(nelems * self.dtype.itemsize, not self._file.indep_mode):
+                # larger than the buffer of File.auto_buff can be
+                return self.iput_varn(np.array(data, copy=True), num, starts, counts, bufcount, buftype, track=track)
+        req = self._iput_varn(data, num, starts, counts, bufcount, buftype, buffered=True)
+        return req if track else self._file._untrack(req)
 
     def _put_vars(self, start, count, stride, ndarray data, bufcount, MPI.Datatype buftype, collective = True):
         cdef int ierr, ndims
@@ -1041,7 +1739,12 @@ cdef class Variable:
         cdef size_t *startp
         cdef size_t *countp
         cdef ptrdiff_t *stridep
-        ndims = len(self.dimensions)
+        if self._deferring(collective):
+            self._file._defer(self._iput_vars(start, count, stride, self._deferred_buffer(data), bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -1049,7 +1752,11 @@ cdef class Variable:
             countp[n] = count[n]
             startp[n] = start[n]
             stridep[n] = stride[n]
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -1085,7 +1792,12 @@ cdef class Variable:
         cdef size_t *countp
         cdef ptrdiff_t *stridep
         cdef size_t *imapp
-        ndims = len(self.dimensions)
+        if self._deferring(collective):
+            self._file._defer(self._iput_varm(self._deferred_buffer(data), start, count, stride, imap, bufcount, buftype))
+            return
+        # writes may add new records
+        self._file._written(self._varid)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -1102,7 +1814,11 @@ cdef class Variable:
         shapeout = ()
         for lendim in count:
             shapeout = shapeout + (lendim,)
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         if bufcount is None:
             buffcount = 1
@@ -1130,9 +1846,9 @@ cdef class Variable:
 
 
 
-    def put_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, MPI.Datatype buftype=None):
+    def put_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, MPI.Datatype buftype=None, max_transfer_bytes=None):
         """
-        put_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        put_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None)
 
         Method to write in parallel to the netCDF variable in the collective
         I/O mode. The behavior of the method varies depends on the pattern of
@@ -1219,7 +1935,10 @@ cdef class Variable:
             it can also be a single numeric (e.g. np.int32) python variable.
             The datatype should match with the variable's datatype. Note this
             numpy array write buffer can be in any shape as long as the number
-            of elements (buffer size) is matched.
+            of elements (buffer size) is matched. When `buftype` is not given,
+            a non-contiguous array, e.g. a slice of a larger array or a
+            Fortran-ordered array, is described to PnetCDF by an MPI derived
+            datatype and written without being copied.
         :type data: numpy.ndarray
 
         :param start: [Optional]
@@ -1277,6 +1996,14 @@ cdef class Variable:
             write buffer.
         :type buftype: mpi4py.MPI.Datatype
 
+        :param max_transfer_bytes: [Optional]
+            The maximum number of bytes transferred by a single request, which
+            overrides the limit set by :meth:`File.set_max_transfer_bytes`
+            for this call. A larger request of an entire variable or a
+            subarray is split into nonblocking requests completed together.
+            0 disables splitting. It must be the same on all processes.
+        :type max_transfer_bytes: int
+
         :Operational mode: This method must be called while the file is in
             collective data mode.
 
@@ -1291,6 +2018,9 @@ cdef class Variable:
            var[start[0]:end[0], start[1]:end[1]] = buf
 
         """
+        if self._transfer(True, data, start, count, stride, imap, bufcount, buftype,
+                          max_transfer_bytes, True):
+            return
         if data is not None and all(arg is None for arg in [start, count, stride, imap]):
             self._put_var(data, collective = True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start]) and all(arg is None for arg in [count, stride, imap]):
@@ -1305,9 +2035,9 @@ cdef class Variable:
             raise ValueError("Invalid input arguments for put_var_all")
 
 
-    def put_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def put_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None):
         """
-        put_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        put_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None)
 
         Method to write in parallel to the netCDF variable in the independent
         I/O mode. For the argument usage, please refer to method
@@ -1317,6 +2047,9 @@ cdef class Variable:
         :Operational mode: This method must be called while the file is in
             independent data mode.
         """
+        if self._transfer(True, data, start, count, stride, imap, bufcount, buftype,
+                          max_transfer_bytes, False):
+            return
         if data is not None and all(arg is None for arg in [start, count, stride, imap]):
             self._put_var(data, collective = False, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start]) and all(arg is None for arg in [count, stride, imap]):
@@ -1343,12 +2076,11 @@ cdef class Variable:
         cdef ndarray dataarr
         cdef MPI_Offset bufcount
         cdef MPI_Datatype buftype
+        cdef MPI.Datatype derivedtype
+        # writes may add new records
+        self._file._written(self._varid)
         # rank of variable.
-        ndims = len(self.dimensions)
-        # make sure data is contiguous.
-        # if not, make a local copy.
-        if not PyArray_ISCONTIGUOUS(data):
-            data = data.copy()
+        ndims = self.ndim
         # fill up startp,countp,stridep.
         totelem = 1
         negstride = 0
@@ -1376,24 +2108,31 @@ cdef class Variable:
         dataelem = PyArray_SIZE(data)
         if totelem != dataelem:
             raise IndexError('size of data array does not conform to slice')
-        if negstride:
-            # reverse data along axes with negative strides.
-            data = data[tuple(sl)].copy() # make sure a copy is made.
-        if self.dtype != data.dtype:
+        if not _convertible(data.dtype, self.dtype):
             data = data.astype(self.dtype) # cast data, if necessary.
-        # strides all 1 or scalar variable, use put_vara (faster)
-        #bufcount = data.size
-        bufcount = 1
-        if self._file.file_format != "64BIT_DATA":
-            #check if dtype meets CDF-5 variable standards
-            if data.dtype.str[1:] not in _supportedtypescdf2:
-                raise TypeError, 'illegal data type, must be one of %s, got %s' % \
-                (_supportedtypescdf2, data.dtype.str[1:])
-        #check if dtype meets CDF-5 variable standards
-        elif data.dtype.str[1:] not in _supportedtypes:
-            raise TypeError, 'illegal data type, must be one of %s, got %s' % \
-            (_supportedtypes, data.dtype.str[1:])
-        buftype = MPI_DATATYPE_NULL
+        if negstride:
+            # write from a view of data with the axes of negative strides
+            # reversed
+            data = data.reshape(tuple(count))[tuple(sl)]
+        # the memory layout and element type of data are described by an MPI
+        # datatype, PnetCDF converts the elements to the external type of the
+        # variable without a copy of data being made
+        bufcount, derivedtype = _buffer_type(data, self.dtype)
+        if self._deferring(not self._file.indep_mode):
+            try:
+                self._file._defer(self._iput_vars([startp[n] for n in range(ndims)],
+                                                  [countp[n] for n in range(ndims)],
+                                                  [stridep[n] for n in range(ndims)],
+                                                  self._deferred_buffer(data), None, None))
+            finally:
+                free(startp)
+                free(countp)
+                free(stridep)
+            return
+        if derivedtype is None:
+            buftype = MPI_DATATYPE_NULL
+        else:
+            buftype = derivedtype.ob_mpi
         if self._file.indep_mode:
             if sum(stride) == ndims or ndims == 0:
                 with nogil:
@@ -1430,6 +2169,9 @@ cdef class Variable:
 
         ndim_index = len(index)
         indexp = <size_t *>malloc(sizeof(size_t) * ndim_index)
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1457,6 +2199,9 @@ cdef class Variable:
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
         cdef ndarray data
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1484,13 +2229,16 @@ cdef class Variable:
         cdef MPI_Datatype bufftype
         cdef size_t *startp
         cdef size_t *countp
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         for n from 0 <= n < ndims:
             countp[n] = count[n]
             startp[n] = start[n]
 
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1516,25 +2264,21 @@ cdef class Variable:
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
-        cdef size_t **startsp
-        cdef size_t **countsp
+        cdef MPI_Offset **startsp = NULL
+        cdef MPI_Offset **countsp = NULL
         cdef int num_req
 
         num_req = num
-        ndims = len(self.dimensions)
-        max_num_req = len(starts)
-        startsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            startsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                startsp[i][j] = starts[i][j]
-
-        countsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            countsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                countsp[i][j] = counts[i][j]
+        ndims = self.ndim
+        # starts and counts are passed to PnetCDF as int64 arrays of shape
+        # (num, ndims), without copying them element by element
+        starts = _varn_offsets(starts, num_req, ndims, "starts")
+        if counts is not None:
+            counts = _varn_offsets(counts, num_req, ndims, "counts")
 
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of data
+            bufcount, buftype = _buffer_type(data, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1545,9 +2289,24 @@ cdef class Variable:
         else:
             bufftype = buftype.ob_mpi
 
-        if collective:
-            with nogil:
-                ierr = ncmpi_get_varn_all(self._file_id,
+        try:
+            startsp = _varn_table(starts, num_req, ndims)
+            if counts is not None:
+                # NULL counts select a single element per request
+                countsp = _varn_table(counts, num_req, ndims)
+            if collective:
+                with nogil:
+                    ierr = ncmpi_get_varn_all(self._file_id,
+                                              self._varid,
+                                              num_req,
+                                              <const MPI_Offset **>startsp,
+                                              <const MPI_Offset **>countsp,
+                                              PyArray_DATA(data),
+                                              buffcount,
+                                              bufftype)
+            else:
+                with nogil:
+                    ierr = ncmpi_get_varn(self._file_id,
                                           self._varid,
                                           num_req,
                                           <const MPI_Offset **>startsp,
@@ -1555,17 +2314,9 @@ cdef class Variable:
                                           PyArray_DATA(data),
                                           buffcount,
                                           bufftype)
-        else:
-            with nogil:
-                ierr = ncmpi_get_varn(self._file_id,
-                                      self._varid,
-                                      num_req,
-                                      <const MPI_Offset **>startsp,
-                                      <const MPI_Offset **>countsp,
-                                      PyArray_DATA(data),
-                                      buffcount,
-                                      bufftype)
-
+        finally:
+            free(startsp)
+            free(countsp)
         _check_err(ierr)
 
     def _get_vars(self, ndarray buff, start, count, stride, bufcount, MPI.Datatype buftype, collective = True):
@@ -1576,7 +2327,7 @@ cdef class Variable:
         cdef size_t *countp
         cdef ptrdiff_t *stridep
 
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -1584,6 +2335,9 @@ cdef class Variable:
             countp[n] = count[n]
             startp[n] = start[n]
             stridep[n] = stride[n]
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1613,7 +2367,7 @@ cdef class Variable:
         cdef size_t *countp
         cdef ptrdiff_t *stridep
         cdef size_t *imapp
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -1626,6 +2380,9 @@ cdef class Variable:
             else:
                 stridep[n] = 1
             imapp[n] = imap[n]
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype)
         if bufcount is None:
             buffcount = 1
         else:
@@ -1646,9 +2403,9 @@ cdef class Variable:
                                         <const MPI_Offset *>imapp, PyArray_DATA(buff), buffcount, bufftype)
         _check_err(ierr)
 
-    def get_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def get_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None):
         """
-        get_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        get_var_all(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None)
 
         Method to read in parallel from the netCDF variable in the collective
         I/O mode. The behavior of the method varies depends on the pattern of
@@ -1788,6 +2545,14 @@ cdef class Variable:
             read buffer.
         :type buftype: mpi4py.MPI.Datatype
 
+        :param max_transfer_bytes: [Optional]
+            The maximum number of bytes transferred by a single request, which
+            overrides the limit set by :meth:`File.set_max_transfer_bytes`
+            for this call. A larger request of an entire variable or a
+            subarray is split into nonblocking requests completed together.
+            0 disables splitting. It must be the same on all processes.
+        :type max_transfer_bytes: int
+
         :Operational mode: This method must be called while the file is in
             collective data mode.
 
@@ -1813,6 +2578,11 @@ cdef class Variable:
         # 1. Among all behaviors of get_var get_varm always requires a buffer argument
         # 2. Other i/o methods (iget/put/iput) all require buffer array as mandatory argument
 
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
+        if self._transfer(False, data, start, count, stride, imap, bufcount, buftype,
+                          max_transfer_bytes, True):
+            return
         if all(arg is None for arg in [start, count, stride, imap]):
             self._get_var(data, collective = True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [start]) and all(arg is None for arg in [count, stride, imap]):
@@ -1826,9 +2596,9 @@ cdef class Variable:
         else:
             raise ValueError("Invalid input arguments for get_var_all")
 
-    def get_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def get_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None):
         """
-        get_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        get_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, max_transfer_bytes=None)
 
         Method to read in parallel from the netCDF variable in the independent
         I/O mode.  For the argument usage, please refer to method
@@ -1838,6 +2608,11 @@ cdef class Variable:
         :Operational mode: This method must be called while the file is in
             independent data mode.
         """
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
+        if self._transfer(False, data, start, count, stride, imap, bufcount, buftype,
+                          max_transfer_bytes, False):
+            return
         if all(arg is None for arg in [start, count, stride, imap]):
             self._get_var(data, collective = False, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [start]) and all(arg is None for arg in [count, stride, imap]):
@@ -1851,6 +2626,211 @@ cdef class Variable:
         else:
             raise ValueError("Invalid input arguments for get_var")
 
+    def read_all(self, key, out=None):
+        """
+        read_all(self, key, out=None)
+
+        Method to read in parallel from the netCDF variable in the collective
+        I/O mode, using an index `key` of the indexer syntax, into an existing
+        numpy array `out`. Unlike ``var[key]``, no array is allocated when
+        `out` is given: PnetCDF reads the data directly into `out`, which can
+        be C-contiguous or strided (e.g. a slice or a transposed view of a
+        larger array). This is useful when reading subarrays of the same shape
+        repeatedly.
+
+        :param key: An index made of integers, slices and at most one
+            Ellipsis, e.g. ``(t, 0:10, ::-1)``.
+
+        :param out: [Optional]
+            The numpy array to store the data read. Its shape must be the shape
+            of the selection, i.e. ``var[key].shape``. Its data type can
+            differ from the variable's data type, in which case PnetCDF
+            converts the values while reading, e.g. an ``NC_FLOAT`` variable
+            can be read into a ``float64`` array. See :ref:`Type conversion`.
+            If None, a new array of the variable's data type is allocated.
+        :type out: numpy.ndarray
+
+        :return: The array `out`. Note that when all dimensions are indexed by
+            integers, a 0-dimensional array is returned rather than a numpy
+            scalar. For NC_CHAR variables, the characters are not converted to
+            strings.
+        :rtype: numpy.ndarray
+
+        :Operational mode: This method must be called while the file is in
+            collective data mode.
+
+        :Example:
+
+         ::
+
+           # allocate the read buffer once
+           buf = np.empty((ny, nx), v.dtype)
+
+           for t in range(nt):
+               # Read a record in collective mode into buf
+               v.read_all((t, slice(None), slice(None)), out = buf)
+
+        """
+        return self._read(key, out, collective = True)
+
+    def read(self, key, out=None):
+        """
+        read(self, key, out=None)
+
+        Method to read in parallel from the netCDF variable in the independent
+        I/O mode, using an index `key` of the indexer syntax, into an existing
+        numpy array `out`. For the argument usage, please refer to method
+        :meth:`Variable.read_all`. The only difference is this method is a
+        independent operation.
+
+        :Operational mode: This method must be called while the file is in
+            independent data mode.
+        """
+        return self._read(key, out, collective = False)
+
+    def get_shared(self, key=Ellipsis, broadcast=False):
+        """
+        get_shared(self, key=Ellipsis, broadcast=False)
+
+        Method to read data needed by all processes, e.g. coordinates, masks
+        or static grid fields, into MPI shared memory. The processes running
+        on the same node share one copy of the data, allocated by
+        ``MPI.Win.Allocate_shared`` in the memory of the node's first process,
+        which reads it from the file. This avoids every process reading the
+        same data and keeping its own copy of it.
+
+        :param key: [Optional]
+            An index made of integers, slices and at most one Ellipsis, e.g.
+            ``(0, 0:10, ::-1)``. Default is the entire variable.
+
+        :param broadcast: [Optional]
+            If True, only process 0 reads the data, which is then broadcast
+            to the first process of each node. Otherwise, the first process of
+            each node reads the data. Default is False.
+        :type broadcast: bool
+
+        :return: A read-only array of the selection, stored in the shared
+            memory of the node, same as ``var[key]`` except that a
+            0-dimensional array is returned when all dimensions are indexed by
+            integers. For NC_CHAR variables, the characters are not converted
+            to strings. The shared memory is kept until
+            :func:`pnetcdf.free_shared` is called or MPI is finalized, even
+            after the file is closed.
+        :rtype: numpy.ndarray
+
+        :Operational mode: This method is collective, all processes of the
+            communicator of the file must call it with the same arguments. In
+            collective data mode, the processes not reading the data take part
+            in the collective read with no data.
+
+        :Example:
+
+         ::
+
+           lat = f.variables['lat'].get_shared()
+           mask = f.variables['mask'].get_shared(np.s_[0, :, :], broadcast = True)
+        """
+        cdef bint strided = False
+        cdef int i
+        cdef size_t startp[_MAX_FAST_NDIMS]
+        cdef size_t countp[_MAX_FAST_NDIMS]
+        cdef ptrdiff_t stridep[_MAX_FAST_NDIMS]
+        cdef list rev = []
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
+        if self.ndim == 0 and (key is Ellipsis or (type(key) is tuple and not key)):
+            shape = ()
+        else:
+            shape = self._basic_index(key, False, startp, countp, stridep, &strided, rev)
+            if shape is None:
+                raise IndexError("only integers, slices and Ellipsis are valid "
+                                 "indices for reading into shared memory")
+        collective = not self._file.indep_mode
+        comm = self._file._comm
+        rank = comm.Get_rank()
+        # the processes running on the same node, the first one reading the
+        # data or receiving it from process 0
+        node = comm.Split_type(COMM_TYPE_SHARED, key=rank)
+        leader = node.Get_rank() == 0
+        data, win = _alloc_shared(node, shape, self.dtype)
+        node.Free()
+        if (rank == 0) if broadcast else leader:
+            self._basic_io(_reversed(data, rev), False, collective,
+                           startp, countp, stridep, strided)
+        elif collective:
+            # take part in the collective read with no data
+            for i in range(self.ndim):
+                countp[i] = 0
+            self._basic_io(np.empty((0,) * self.ndim, self.dtype), False, True,
+                           startp, countp, stridep, strided)
+        if broadcast:
+            # process 0 is the first process of its node
+            leaders = comm.Split(0 if leader else UNDEFINED, rank)
+            if leader:
+                if data.size > 0:
+                    leaders.Bcast(data.reshape(-1).view(np.uint8), root=0)
+                leaders.Free()
+        # make the data stored by the first process visible on the node
+        win.Fence()
+        data.flags.writeable = False
+        return data
+
+    def aget(self, key):
+        """
+        aget(self, key)
+
+        Asynchronous version of ``var[key]`` for :mod:`asyncio` programs. The
+        read is carried out by the dedicated I/O thread of
+        :meth:`File.wait_all_async`, while the event loop keeps running other
+        tasks. It must be called from a coroutine.
+
+        :param key: An index of the indexer syntax, e.g. ``np.s_[0, :]``.
+
+        :return: An :class:`asyncio.Future` whose result is the numpy array
+            read, same as ``var[key]``.
+
+        :Operational mode: This method is collective when the file is in
+            collective data mode, in which case all processes must call it,
+            and independent otherwise. See :meth:`File.wait_all_async` for the
+            required MPI thread support level.
+
+        :Example:
+
+         ::
+
+           data = await v.aget(np.s_[rank, :])
+        """
+        return _io_submit(self.__getitem__, key)
+
+    def aput(self, key, data):
+        """
+        aput(self, key, data)
+
+        Asynchronous version of ``var[key] = data`` for :mod:`asyncio`
+        programs. The write is carried out by the dedicated I/O thread of
+        :meth:`File.wait_all_async`, while the event loop keeps running other
+        tasks. It must be called from a coroutine. The contents of `data`
+        must not be modified until the write completes.
+
+        :param key: An index of the indexer syntax, e.g. ``np.s_[0, :]``.
+
+        :param data: The data to write.
+
+        :return: An :class:`asyncio.Future` resolved when the write completes.
+
+        :Operational mode: This method is collective when the file is in
+            collective data mode, in which case all processes must call it,
+            and independent otherwise. See :meth:`File.wait_all_async` for the
+            required MPI thread support level.
+
+        :Example:
+
+         ::
+
+           await v.aput(np.s_[rank, :], buf)
+        """
+        return _io_submit(self.__setitem__, key, data)
+
     def get_varn_all(self, data, num, starts, counts=None, bufcount=None, buftype=None):
         """
         get_varn_all(self, data, num, starts, counts=None, bufcount=None, buftype=None)
@@ -1910,7 +2890,8 @@ cdef class Variable:
             The elements of `starts[i][*]` must correspond to the variable’s
             dimensions in order.  Hence, if the variable is a record variable,
             the first index, `starts[i][0]` would correspond to the starting
-            record number for reading the data values.
+            record number for reading the data values. A C-contiguous array of
+            type ``np.int64`` is passed to PnetCDF without being copied.
         :type starts: numpy.ndarray
 
         :param counts: [Optional]
@@ -1953,6 +2934,8 @@ cdef class Variable:
            v.get_varn_all(r_buf, num = num_reqs, starts = starts, counts = counts)
 
         """
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
         return self._get_varn(data, num, starts, counts, bufcount = bufcount,
                               buftype = buftype, collective = True)
 
@@ -1965,6 +2948,8 @@ cdef class Variable:
         in the independent I/O mode. Please refer to
         :meth:`Variable.get_varn_all` for its argument usage.
         """
+        if self._file._deferred is not None:
+            self._file._flush_deferred()
         return self._get_varn(data, num, starts, counts, bufcount = bufcount,
                               buftype = buftype, collective = False)
 
@@ -1974,7 +2959,9 @@ cdef class Variable:
         cdef size_t *startp
         cdef size_t *countp
         cdef ptrdiff_t *stridep
-        cdef ndarray data, dataarr
+        cdef ndarray data, dataarr, buf
+        cdef MPI.Datatype revtype = None
+        cdef MPI_Datatype buftype
         cdef void *elptr
         cdef char **strdata
         cdef int file_id = self._file._ncid
@@ -1990,7 +2977,7 @@ cdef class Variable:
             else:
                 shapeout = shapeout + (lendim,)
         # rank of variable.
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         # fill up startp,countp,stridep.
         negstride = 0
         sl = []
@@ -2017,26 +3004,35 @@ cdef class Variable:
         # if count contains a zero element, no data is being read
         bufcount = 1
         buftype = MPI_DATATYPE_NULL
+        buf = data
+        if negstride:
+            # read into a view of data with the axes of negative strides
+            # reversed, described by an MPI derived datatype, so that the
+            # values land in their final order
+            buf = data[tuple(sl)]
+            revtype = _strided_buftype(buf)
+            if revtype is not None:
+                buftype = revtype.ob_mpi
 
         if 0 not in count:
             if self._file.indep_mode:
                 if sum(stride) == ndims or ndims == 0:
                     with nogil:
                         ierr = ncmpi_get_vara(self._file_id, self._varid,<const MPI_Offset *>startp, \
-                        <const MPI_Offset *>countp, PyArray_DATA(data), bufcount, buftype)
+                        <const MPI_Offset *>countp, PyArray_DATA(buf), bufcount, buftype)
                 else:
                     with nogil:
                         ierr = ncmpi_get_vars(self._file_id, self._varid, <const MPI_Offset *>startp, \
-                        <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(data), bufcount, buftype)
+                        <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(buf), bufcount, buftype)
             else:
                 if sum(stride) == ndims or ndims == 0:
                     with nogil:
                         ierr = ncmpi_get_vara_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
-                        <const MPI_Offset *>countp, PyArray_DATA(data), bufcount, buftype)
+                        <const MPI_Offset *>countp, PyArray_DATA(buf), bufcount, buftype)
                 else:
                     with nogil:
                         ierr = ncmpi_get_vars_all(self._file_id, self._varid, <const MPI_Offset *>startp, \
-                        <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(data), bufcount, buftype)
+                        <const MPI_Offset *>countp, <const MPI_Offset *>stridep, PyArray_DATA(buf), bufcount, buftype)
         else:
             ierr = 0
         if ierr == NC_EINVALCOORDS:
@@ -2047,9 +3043,6 @@ cdef class Variable:
         free(startp)
         free(countp)
         free(stridep)
-        if negstride:
-            # reverse data along axes with negative strides.
-            data = data[tuple(sl)].copy() # make a copy so data is contiguous.
         if not self.dimensions:
             return data[0] # a scalar
         elif squeeze_out:
@@ -2062,7 +3055,11 @@ cdef class Variable:
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
         cdef int request
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -2087,7 +3084,8 @@ cdef class Variable:
                 ierr = ncmpi_bput_var(self._file_id, self._varid, \
                                         PyArray_DATA(data), buffcount, bufftype, &request)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
     def _iput_var1(self, value, index, bufcount, MPI.Datatype buftype, buffered=False):
         cdef int ierr, ndims
@@ -2099,7 +3097,11 @@ cdef class Variable:
         # rank of variable.
         data = np.array(value)
         ndim_index = len(index)
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         indexp = <size_t *>malloc(sizeof(size_t) * ndim_index)
         if bufcount is None:
@@ -2123,8 +3125,10 @@ cdef class Variable:
             with nogil:
                 ierr = ncmpi_bput_var1(self._file_id, self._varid, <const MPI_Offset *>indexp,\
                                         PyArray_DATA(data), buffcount, bufftype, &request)
+        free(indexp)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
     def _iput_vara(self, start, count, ndarray data, bufcount, MPI.Datatype buftype, buffered=False):
         cdef int ierr, ndims
@@ -2133,13 +3137,17 @@ cdef class Variable:
         cdef size_t *startp
         cdef size_t *countp
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         for n from 0 <= n < ndims:
             countp[n] = count[n]
             startp[n] = start[n]
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -2162,8 +3170,11 @@ cdef class Variable:
             with nogil:
                 ierr = ncmpi_bput_vara(self._file_id, self._varid, <const MPI_Offset *>startp, <const MPI_Offset *>countp,\
                                         PyArray_DATA(data), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
     def _iput_vars(self, start, count, stride, ndarray data, bufcount, MPI.Datatype buftype, buffered=False):
         cdef int ierr, ndims
@@ -2173,7 +3184,7 @@ cdef class Variable:
         cdef size_t *countp
         cdef ptrdiff_t *stridep
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -2181,7 +3192,11 @@ cdef class Variable:
             countp[n] = count[n]
             startp[n] = start[n]
             stridep[n] = stride[n]
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         if bufcount is None:
             buffcount = 1
@@ -2202,33 +3217,34 @@ cdef class Variable:
             with nogil:
                 ierr = ncmpi_bput_vars(self._file_id, self._varid, <const MPI_Offset *>startp, <const MPI_Offset *>countp,\
                                         <const MPI_Offset *>stridep, PyArray_DATA(data), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
+        free(stridep)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
     def _iput_varn(self, ndarray data, num, starts, counts, bufcount, MPI.Datatype buftype, buffered=False):
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
-        cdef size_t **startsp
-        cdef size_t **countsp
+        cdef MPI_Offset **startsp = NULL
+        cdef MPI_Offset **countsp = NULL
         cdef int num_req
         cdef int request
         num_req = num
-        ndims = len(self.dimensions)
-        max_num_req = len(starts)
-        startsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            startsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                startsp[i][j] = starts[i, j]
-
-        countsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            countsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                countsp[i][j] = counts[i, j]
-
-        if not PyArray_ISCONTIGUOUS(data):
+        ndims = self.ndim
+        # starts and counts are passed to PnetCDF as int64 arrays of shape
+        # (num, ndims), without copying them element by element
+        starts = _varn_offsets(starts, num_req, ndims, "starts")
+        if counts is not None:
+            counts = _varn_offsets(counts, num_req, ndims, "counts")
+
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         #data = data.flatten()
         if bufcount is None:
@@ -2243,31 +3259,39 @@ cdef class Variable:
             bufftype = MPI_DATATYPE_NULL
         else:
             bufftype = buftype.ob_mpi
-        if not buffered:
-            with nogil:
-                ierr = ncmpi_iput_varn(self._file_id,
-                                       self._varid,
-                                       num_req,
-                                       <const MPI_Offset **>startsp,
-                                       <const MPI_Offset **>countsp,
-                                       PyArray_DATA(data),
-                                       buffcount,
-                                       bufftype,
-                                       &request)
-        else:
-            with nogil:
-                ierr = ncmpi_bput_varn(self._file_id,
-                                       self._varid,
-                                       num_req,
-                                       <const MPI_Offset **>startsp,
-                                       <const MPI_Offset **>countsp,
-                                       PyArray_DATA(data),
-                                       buffcount,
-                                       bufftype,
-                                       &request)
-
+        try:
+            startsp = _varn_table(starts, num_req, ndims)
+            if counts is not None:
+                # NULL counts select a single element per request
+                countsp = _varn_table(counts, num_req, ndims)
+            if not buffered:
+                with nogil:
+                    ierr = ncmpi_iput_varn(self._file_id,
+                                           self._varid,
+                                           num_req,
+                                           <const MPI_Offset **>startsp,
+                                           <const MPI_Offset **>countsp,
+                                           PyArray_DATA(data),
+                                           buffcount,
+                                           bufftype,
+                                           &request)
+            else:
+                with nogil:
+                    ierr = ncmpi_bput_varn(self._file_id,
+                                           self._varid,
+                                           num_req,
+                                           <const MPI_Offset **>startsp,
+                                           <const MPI_Offset **>countsp,
+                                           PyArray_DATA(data),
+                                           buffcount,
+                                           bufftype,
+                                           &request)
+        finally:
+            free(startsp)
+            free(countsp)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
     def _iput_varm(self, ndarray data, start, count, stride, imap, bufcount, MPI.Datatype buftype, buffered=False):
         cdef int ierr, ndims
@@ -2278,7 +3302,7 @@ cdef class Variable:
         cdef ptrdiff_t *stridep
         cdef size_t *imapp
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -2294,7 +3318,11 @@ cdef class Variable:
         shapeout = ()
         for lendim in count:
             shapeout = shapeout + (lendim,)
-        if not PyArray_ISCONTIGUOUS(data):
+        if buftype is None:
+            # describe the memory layout and element type of the array by an
+            # MPI datatype, PnetCDF converts the elements to the external type
+            bufcount, buftype = _buffer_type(data, self.dtype)
+        elif not PyArray_ISCONTIGUOUS(data):
             data = data.copy()
         if bufcount is None:
             buffcount = 1
@@ -2315,12 +3343,17 @@ cdef class Variable:
             with nogil:
                 ierr = ncmpi_bput_varm(self._file_id, self._varid, <const MPI_Offset *>startp, <const MPI_Offset *>countp,\
                                         <const MPI_Offset *>stridep, <const MPI_Offset *>imapp, PyArray_DATA(data), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
+        free(stridep)
+        free(imapp)
         _check_err(ierr)
-        return request
+        # buffered requests copy the data into the attached buffer
+        return self._file._add_request(request, None if buffered else data, True, self._varid)
 
-    def bput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def bput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True):
         """
-        bput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        bput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True)
 
         Method to post a nonblocking, buffered write request to write to the
         netCDF variable. The syntax is the same as :meth:`Variable.put_var`.
@@ -2341,31 +3374,48 @@ cdef class Variable:
             sure :meth:`File.attach_buff` is called to allocate an internal
             buffer for accommodating the write requests.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
 
         :Operational mode: This method can be called while the file is in either
             collective or independent data mode.
         """
 
+        if self._file._auto_buff is not None:
+            if count is not None:
+                nelems = int(np.prod(count))
+            else:
+                nelems = 1 if start is not None else int(np.prod(self.shape))
+            if not self._file._reserve_buff(nelems * self.dtype.itemsize, not self._file.indep_mode):
+                # larger than the buffer of File.auto_buff can be
+                return self.iput_var(np.array(data, copy=True), start, count, stride, imap, bufcount, buftype, track=track)
         if data is not None and all(arg is None for arg in [start, count, stride, imap]):
-            return self._iput_var(data, buffered=True, bufcount = bufcount, buftype = buftype)
+            req = self._iput_var(data, buffered=True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start]) and all(arg is None for arg in [count, stride, imap]):
-            return self._iput_var1(data, start, buffered=True, bufcount = bufcount, buftype = buftype)
+            req = self._iput_var1(data, start, buffered=True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count]) and all(arg is None for arg in [stride, imap]):
-            return self._iput_vara(start, count, data, buffered=True, bufcount = bufcount, buftype = buftype)
+            req = self._iput_vara(start, count, data, buffered=True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count, stride]) and all(arg is None for arg in [imap]):
-            return self._iput_vars(start, count, stride, data, buffered=True, bufcount = bufcount, buftype = buftype)
+            req = self._iput_vars(start, count, stride, data, buffered=True, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count, imap]):
-            return self._iput_varm(data, start, count, stride, imap, buffered=True, bufcount = bufcount, buftype = buftype)
+            req = self._iput_varm(data, start, count, stride, imap, buffered=True, bufcount = bufcount, buftype = buftype)
         else:
             raise ValueError("Invalid input arguments for bput_var")
+        return req if track else self._file._untrack(req)
 
-    def iput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def iput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True):
         """
-        iput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        iput_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True)
 
         Method to post a nonblocking request to write to the netCDF variable.
         The syntax is the same as :meth:`Variable.put_var`. For the argument
@@ -2383,32 +3433,44 @@ cdef class Variable:
             returned. Any change to the buffer contents in between will result
             in unexpected error.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
 
         :Operational mode: This method can be called while the file is in either
             collective or independent data mode.
         """
         if data is not None and all(arg is None for arg in [start, count, stride, imap]):
-            return self._iput_var(data, bufcount = bufcount, buftype = buftype)
+            req = self._iput_var(data, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start]) and all(arg is None for arg in [count, stride, imap]):
-            return self._iput_var1(data, start, bufcount = bufcount, buftype = buftype)
+            req = self._iput_var1(data, start, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count]) and all(arg is None for arg in [stride, imap]):
-            return self._iput_vara(start, count, data, bufcount = bufcount, buftype = buftype)
+            req = self._iput_vara(start, count, data, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count, stride]) and all(arg is None for arg in [imap]):
-            return self._iput_vars(start, count, stride, data, bufcount = bufcount, buftype = buftype)
+            req = self._iput_vars(start, count, stride, data, bufcount = bufcount, buftype = buftype)
         elif all(arg is not None for arg in [data, start, count, imap]):
-            return self._iput_varm(data, start, count, stride, imap, bufcount = bufcount, buftype = buftype)
+            req = self._iput_varm(data, start, count, stride, imap, bufcount = bufcount, buftype = buftype)
         else:
             raise ValueError("Invalid input arguments for iput_var")
+        return req if track else self._file._untrack(req)
 
     def _iget_var(self, ndarray data, bufcount, MPI.Datatype buftype):
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
         cdef int request
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of data
+            bufcount, buftype = _buffer_type(data, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2421,7 +3483,7 @@ cdef class Variable:
             ierr = ncmpi_iget_var(self._file_id, self._varid, PyArray_DATA(data), \
             buffcount, bufftype, &request)
         _check_err(ierr)
-        return request
+        return self._file._add_request(request, data, False)
 
 
     def _iget_var1(self, ndarray buff, index, bufcount, MPI.Datatype buftype):
@@ -2432,6 +3494,9 @@ cdef class Variable:
         cdef int request
         ndim_index = len(index)
         indexp = <size_t *>malloc(sizeof(size_t) * ndim_index)
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2448,7 +3513,7 @@ cdef class Variable:
                                 bufftype, &request)
         _check_err(ierr)
         free(indexp)
-        return request
+        return self._file._add_request(request, buff, False)
 
 
     def _iget_vara(self, ndarray data, start, count, bufcount, MPI.Datatype buftype):
@@ -2458,12 +3523,15 @@ cdef class Variable:
         cdef size_t *startp
         cdef size_t *countp
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         for n from 0 <= n < ndims:
             countp[n] = count[n]
             startp[n] = start[n]
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of data
+            bufcount, buftype = _buffer_type(data, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2477,8 +3545,10 @@ cdef class Variable:
             ierr = ncmpi_iget_vara(self._file_id, self._varid, \
                                     <const MPI_Offset *>startp, <const MPI_Offset *>countp, \
                                     PyArray_DATA(data), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
         _check_err(ierr)
-        return request
+        return self._file._add_request(request, data, False)
 
     def _iget_vars(self, ndarray buff, start, count, stride, bufcount, MPI.Datatype buftype):
         cdef int ierr, ndims
@@ -2488,7 +3558,7 @@ cdef class Variable:
         cdef size_t *countp
         cdef ptrdiff_t *stridep
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -2496,6 +3566,9 @@ cdef class Variable:
             countp[n] = count[n]
             startp[n] = start[n]
             stridep[n] = stride[n]
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2509,12 +3582,15 @@ cdef class Variable:
             ierr = ncmpi_iget_vars(self._file_id, self._varid, \
                                     <const MPI_Offset *>startp, <const MPI_Offset *>countp, \
                                     <const MPI_Offset *>stridep, PyArray_DATA(buff), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
+        free(stridep)
         _check_err(ierr)
-        return request
+        return self._file._add_request(request, buff, False)
 
-    def iget_varn(self, ndarray data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None):
+    def iget_varn(self, ndarray data, num, starts, counts=None, bufcount=None, MPI.Datatype buftype=None, track=True):
         """
-        iget_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None)
+        iget_varn(self, data, num, starts, counts=None, bufcount=None, buftype=None, track=True)
 
         This method call is the nonblocking counterpart of
         :meth:`Variable.get_varn`. The syntax is the same as
@@ -2533,34 +3609,38 @@ cdef class Variable:
             returned. Any change to the buffer contents in between will result
             in unexpected error.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
         """
 
         cdef int ierr, ndims
         cdef MPI_Offset buffcount
         cdef MPI_Datatype bufftype
-        cdef size_t **startsp
-        cdef size_t **countsp
+        cdef MPI_Offset **startsp = NULL
+        cdef MPI_Offset **countsp = NULL
         cdef int num_req
         cdef int request
         num_req = num
-        ndims = len(self.dimensions)
-        max_num_req = len(starts)
-        startsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            startsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                startsp[i][j] = starts[i][j]
-
-        countsp = <size_t**> malloc(max_num_req * sizeof(size_t*));
-        for i in range(max_num_req):
-            countsp[i] = <size_t*> malloc(ndims * sizeof(size_t));
-            for j in range(ndims):
-                countsp[i][j] = counts[i][j]
+        ndims = self.ndim
+        # starts and counts are passed to PnetCDF as int64 arrays of shape
+        # (num, ndims), without copying them element by element
+        starts = _varn_offsets(starts, num_req, ndims, "starts")
+        if counts is not None:
+            counts = _varn_offsets(counts, num_req, ndims, "counts")
 
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of data
+            bufcount, buftype = _buffer_type(data, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2570,19 +3650,27 @@ cdef class Variable:
             bufftype = MPI_DATATYPE_NULL
         else:
             bufftype = buftype.ob_mpi
-        with nogil:
-            ierr = ncmpi_iget_varn(self._file_id,
-                                   self._varid,
-                                   num_req,
-                                   <const MPI_Offset **>startsp,
-                                   <const MPI_Offset **>countsp,
-                                   PyArray_DATA(data),
-                                   buffcount,
-                                   bufftype,
-                                   &request)
-
+        try:
+            startsp = _varn_table(starts, num_req, ndims)
+            if counts is not None:
+                # NULL counts select a single element per request
+                countsp = _varn_table(counts, num_req, ndims)
+            with nogil:
+                ierr = ncmpi_iget_varn(self._file_id,
+                                       self._varid,
+                                       num_req,
+                                       <const MPI_Offset **>startsp,
+                                       <const MPI_Offset **>countsp,
+                                       PyArray_DATA(data),
+                                       buffcount,
+                                       bufftype,
+                                       &request)
+        finally:
+            free(startsp)
+            free(countsp)
         _check_err(ierr)
-        return request
+        req = self._file._add_request(request, data, False)
+        return req if track else self._file._untrack(req)
 
     def _iget_varm(self, ndarray buff, start, count, stride, imap, bufcount, MPI.Datatype buftype):
         cdef int ierr, ndims
@@ -2593,7 +3681,7 @@ cdef class Variable:
         cdef ptrdiff_t *stridep
         cdef size_t *imapp
         cdef int request
-        ndims = len(self.dimensions)
+        ndims = self.ndim
         startp = <size_t *>malloc(sizeof(size_t) * ndims)
         countp = <size_t *>malloc(sizeof(size_t) * ndims)
         stridep = <ptrdiff_t *>malloc(sizeof(ptrdiff_t) * ndims)
@@ -2606,6 +3694,9 @@ cdef class Variable:
             else:
                 stridep[n] = 1
             imapp[n] = imap[n]
+        if buftype is None:
+            # PnetCDF converts the elements to the data type of buff
+            bufcount, buftype = _buffer_type(buff, self.dtype, strided=False)
         if bufcount is None:
             buffcount = 1
         else:
@@ -2618,12 +3709,16 @@ cdef class Variable:
             ierr = ncmpi_iget_varm(self._file_id, self._varid, \
                                     <const MPI_Offset *>startp, <const MPI_Offset *>countp, <const MPI_Offset *>stridep, \
                                     <const MPI_Offset *>imapp, PyArray_DATA(buff), buffcount, bufftype, &request)
+        free(startp)
+        free(countp)
+        free(stridep)
+        free(imapp)
         _check_err(ierr)
-        return request
+        return self._file._add_request(request, buff, False)
 
-    def iget_var(self, data=None, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None):
+    def iget_var(self, data=None, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True):
         """
-        iget_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None)
+        iget_var(self, data, start=None, count=None, stride=None, imap=None, bufcount=None, buftype=None, track=True)
 
         Method to post a nonblocking request to read from the netCDF variable.
         The syntax is the same as :meth:`Variable.get_var`. For the argument
@@ -2639,27 +3734,36 @@ cdef class Variable:
             variable) until the read buffer is committed and the transaction is
             completed.
 
-        :return: The request ID, which can be used in a successive call to
-            :meth:`File.wait_all` or :meth:`File.wait` for the completion
-            of the nonblocking operation.
-        :rtype: int
+        :param bool track: [Optional]
+            Whether to return a :class:`pnetcdf.Request`. With False, the
+            integer request ID is returned and no object is kept for the
+            request, see :meth:`File.inq_pending_ids`. Default is True.
+
+        :return: The request, which can be used in a successive call to
+            :meth:`File.wait_all` or :meth:`File.wait`, or waited for by
+            :meth:`Request.wait`, for the completion of the nonblocking
+            operation. It keeps the buffer of the request alive until the
+            request completes, and can be used where an integer request ID
+            is expected.
+        :rtype: :class:`pnetcdf.Request` or int
 
         :Operational mode: This method can be called in either define,
             collective, or independent data mode.
         """
 
         if data is not None and all(arg is None for arg in [start, count, stride, imap]):
-            return self._iget_var(data, bufcount, buftype)
+            req = self._iget_var(data, bufcount, buftype)
         elif all(arg is not None for arg in [data, start]) and all(arg is None for arg in [count, stride, imap]):
-            return self._iget_var1(data, start, bufcount, buftype)
+            req = self._iget_var1(data, start, bufcount, buftype)
         elif all(arg is not None for arg in [data, start, count]) and all(arg is None for arg in [stride, imap]):
-            return self._iget_vara(data, start, count, bufcount, buftype)
+            req = self._iget_vara(data, start, count, bufcount, buftype)
         elif all(arg is not None for arg in [data, start, count, stride]) and all(arg is None for arg in [imap]):
-            return self._iget_vars(data, start, count, stride, bufcount, buftype)
+            req = self._iget_vars(data, start, count, stride, bufcount, buftype)
         elif all(arg is not None for arg in [data, start, count, imap]):
-            return self._iget_varm(data, start, count, stride, imap, bufcount, buftype)
+            req = self._iget_varm(data, start, count, stride, imap, bufcount, buftype)
         else:
             raise ValueError("Invalid input arguments for iget_var")
+        return req if track else self._file._untrack(req)
 
     def inq_offset(self):
         """
@@ -11,6 +11,9 @@ __version__ = "1.0.0"
 from ._File import *
 from ._Dimension import *
 from ._Variable import *
+from ._Request import *
+from ._IOExecutor import *
+from ._RecordWriter import *
 from ._utils import *
 
 def libver():
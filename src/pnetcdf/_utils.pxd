@@ -11,10 +11,18 @@ cdef _strencode(pystr, encoding=*)
 cdef _set_att(file, int varid, name, value, nc_type xtype=*)
 cdef _get_att(file, int varid, name, encoding=*)
 cdef _get_att_names(int file_id, int varid)
+cdef dict _get_atts(file, int varid)
+cdef _cached_att(dict atts, name)
 cdef _nptonctype, _notcdf2dtypes, _nctonptype, _nptompitype, _supportedtypes, _supportedtypescdf2, default_fillvals, _private_atts
 cdef _tostr(s)
 cdef _safecast(a,b)
-cdef _StartCountStride(elem, shape, dimensions=*, file=*, datashape=*, put=*)
+cdef _StartCountStride(elem, shape, int recdim=*, datashape=*, put=*)
+cdef _orthogonal_varn(start, count, stride)
+cdef _varn_offsets(values, int num, int ndims, name)
+cdef MPI_Offset **_varn_table(ndarray arr, int num, int ndims) except NULL
+cdef _strided_buftype(ndarray arr)
+cdef _convertible(dt, vardtype)
+cdef _buffer_type(ndarray arr, vardtype, bint strided=*)
 cdef _out_array_shape(count)
 cdef _get_format(int ncid)
 cpdef chartostring(b,encoding=*)
@@ -11,6 +11,8 @@ import numpy as np
 from numpy.lib.stride_tricks import as_strided
 from libc.stdlib cimport malloc, free
 from mpi4py import MPI
+from collections import OrderedDict
+import asyncio
 
 
 """cdef MPI.Datatype MPI_CHAR, MPI_BYTE, MPI_UNSIGNED_CHAR, MPI_SHORT, MPI_UNSIGNED_SHORT, MPI_INT, \
@@ -45,7 +47,7 @@ _nptonctype  = {'S1' : NC_CHAR_C,
                 'f8' : NC_DOUBLE_C}
 
 _nptompitype = {'S1' : MPI.CHAR,
-                'i1' : MPI.BYTE,
+                'i1' : MPI.SIGNED_CHAR,
                 'u1' : MPI.UNSIGNED_CHAR,
                 'i2' : MPI.SHORT,
                 'u2' : MPI.UNSIGNED_SHORT,
@@ -315,6 +317,30 @@ cdef _get_att_names(int file_id, int varid):
         attslist.append(namstring.decode('utf-8'))
     return attslist
 
+cdef dict _get_atts(file, int varid):
+    # Private method to read all the attributes of a variable (NC_GLOBAL for
+    # the file) in one pass, into a dictionary in the order of their IDs. An
+    # attribute of unsupported datatype is stored as the error raised.
+    atts = {}
+    for name in _get_att_names(file._ncid, varid):
+        try:
+            atts[name] = _get_att(file, varid, name)
+        except KeyError as err:
+            atts[name] = err
+    return atts
+
+cdef _cached_att(dict atts, name):
+    # Private method to return the value of an attribute read by _get_atts.
+    # Arrays are copied, so the cached values cannot be modified.
+    if name not in atts:
+        _check_err(NC_ENOTATT, err_cls=AttributeError)
+    value = atts[name]
+    if isinstance(value, KeyError):
+        raise value
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    return value
+
 cdef _tostr(s):
     try:
         ss = str(s)
@@ -335,6 +361,16 @@ cdef _safecast(a,b):
             is_safe = False
     return is_safe
 
+cdef _is_ascii(ndarray arr):
+    # check whether the bytes of a character or string array are all ASCII,
+    # in which case decoding and encoding them are a cast between numpy 'S'
+    # and 'U' arrays. The codepoints of a 'U' array are uint32.
+    if arr.dtype.kind == 'U':
+        codes = arr.view(np.uint32)
+    else:
+        codes = arr.view(np.uint8)
+    return codes.size == 0 or codes.max() < 128
+
 cpdef chartostring(src, encoding='utf-8'):
     """
     chartostring(src, encoding='utf-8')
@@ -352,25 +388,30 @@ cpdef chartostring(src, encoding='utf-8'):
     :type encoding: str
 
     :return: A numpy string array with datatype `'UN'` (or `'SN'`) and shape
-        `src.shape[:-1]` where where `N=src.shape[-1]`.
+        `src.shape[:-1]` where where `N=src.shape[-1]`. A byte string array
+        is a view of `src` when `src` is C-contiguous, i.e. the characters
+        are not copied. ASCII characters are decoded by a numpy cast, without
+        creating a Python string per character or per string.
 
     :rtype: ``numpy.ndarray``
 
     """
+    cdef ndarray chars
     dtype = src.dtype.kind
     if dtype not in ["S","U"]:
         raise ValueError("type must be string or unicode ('S' or 'U')")
-    if encoding in ['none','None','bytes']:
-        src_str = src.tobytes()
-    else:
-        src_str = src.tobytes().decode(encoding)
     slen = int(src.shape[-1])
-    if encoding in ['none','None','bytes']:
-        out_str = np.array([src_str[n1:n1+slen] for n1 in range(0,len(src_str),slen)],'S'+repr(slen))
-    else:
-        out_str = np.array([src_str[n1:n1+slen] for n1 in range(0,len(src_str),slen)],'U'+repr(slen))
-    out_str.shape = src.shape[:-1]
-    return out_str
+    shape = src.shape[:-1]
+    if slen == 0:
+        return np.zeros(shape, 'S1' if dtype == 'S' and encoding in ['none','None','bytes'] else 'U1')
+    # view each row of slen characters as a single string
+    chars = np.ascontiguousarray(src).reshape(-1)
+    out_str = chars.view(dtype + repr(slen)).reshape(shape)
+    if dtype == 'U' or encoding in ['none','None','bytes']:
+        return out_str
+    if encoding.lower().replace('-', '').replace('_', '') in ['utf8', 'ascii', 'usascii'] and _is_ascii(chars):
+        return out_str.astype('U' + repr(slen))
+    return np.char.decode(out_str, encoding).astype('U' + repr(slen))
 
 cpdef stringtochar(src, encoding='utf-8'):
     """
@@ -380,32 +421,47 @@ cpdef stringtochar(src, encoding='utf-8'):
 
     :param src: Input numpy string array with numpy datatype `'SN'` or `'UN'`,
         where N is the number of characters in each string.  Will be converted
-        to an array of characters (datatype `'S1'` or `'U1'`) of shape
+        to an array of characters (datatype `'S1'`) of shape
         `src.shape + (N,)`.
     :type a: numpy.ndarray
 
     :param encoding: [Optional]
-        Can be used to specify character encoding (default `utf-8`). If
-        `encoding` is 'none' or 'bytes', a `numpy.string_` the input array is
-        treated a raw byte strings (`numpy.string_`).
+        Can be used to specify character encoding (default `utf-8`) of a
+        unicode string array. If `encoding` is 'none' or 'bytes', the input
+        array is treated as raw byte strings (`numpy.string_`), encoded in
+        `utf-8` if unicode.
     :type encoding: str
 
-    :return: A numpy character array with datatype `'S1'` or `'U1'` and shape
-        `src.shape + (N,)`, where N is the length of each string in src.
+    :return: A numpy character array with datatype `'S1'` and shape
+        `src.shape + (N,)`, where N is the length of each string in src. A
+        unicode string array is encoded into N bytes per string, or into the
+        length of the longest encoded string if longer. The characters of a byte string array are a view of
+        `src` when `src` is C-contiguous, i.e. they are not copied.
 
     :rtype: ``numpy.ndarray``
     """
+    cdef ndarray strs
+    src = np.asarray(src)
     dtype = src.dtype.kind
     if dtype not in ["S","U"]:
         raise ValueError("type must string or unicode ('S' or 'U')")
-    if encoding in ['none','None','bytes']:
-        out_array = np.array(tuple(src.tobytes()),'S1')
-    else:
-        out_array = np.array(tuple(src.tobytes().decode(encoding)),dtype+'1')
-    out_array.shape = src.shape + (src.itemsize,)
-    return out_array
-
-cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None, put=False):
+    strs = np.ascontiguousarray(src).reshape(-1)
+    if dtype == 'U':
+        if encoding in ['none','None','bytes']:
+            encoding = 'utf-8'
+        slen = src.itemsize // 4
+        if _is_ascii(strs):
+            strs = strs.astype('S' + repr(slen))
+        else:
+            strs = np.char.encode(strs, encoding)
+            if strs.itemsize < slen:
+                strs = strs.astype('S' + repr(slen))
+    if strs.itemsize == 0:
+        return np.zeros(src.shape + (0,), 'S1')
+    # view each string as its characters
+    return strs.view('S1').reshape(src.shape + (strs.itemsize,))
+
+cdef _StartCountStride(elem, shape, int recdim=-1, datashape=None, put=False):
     """Return start, count, stride and indices needed to store/extract data
     into/from a netCDF variable.
 
@@ -450,11 +506,9 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
     elem : tuple of integer, slice, ellipsis or 1-d boolean or integer
     sequences used to slice the netCDF Variable (Variable[elem]).
     shape : tuple containing the current shape of the netCDF variable.
-    dimensions : sequence
-      The name of the dimensions.
-      __setitem__.
-    file  : netCDF File instance
-      The netCDF file to which the variable being set belongs to.
+    recdim : int
+      The index of the unlimited dimension of the variable, -1 if none. Only
+      needed by __setitem__.
     datashape : sequence
       The shape of the data that is being stored. Only needed by __setitem__
     put : True|False (default False).  If called from __setitem__, put is True.
@@ -493,20 +547,7 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
         shape = (1,)
 
     # is there an unlimited dimension? (only defined for __setitem__)
-    if put:
-        hasunlim = False
-        unlimd={}
-        if dimensions:
-            for i in range(nDims):
-                dimname = dimensions[i]
-                # is this dimension unlimited?
-                # look in current group, and parents for dim.
-                dim = file.dimensions[dimname]
-                unlimd[dimname]=dim.isunlimited()
-                if unlimd[dimname]:
-                    hasunlim = True
-    else:
-        hasunlim = False
+    hasunlim = put and recdim >= 0
 
     # When a single array or (non-tuple) sequence of integers is given
     # as a slice, assume it applies to the first dimension,
@@ -547,14 +588,7 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
             raise IndexError("Index cannot be multidimensional")
         # set unlim to True if dimension is unlimited and put==True
         # (called from __setitem__)
-        if hasunlim and put and dimensions:
-            try:
-                dimname = dimensions[i]
-                unlim = unlimd[dimname]
-            except IndexError:
-                unlim = False
-        else:
-            unlim = False
+        unlim = hasunlim and i == recdim
         # convert boolean index to integer array.
         if np.iterable(ea) and ea.dtype.kind =='b':
             # check that boolean array not too long
@@ -680,12 +714,8 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
         ea = np.asarray(e)
 
         # set unlim to True if dimension is unlimited and put==True
-        # (called from __setitem__). Note: grp and dimensions must be set.
-        if hasunlim and put and dimensions:
-            dimname = dimensions[i]
-            unlim = unlimd[dimname]
-        else:
-            unlim = False
+        # (called from __setitem__).
+        unlim = hasunlim and i == recdim
 
         #    SLICE    #
         if type(e) == slice:
@@ -707,7 +737,7 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
                 except IndexError:
                     raise IndexError("shape of data does not conform to slice")
             else:
-                if unlim and datashape == () and len(dim) == 0:
+                if unlim and datashape == () and shape[i] == 0:
                     # writing scalar along unlimited dimension using slicing
                     # syntax (var[:] = 1, when var.shape = ())
                     length = 1
@@ -746,6 +776,275 @@ cdef _StartCountStride(elem, shape, dimensions=None, file=None, datashape=None,
 
     return start, count, stride, indices#, out_shape
 
+cdef _index_runs(idx):
+    # Private function to merge a 1-d array of indices into runs of
+    # consecutive indices. Return the sorted unique indices, the starts and
+    # lengths of the runs, and the positions to gather along this dimension
+    # for reads (inv) and writes (last), or None if the indices are already
+    # sorted and unique.
+    if len(idx) > 1 and np.all(idx[1:] > idx[:-1]):
+        uniq, inv, last = idx, None, None
+    else:
+        uniq, inv = np.unique(idx, return_inverse=True)
+        # duplicated indices: the value assigned last is written, as numpy
+        _, rfirst = np.unique(idx[::-1], return_index=True)
+        last = len(idx) - 1 - rfirst
+    brk = np.flatnonzero(np.diff(uniq) != 1) + 1
+    run_starts = uniq[np.concatenate(([0], brk))]
+    run_lens = np.diff(np.concatenate(([0], brk, [len(uniq)])))
+    return uniq, run_starts, run_lens, inv, last
+
+cdef _orthogonal_varn(start, count, stride):
+    """Convert an orthogonal selection into the arguments of a single varn
+    request.
+
+    The selection is given by the start, count and stride arrays returned by
+    _StartCountStride, when they describe more than one data chunk, i.e.
+    when 1-d integer or boolean index arrays are used. Indices along each
+    dimension are sorted, duplicates removed, and consecutive indices merged
+    into runs. The subarray requests are ordered so that the data of all
+    requests, read or written one after another, forms a C-contiguous array
+    of shape `uniqshape`, which is the shape of the selection after removing
+    duplicated indices.
+
+    Returns
+    -------
+    starts, counts : ndarray (num, n) of int64
+      The starts and counts of the `num` subarray requests.
+    uniqshape : tuple
+      The shape of the buffer holding the data of all requests.
+    gathers : list of tuple (axis, inv, last)
+      For each dimension whose indices are not sorted and unique, `inv`
+      gives the positions in the buffer of the selected indices along `axis`
+      (used by reads) and `last` the positions in the selection of the unique
+      indices, the last one among duplicates (used by writes).
+    """
+    ndims = start.shape[-1]
+    first = start.reshape(-1, ndims)
+    if first.shape[0] == 0:
+        # empty selection
+        uniqshape = tuple(count.shape[:-1])
+        return np.zeros((0, ndims), np.int64), np.zeros((0, ndims), np.int64), uniqshape, []
+    beg = first[0]
+    cnt = count.reshape(-1, ndims)[0]
+    inc = stride.reshape(-1, ndims)[0]
+
+    # per dimension: unique indices and runs of consecutive indices
+    values = []
+    runs = []
+    gathers = []
+    for i in range(ndims):
+        if start.shape[i] > 1:
+            # index array along this dimension
+            sel = [0] * ndims
+            sel[i] = slice(None)
+            idx = start[tuple(sel) + (i,)].astype(np.int64)
+        elif inc[i] != 1:
+            # strided slice, treated as an index array
+            idx = beg[i] + inc[i] * np.arange(cnt[i], dtype=np.int64)
+        else:
+            # a slice or a scalar index: a single run
+            values.append(None)
+            runs.append((np.array([beg[i]], np.int64), np.array([cnt[i]], np.int64)))
+            continue
+        uniq, run_starts, run_lens, inv, last = _index_runs(idx)
+        values.append(uniq)
+        runs.append((run_starts, run_lens))
+        if inv is not None:
+            gathers.append((i, inv, last))
+    uniqshape = tuple(int(np.sum(run_lens)) for run_starts, run_lens in runs)
+
+    # the last dimension with more than one run. Requests take a single index
+    # along the dimensions before it, a run along it and the whole selection
+    # along the dimensions after it, so that their data is contiguous in a
+    # C-order buffer.
+    m = -1
+    for i in range(ndims):
+        if len(runs[i][0]) > 1:
+            m = i
+    if m < 0:
+        starts = np.array([[r[0][0] for r in runs]], np.int64)
+        counts = np.array([[r[1][0] for r in runs]], np.int64)
+        return starts, counts, uniqshape, gathers
+
+    gridshape = []
+    for i in range(m):
+        if values[i] is None:
+            values[i] = runs[i][0][0] + np.arange(runs[i][1][0], dtype=np.int64)
+        gridshape.append(len(values[i]))
+    gridshape.append(len(runs[m][0]))
+    grid = np.indices(gridshape).reshape(m + 1, -1)
+    num = grid.shape[1]
+    starts = np.empty((num, ndims), np.int64)
+    counts = np.empty((num, ndims), np.int64)
+    for i in range(m):
+        starts[:, i] = values[i][grid[i]]
+        counts[:, i] = 1
+    starts[:, m] = runs[m][0][grid[m]]
+    counts[:, m] = runs[m][1][grid[m]]
+    for i in range(m + 1, ndims):
+        starts[:, i] = runs[i][0][0]
+        counts[:, i] = runs[i][1][0]
+    return starts, counts, uniqshape, gathers
+
+cdef _varn_offsets(values, int num, int ndims, name):
+    """Return the argument starts or counts of the varn methods as a
+    C-contiguous int64 array of shape (num, ndims). An array of this form is
+    used as is, other sequences are converted by numpy in a single pass."""
+    arr = np.ascontiguousarray(values, dtype=np.int64)
+    if arr.ndim != 2 or arr.shape[0] < num or arr.shape[1] != ndims:
+        raise ValueError("%s must be an array of shape (%d, %d), got shape %s" % \
+                         (name, num, ndims, arr.shape))
+    return arr
+
+cdef MPI_Offset **_varn_table(ndarray arr, int num, int ndims) except NULL:
+    """Return a table of pointers to the first num rows of arr, an array
+    returned by _varn_offsets, as expected by the varn functions of PnetCDF.
+    The table must be freed by the caller, and arr kept alive while it is
+    used."""
+    cdef int i
+    cdef MPI_Offset *rows = <MPI_Offset *>PyArray_DATA(arr)
+    cdef MPI_Offset **table = <MPI_Offset **>malloc((num + 1) * sizeof(MPI_Offset *))
+    if table == NULL:
+        raise MemoryError()
+    for i in range(num):
+        table[i] = rows + <size_t>i * ndims
+    return table
+
+# committed MPI derived datatypes built by _strided_buftype, keyed by the
+# dtype, shape and strides of the arrays they describe. The least recently
+# used datatype is freed when the cache is full.
+_buftype_cache = OrderedDict()
+cdef int _buftype_cache_size = 64
+
+cdef _strided_buftype(ndarray arr):
+    """Return an MPI derived datatype describing the memory layout of the
+    elements of a non-contiguous array, relative to its data pointer, or None
+    if the array is C-contiguous. The datatype is committed and cached, and
+    must not be freed by the caller.
+
+    It must only be used by blocking calls and nonblocking write requests,
+    whose buffer is packed by PnetCDF when the request is posted."""
+    if PyArray_ISCONTIGUOUS(arr):
+        return None
+    key = (arr.dtype.str, arr.shape, arr.strides)
+    buftype = _buftype_cache.get(key)
+    if buftype is not None:
+        _buftype_cache.move_to_end(key)
+        return buftype
+    etype = _nptompitype[arr.dtype.str[1:]]
+    buftype = etype
+    for i in range(arr.ndim - 1, -1, -1):
+        if buftype is etype and arr.strides[i] == arr.itemsize:
+            newtype = buftype.Create_contiguous(arr.shape[i])
+        else:
+            # byte strides, which may be negative
+            newtype = buftype.Create_hvector(arr.shape[i], 1, arr.strides[i])
+        if buftype is not etype:
+            buftype.Free()
+        buftype = newtype
+    buftype.Commit()
+    _buftype_cache[key] = buftype
+    if len(_buftype_cache) > _buftype_cache_size:
+        _, oldtype = _buftype_cache.popitem(last=False)
+        oldtype.Free()
+    return buftype
+
+cdef _convertible(dt, vardtype):
+    """Return True if PnetCDF can convert elements of numpy data type dt
+    from/to a variable of numpy data type vardtype, i.e. both are numeric or
+    both are characters, and dt has native byte order."""
+    return dt.isnative and dt.str[1:] in _nptompitype and \
+           (dt.char == 'S') == (vardtype.char == 'S')
+
+cdef _buffer_type(ndarray arr, vardtype, bint strided=True):
+    """Return the bufcount and buftype arguments describing the elements of
+    arr in memory, which PnetCDF converts from/to the external type of a
+    variable of numpy data type vardtype. buftype is None (i.e.
+    MPI_DATATYPE_NULL) when arr is C-contiguous and of data type vardtype.
+    When strided is False, a non-contiguous arr is not allowed."""
+    if arr.dtype == vardtype and PyArray_ISCONTIGUOUS(arr):
+        return 1, None
+    if not _convertible(arr.dtype, vardtype):
+        raise TypeError("cannot convert data type %s from/to variable's data type %s" % \
+                        (arr.dtype, vardtype))
+    if PyArray_ISCONTIGUOUS(arr):
+        return PyArray_SIZE(arr), _nptompitype[arr.dtype.str[1:]]
+    if not strided:
+        raise ValueError("array must be C-contiguous")
+    return 1, _strided_buftype(arr)
+
+# names of the MPI thread support levels
+_thread_level_names = {MPI.THREAD_SINGLE: "MPI_THREAD_SINGLE",
+                       MPI.THREAD_FUNNELED: "MPI_THREAD_FUNNELED",
+                       MPI.THREAD_SERIALIZED: "MPI_THREAD_SERIALIZED",
+                       MPI.THREAD_MULTIPLE: "MPI_THREAD_MULTIPLE"}
+
+# the IOExecutor carrying out the asynchronous operations of File and
+# Variable one after another in the I/O thread, created on first use
+_io_executor = None
+
+def _io_submit(func, *args):
+    """Run func(*args) on the I/O thread shared with the IOExecutor instances
+    and return an asyncio future of its result, resolved on the running event
+    loop. As PnetCDF is then called from a thread other than the main thread,
+    MPI must provide the thread support level MPI_THREAD_SERIALIZED or
+    higher."""
+    global _io_executor
+    loop = asyncio.get_running_loop()
+    if _io_executor is None:
+        level = MPI.Query_thread()
+        if level < MPI.THREAD_SERIALIZED:
+            raise RuntimeError("asynchronous PnetCDF operations run on a dedicated I/O thread, "
+                               "which requires MPI thread support level MPI_THREAD_SERIALIZED "
+                               "or higher, but MPI provides %s" % _thread_level_names.get(level, level))
+        # imported here, as _IOExecutor imports this module
+        from ._IOExecutor import IOExecutor
+        _io_executor = IOExecutor(funneled=False)
+    return asyncio.wrap_future(_io_executor.submit(func, *args), loop=loop)
+
+# the MPI shared memory windows of the arrays returned by
+# Variable.get_shared, by the address of their data
+_shared_windows = {}
+
+def _alloc_shared(node, shape, dtype):
+    """Allocate an array of the given shape and data type in an MPI shared
+    memory window of the processes of communicator node, all running on the
+    same node, in the memory of its process 0. Return the array and the
+    window, which is kept until free_shared is called."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    # at least one byte is allocated, so that the address of the data
+    # identifies the window
+    win = MPI.Win.Allocate_shared(max(nbytes, 1) if node.Get_rank() == 0 else 0,
+                                  dtype.itemsize, comm=node)
+    buf, itemsize = win.Shared_query(0)
+    data = np.ndarray(shape, dtype, buffer=buf)
+    _shared_windows[data.__array_interface__['data'][0]] = win
+    return data, win
+
+cpdef free_shared(array):
+    """
+    free_shared(array)
+
+    Method to release the MPI shared memory of an array returned by
+    :meth:`Variable.get_shared`. The array, and any view of it, must not be
+    used afterwards. The shared memory not released is freed when MPI is
+    finalized.
+
+    :param array: The array returned by :meth:`Variable.get_shared`.
+    :type array: numpy.ndarray
+
+    :Operational mode: This method is collective, all processes that called
+        :meth:`Variable.get_shared` must call it with the array returned.
+    """
+    win = None
+    if isinstance(array, np.ndarray):
+        win = _shared_windows.pop(array.__array_interface__['data'][0], None)
+    if win is None:
+        raise ValueError("array is not an array returned by Variable.get_shared")
+    win.Free()
+
 cdef _out_array_shape(count):
     """Return the output array shape given the count array created by getStartCountStride"""
 
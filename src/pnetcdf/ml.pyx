@@ -0,0 +1,610 @@
+###############################################################################
+#
+#  Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+#  See COPYRIGHT notice in top-level directory.
+#
+###############################################################################
+
+"""
+Readers of training samples stored in netCDF files, for machine learning
+frameworks such as PyTorch.
+"""
+
+from ._utils cimport _check_err
+from ._File cimport File
+import numpy as np
+
+__all__ = ['BatchDataset', 'EpochLoader']
+
+# marks the end of a sequence of batches
+_END = object()
+
+
+class BatchDataset(object):
+    """
+    A ``BatchDataset`` reads samples stored along the first dimension of a set
+    of variables, e.g. the images and labels of a training set, a minibatch at
+    a time. The rows of a minibatch given by an arbitrary list of sample
+    indices are read by one :meth:`Variable.iget_varn` per variable, posting
+    the runs of consecutive indices, and a single :meth:`File.wait`, into
+    batch buffers allocated once and reused for all the batches.
+
+    While a batch is consumed, the next one can be prefetched by
+    :meth:`BatchDataset.prefetch`, or by iterating over
+    :meth:`BatchDataset.prefetching` or :meth:`BatchDataset.iter_batches`.
+    Two sets of batch buffers are used in turns, so the batch returned last
+    stays valid while the next one is read. As PnetCDF carries out
+    nonblocking requests when they are waited for, the reads only overlap the
+    consumption of the current batch when they are carried out by the I/O
+    thread of an :class:`pnetcdf.IOExecutor`, given as `executor`. Otherwise,
+    the requests of a prefetched batch are posted ahead and completed when
+    the batch is requested.
+
+    The class implements the interface of a map-style PyTorch dataset,
+    including ``__getitems__``, by which ``torch.utils.data.DataLoader``
+    fetches an entire minibatch with one call.
+
+    :Example:
+
+     ::
+
+       from pnetcdf.ml import BatchDataset
+
+       with BatchDataset('mnist_images.nc', ['train_samples', 'train_labels'],
+                         comm=MPI.COMM_SELF) as ds:
+           order = np.random.permutation(len(ds))
+           for images, labels in ds.iter_batches(order, batch_size=64):
+               train(images, labels)
+    """
+    def __init__(self, file, variables, transform=None, comm=None, executor=None,
+                 collective=False):
+        """
+        __init__(self, file, variables, transform=None, comm=None, executor=None, collective=False)
+
+        The constructor for :class:`pnetcdf.ml.BatchDataset`.
+
+        :param file: The file to read, or the path of a file, opened for
+            reading on `comm` and closed by :meth:`BatchDataset.close`. The
+            file is switched to independent data mode if it is in collective
+            data mode, or the other way round when `collective` is True.
+        :type file: :class:`pnetcdf.File` or str
+
+        :param variables: The variables holding the samples, given by name or
+            as :class:`pnetcdf.Variable`. Their first dimension indexes the
+            samples and must be of the same length.
+        :type variables: list
+
+        :param transform: [Optional] A function applied to each sample of the
+            first variable by :meth:`BatchDataset.__getitem__` and
+            :meth:`BatchDataset.__getitems__`.
+        :type transform: callable
+
+        :param comm: [Optional] The MPI communicator on which the file is
+            opened when `file` is a path. Default is ``MPI.COMM_WORLD``.
+        :type comm: mpi4py.MPI.Comm
+
+        :param executor: [Optional] The executor whose I/O thread carries out
+            all the reads of the dataset, so that prefetched batches are read
+            while the current one is consumed.
+        :type executor: :class:`pnetcdf.IOExecutor`
+
+        :param bool collective: [Optional] Whether the reads of each batch are
+            completed by :meth:`File.wait_all` in collective data mode, so
+            that MPI-IO can aggregate the reads of all processes. Default is
+            False.
+
+        :Operational mode: The constructor is collective when the file is
+            opened from a path or its data mode is switched. Reads are
+            independent, so each process reads its own batches, unless
+            `collective` is True. Then, the methods reading samples are
+            collective, i.e. all processes must read or prefetch the same
+            number of batches, possibly empty, in the same order.
+        """
+        self._owner = isinstance(file, str)
+        if self._owner:
+            file = File(file, mode='r', comm=comm)
+        self.file = file
+        self.collective = collective
+        if collective and file.indep_mode:
+            file.end_indep()
+        elif not collective and not file.indep_mode:
+            file.begin_indep()
+        self.variables = [file.variables[v] if isinstance(v, str) else v for v in variables]
+        if not self.variables:
+            raise ValueError("no variable to read")
+        self._len = None
+        for v in self.variables:
+            if len(v.shape) == 0:
+                raise ValueError("variable %s has no sample dimension" % v.name)
+            if self._len is None:
+                self._len = v.shape[0]
+            elif v.shape[0] != self._len:
+                raise ValueError("variable %s has %d samples, expecting %d" %
+                                 (v.name, v.shape[0], self._len))
+        self.transform = transform
+        self.executor = executor
+        # the batch buffers and the staging buffers of gathered batches of
+        # each variable, by slot
+        self._batches = [None, None]
+        self._staging = [None, None]
+        # the slot of the batch returned last
+        self._slot = 0
+        # the prefetched batch: (indices, slot, plan, requests or future)
+        self._pending = None
+        self._closed = False
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, idx):
+        """
+        __getitem__(self, idx)
+
+        Read sample `idx` of all the variables.
+
+        :return: The sample of each variable, in the order of `variables`,
+            in arrays owned by the caller.
+        :rtype: tuple
+        """
+        self._check_open()
+        plan = self._plan([idx])
+        arrays = self._resize(None, 1)
+        self._run(plan, arrays, arrays)
+        sample = tuple(a[0] for a in arrays)
+        if self.transform is not None:
+            sample = (self.transform(sample[0]),) + sample[1:]
+        return sample
+
+    def __getitems__(self, indices):
+        """
+        __getitems__(self, indices)
+
+        Read the samples of a minibatch, same as
+        :meth:`BatchDataset.get_batch`.
+
+        :return: The samples, each a tuple of the rows of each variable. The
+            rows are views of the batch buffers, which stay valid until the
+            batch after the next one is requested or prefetched.
+        :rtype: list of tuple
+        """
+        batch = self.get_batch(indices)
+        first = batch[0]
+        if self.transform is not None:
+            first = [self.transform(row) for row in first]
+        return [(first[i],) + tuple(a[i] for a in batch[1:]) for i in range(len(batch[0]))]
+
+    def get_batch(self, indices):
+        """
+        get_batch(self, indices)
+
+        Read the samples of a minibatch. If the batch was prefetched, its
+        reads are completed, otherwise a batch prefetched for other indices
+        is completed and discarded, and the samples are read now. Duplicate
+        and unsorted indices are allowed. In collective mode, all processes
+        must make the same calls, and a batch prefetched for other indices
+        raises a ``ValueError`` after it is completed, so that the
+        processes make the same collective calls.
+
+        :param indices: The indices of the samples. Negative indices count
+            from the end.
+        :type indices: list of int or numpy.ndarray
+
+        :return: An array per variable, in the order of `variables`, holding
+            the samples along its first dimension. The arrays are views of the
+            batch buffers, which stay valid until the batch after the next
+            one is requested or prefetched. No transform is applied.
+        :rtype: tuple of numpy.ndarray
+
+        :raises IndexError: If an index is out of range.
+        :raises ValueError: In collective mode, if a batch was prefetched for
+            other indices.
+        """
+        self._check_open()
+        plan = self._plan(indices)
+        pending = self._pending
+        if pending is not None and np.array_equal(pending[0], plan[0]):
+            self._pending = None
+            slot = pending[1]
+            self._complete(pending[2], pending[3], self._batches[slot], self._staging[slot])
+        elif pending is not None and self.collective:
+            # reading the batch now would make one more collective call
+            # than on the processes whose prefetched batch is requested
+            self._discard()
+            raise ValueError("the batch requested from a collective BatchDataset "
+                             "differs from the batch prefetched")
+        else:
+            # a batch prefetched for other indices is discarded
+            self._discard()
+            slot = 1 - self._slot
+            batch, stage = self._buffers(slot, plan)
+            self._run(plan, batch, stage)
+        self._slot = slot
+        return tuple(a[:len(plan[0])] for a in self._batches[slot])
+
+    def prefetch(self, indices):
+        """
+        prefetch(self, indices)
+
+        Post the reads of the samples of a minibatch, which is then returned
+        by :meth:`BatchDataset.get_batch` of the same indices. The batch
+        returned last stays valid. A batch prefetched earlier and not
+        requested yet is completed and discarded.
+
+        :param indices: The indices of the samples.
+        :type indices: list of int or numpy.ndarray
+
+        :raises IndexError: If an index is out of range.
+        """
+        self._check_open()
+        plan = self._plan(indices)
+        self._discard()
+        slot = 1 - self._slot
+        batch, stage = self._buffers(slot, plan)
+        if self.executor is not None:
+            pending = self.executor.submit(self._read, plan, batch, stage)
+        else:
+            pending = self._post(plan, batch, stage)
+        self._pending = (plan[0], slot, plan, pending)
+
+    def prefetching(self, batches):
+        """
+        prefetching(self, batches)
+
+        Iterate over the minibatches given by a batch sampler, prefetching
+        each batch before the previous one is returned.
+
+        :param batches: The indices of the samples of each batch, e.g. a
+            ``torch.utils.data.BatchSampler``.
+        :type batches: iterable
+
+        :return: A generator of the batches, as returned by
+            :meth:`BatchDataset.get_batch`.
+        """
+        batches = iter(batches)
+        following = next(batches, _END)
+        if following is not _END:
+            self.prefetch(following)
+        while following is not _END:
+            current = following
+            following = next(batches, _END)
+            batch = self.get_batch(current)
+            if following is not _END:
+                self.prefetch(following)
+            yield batch
+
+    def iter_batches(self, indices, batch_size, drop_last=False):
+        """
+        iter_batches(self, indices, batch_size, drop_last=False)
+
+        Iterate over the minibatches of consecutive elements of `indices`,
+        prefetching each batch before the previous one is returned.
+
+        :param indices: The indices of the samples, e.g. a permutation of
+            ``range(len(dataset))``.
+        :type indices: list of int or numpy.ndarray
+
+        :param int batch_size: The number of samples per batch.
+
+        :param bool drop_last: [Optional] Whether the last batch is dropped
+            when it has fewer than `batch_size` samples. Default is False.
+
+        :return: A generator of the batches, as returned by
+            :meth:`BatchDataset.get_batch`.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive, got %d" % batch_size)
+        indices = np.asarray(indices)
+        end = len(indices) - len(indices) % batch_size if drop_last else len(indices)
+        return self.prefetching(indices[i:i + batch_size] for i in range(0, end, batch_size))
+
+    def close(self):
+        """
+        close(self)
+
+        Complete the reads of a prefetched batch and close the file if it was
+        opened by the dataset. It is called at the exit of a ``with`` block.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._discard()
+        if self._owner:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        self.close()
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("BatchDataset is closed")
+
+    def _plan(self, indices):
+        # the indices, the first index and length of each run of consecutive
+        # distinct indices, and the position of each index among the
+        # distinct ones, None if the indices are distinct and sorted
+        idx = np.asarray(indices, dtype=np.int64).reshape(-1)
+        idx = np.where(idx < 0, idx + self._len, idx)
+        if idx.size and (idx.min() < 0 or idx.max() >= self._len):
+            raise IndexError("sample index out of range for %d samples" % self._len)
+        if idx.size == 0 or np.all(np.diff(idx) > 0):
+            distinct, inverse = idx, None
+        else:
+            distinct, inverse = np.unique(idx, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        breaks = np.flatnonzero(np.diff(distinct) != 1) + 1
+        firsts = distinct[np.r_[0, breaks]] if distinct.size else distinct
+        lengths = np.diff(np.r_[0, breaks, distinct.size])
+        return idx, firsts, lengths, inverse
+
+    def _resize(self, arrays, n):
+        if arrays is None or len(arrays[0]) < n:
+            arrays = [np.empty((n,) + tuple(v.shape[1:]), v.dtype) for v in self.variables]
+        return arrays
+
+    def _buffers(self, slot, plan):
+        # the batch and staging buffers of a slot, grown to fit the plan
+        idx, firsts, lengths, inverse = plan
+        self._batches[slot] = self._resize(self._batches[slot], len(idx))
+        if inverse is None:
+            return self._batches[slot], self._batches[slot]
+        self._staging[slot] = self._resize(self._staging[slot], int(lengths.sum()))
+        return self._batches[slot], self._staging[slot]
+
+    def _post(self, plan, batch, stage):
+        idx, firsts, lengths, inverse = plan
+        num = len(firsts)
+        if num == 0:
+            return []
+        nrows = int(lengths.sum())
+        requests = []
+        for v, buf in zip(self.variables, stage):
+            ndims = len(v.shape)
+            starts = np.zeros((num, ndims), np.int64)
+            starts[:, 0] = firsts
+            counts = np.empty((num, ndims), np.int64)
+            counts[:] = v.shape
+            counts[:, 0] = lengths
+            requests.append(v.iget_varn(buf[:nrows], num, starts, counts))
+        return requests
+
+    def _complete(self, plan, pending, batch, stage):
+        if self.executor is not None:
+            pending.result()
+        else:
+            self._wait(plan, pending, batch, stage)
+
+    def _wait(self, plan, requests, batch, stage):
+        idx, firsts, lengths, inverse = plan
+        if self.collective:
+            # processes without requests take part in wait_all
+            self.file.wait_all(requests)
+        elif requests:
+            self.file.wait(requests)
+        for req in requests:
+            _check_err(req.status)
+        if inverse is not None:
+            nrows = int(lengths.sum())
+            for buf, out in zip(stage, batch):
+                np.take(buf[:nrows], inverse, axis=0, out=out[:len(idx)])
+
+    def _read(self, plan, batch, stage):
+        self._wait(plan, self._post(plan, batch, stage), batch, stage)
+
+    def _run(self, plan, batch, stage):
+        if self.executor is not None:
+            self.executor.submit(self._read, plan, batch, stage).result()
+        else:
+            self._read(plan, batch, stage)
+
+    def _discard(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            slot = pending[1]
+            self._complete(pending[2], pending[3], self._batches[slot], self._staging[slot])
+
+
+class EpochLoader(object):
+    """
+    An ``EpochLoader`` reads the minibatches of an epoch of distributed
+    training collectively. All processes take the same global permutation of
+    the samples, e.g. a random shuffle drawn from a common seed, which is
+    split into steps of ``batch_size * nprocs`` samples. At each step, every
+    process reads its own contiguous slice of the step, by one
+    :meth:`Variable.iget_varn` per variable posting the runs of consecutive
+    samples of its slice, and all processes complete their reads by a single
+    collective :meth:`File.wait_all`, so that MPI-IO can aggregate the reads
+    of all processes into large requests to the file system. The next batch
+    is prefetched while the current one is consumed, as by
+    :meth:`BatchDataset.prefetching`.
+
+    A random permutation of the samples scatters the reads of a batch over
+    the whole file. When `block_size` is given, the samples are shuffled
+    within contiguous blocks of `block_size` samples, and the blocks are
+    visited in a random order. A batch then reads a few long runs of samples
+    instead of many single samples, at the cost of batches drawn from fewer
+    regions of the file.
+
+    It replaces a ``DistributedSampler`` and a ``DataLoader`` of PyTorch
+    whose dataset reads the samples of each process independently.
+
+    :Example:
+
+     ::
+
+       from pnetcdf.ml import EpochLoader
+
+       loader = EpochLoader('mnist_images.nc', ['train_samples', 'train_labels'],
+                            batch_size=64, comm=comm, seed=1)
+       for epoch in range(epochs):
+           loader.set_epoch(epoch)
+           for images, labels in loader:
+               train(torch.from_numpy(images), torch.from_numpy(labels))
+       loader.close()
+    """
+    def __init__(self, file, variables, batch_size, comm=None, shuffle=True, seed=0,
+                 block_size=None, drop_last=False, executor=None):
+        """
+        __init__(self, file, variables, batch_size, comm=None, shuffle=True, seed=0, block_size=None, drop_last=False, executor=None)
+
+        The constructor for :class:`pnetcdf.ml.EpochLoader`.
+
+        :param file: The file to read, or the path of a file, opened for
+            reading on `comm` and closed by :meth:`EpochLoader.close`. The
+            file is switched to collective data mode if it is in independent
+            data mode.
+        :type file: :class:`pnetcdf.File` or str
+
+        :param variables: The variables holding the samples, given by name or
+            as :class:`pnetcdf.Variable`. Their first dimension indexes the
+            samples and must be of the same length.
+        :type variables: list
+
+        :param int batch_size: The number of samples per batch of each
+            process.
+
+        :param comm: [Optional] The MPI communicator on which the file is
+            opened when `file` is a path. Default is ``MPI.COMM_WORLD``.
+        :type comm: mpi4py.MPI.Comm
+
+        :param bool shuffle: [Optional] Whether the samples of an epoch are
+            permuted randomly. Default is True.
+
+        :param int seed: [Optional] The seed of the random permutations,
+            which must be the same on all processes. Default is 0.
+
+        :param int block_size: [Optional] The number of consecutive samples
+            of the blocks within which the samples are shuffled. A block size
+            of at least `batch_size` makes the reads of a batch one or two
+            runs of samples. By default, all the samples are shuffled
+            together.
+
+        :param bool drop_last: [Optional] Whether the last step of an epoch is
+            dropped when it has fewer than ``batch_size * nprocs`` samples.
+            Otherwise, its samples are split among the processes in slices of
+            `batch_size`, and the last processes may read fewer samples or
+            none. Default is False.
+
+        :param executor: [Optional] The executor whose I/O thread carries out
+            all the reads, so that prefetched batches are read while the
+            current one is consumed.
+        :type executor: :class:`pnetcdf.IOExecutor`
+
+        :Operational mode: This method and the iteration over the batches of
+            an epoch are collective.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive, got %d" % batch_size)
+        if block_size is not None and block_size <= 0:
+            raise ValueError("block_size must be positive, got %d" % block_size)
+        self.dataset = BatchDataset(file, variables, comm=comm, executor=executor,
+                                    collective=True)
+        comm = (<File>self.dataset.file)._comm
+        self.rank = comm.Get_rank()
+        self.nprocs = comm.Get_size()
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.block_size = block_size
+        self.drop_last = drop_last
+        self.epoch = 0
+
+    def __len__(self):
+        # the number of steps of an epoch
+        step = self.batch_size * self.nprocs
+        if self.drop_last:
+            return len(self.dataset) // step
+        return -(-len(self.dataset) // step)
+
+    def set_epoch(self, epoch):
+        """
+        set_epoch(self, epoch)
+
+        Set the epoch whose permutation of the samples is read by the next
+        iteration over the loader, same as ``DistributedSampler.set_epoch``.
+
+        :param int epoch: The epoch number.
+        """
+        self.epoch = epoch
+
+    def permutation(self, epoch=None):
+        """
+        permutation(self, epoch=None)
+
+        :param int epoch: [Optional] The epoch number. Default is the epoch
+            set by :meth:`EpochLoader.set_epoch`.
+
+        :return: The global permutation of the samples of an epoch, drawn
+            from the seed and the epoch number, the same on all processes.
+        :rtype: numpy.ndarray
+        """
+        n = len(self.dataset)
+        if not self.shuffle:
+            return np.arange(n)
+        rng = np.random.default_rng([self.seed, self.epoch if epoch is None else epoch])
+        if self.block_size is None:
+            return rng.permutation(n)
+        # the position of each block in a random order of the blocks, and a
+        # random order of the samples within each block
+        nblocks = -(-n // self.block_size)
+        position = np.argsort(rng.permutation(nblocks))
+        return np.lexsort((rng.random(n), position[np.arange(n) // self.block_size]))
+
+    def shard(self, permutation):
+        """
+        shard(self, permutation)
+
+        Split a global permutation into the batches of this process.
+
+        :param permutation: The indices of the samples of an epoch, the same
+            on all processes.
+        :type permutation: list of int or numpy.ndarray
+
+        :return: The indices of the samples of each batch of this process.
+        :rtype: list of numpy.ndarray
+        """
+        permutation = np.asarray(permutation)
+        step = self.batch_size * self.nprocs
+        nsteps = len(permutation) // step if self.drop_last else -(-len(permutation) // step)
+        first = self.rank * self.batch_size
+        return [permutation[s * step + first:s * step + first + self.batch_size]
+                for s in range(nsteps)]
+
+    def batches(self, permutation):
+        """
+        batches(self, permutation)
+
+        Iterate over the batches of this process of a global permutation,
+        prefetching each batch before the previous one is returned.
+
+        :param permutation: The indices of the samples of an epoch, the same
+            on all processes.
+        :type permutation: list of int or numpy.ndarray
+
+        :return: A generator of the batches, as returned by
+            :meth:`BatchDataset.get_batch`.
+
+        :Operational mode: All processes must iterate over all the batches.
+        """
+        return self.dataset.prefetching(self.shard(permutation))
+
+    def __iter__(self):
+        return self.batches(self.permutation())
+
+    def close(self):
+        """
+        close(self)
+
+        Complete the reads of a prefetched batch and close the file if it was
+        opened by the loader. It is called at the exit of a ``with`` block.
+        """
+        self.dataset.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        self.close()
@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the cache of the attributes of File and Variable. The
+   attributes are read once and served from the cache, arrays returned can be
+   modified without changing the cached values, missing attributes raise
+   AttributeError, and the cache is refreshed when attributes are added,
+   changed, renamed or deleted, and when the fill value is set by def_fill.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_atts_cache.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_atts_cache.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+SEQATT = np.arange(10, dtype = 'i4')
+
+
+class AttrTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', size)
+        v = f.def_var('temp', pnetcdf.NC_FLOAT, ('x',))
+        f.title = 'attribute cache'
+        f.seqatt = SEQATT
+        v.units = 'K'
+        v.valid_range = np.array([200, 350], 'f4')
+        v.scale = np.float32(0.5)
+        f.enddef()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing the attribute cache for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        v = f.variables['temp']
+        self.assertEqual(f.ncattrs(), ['title', 'seqatt'])
+        self.assertEqual(v.ncattrs(), ['units', 'valid_range', 'scale'])
+        self.assertEqual(f.title, 'attribute cache')
+        self.assertEqual(v.units, 'K')
+        self.assertEqual(v.scale, 0.5)
+        self.assertEqual(f.get_att('title', encoding = 'ascii'), 'attribute cache')
+
+        # arrays returned are copies of the cached values
+        seq = f.seqatt
+        assert_array_equal(seq, SEQATT)
+        seq[:] = -1
+        assert_array_equal(f.seqatt, SEQATT)
+        atts = v.__dict__
+        assert_array_equal(atts['valid_range'], [200, 350])
+        atts['valid_range'][0] = 0
+        assert_array_equal(v.valid_range, [200, 350])
+
+        # missing attributes
+        self.assertRaises(AttributeError, f.get_att, 'history')
+        self.assertFalse(hasattr(v, 'long_name'))
+        self.assertEqual(getattr(v, 'long_name', None), None)
+
+        # modified attributes are read again
+        f.redef()
+        f.title = 'modified'
+        f.put_att('history', 'created')
+        v.units = 'degC'
+        v.rename_att('scale', 'scale_factor')
+        v.del_att('valid_range')
+        v.def_fill(no_fill = 0, fill_value = np.float32(-1))
+        f.del_att('seqatt')
+        f.enddef()
+        self.assertEqual(f.ncattrs(), ['title', 'history'])
+        self.assertEqual(f.__dict__, {'title': 'modified', 'history': 'created'})
+        self.assertEqual(v.units, 'degC')
+        self.assertEqual(v.scale_factor, 0.5)
+        self.assertFalse(hasattr(v, 'scale'))
+        self.assertFalse(hasattr(v, 'valid_range'))
+        self.assertEqual(v._FillValue, -1)
+        self.assertEqual(set(v.ncattrs()), {'units', 'scale_factor', '_FillValue'})
+        f.close()
+
+        # a file opened for reading
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v = f.variables['temp']
+        self.assertEqual(f.title, 'modified')
+        self.assertEqual(v.__dict__['units'], 'degC')
+        self.assertIn('units', str(v))
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(AttrTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
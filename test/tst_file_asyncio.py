@@ -0,0 +1,133 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the asyncio interface, File.wait_all_async,
+   File.wait_async, Variable.aget and Variable.aput. The operations are
+   carried out by the I/O thread while a coroutine keeps running on the event
+   loop. When MPI is initialized with a thread support level lower than
+   MPI_THREAD_SERIALIZED, the methods must raise a RuntimeError instead.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_asyncio.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+import asyncio
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_asyncio.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 16; NUM_VARS = 4
+
+def row(i):
+    # data written by this process to variable i
+    return np.arange(xdim, dtype = 'i4') + 100 * i + 10 * rank
+
+async def ticker(counter):
+    # a task running on the event loop while the I/O is in progress
+    while True:
+        counter[0] += 1
+        await asyncio.sleep(0)
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, pnetcdf.NC_INT, ('y', 'x'))
+        f.enddef()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    async def run_async(self, f):
+        variables = [f.variables['var%d' % i] for i in range(NUM_VARS)]
+        counter = [0]
+        task = asyncio.ensure_future(ticker(counter))
+
+        # nonblocking writes completed by wait_all_async
+        reqs = [v.iput_var(row(i).reshape(1, xdim), start = [rank, 0], count = [1, xdim]) for i, v in enumerate(variables)]
+        errs = await f.wait_all_async(reqs)
+        assert_array_equal(errs, [pnetcdf.NC_NOERR] * NUM_VARS)
+        for req in reqs:
+            self.assertEqual(req.status, pnetcdf.NC_NOERR)
+
+        # blocking reads and writes by aget and aput
+        await variables[0].aput(np.s_[rank, ::2], row(0)[::2] + 1)
+        data = await variables[0].aget(np.s_[rank, :])
+        assert_array_equal(data[::2], row(0)[::2] + 1)
+        assert_array_equal(data[1::2], row(0)[1::2])
+        results = await asyncio.gather(*[v.aget(np.s_[rank]) for v in variables[1:]])
+        for i, data in enumerate(results):
+            assert_array_equal(data, row(i + 1))
+
+        # independent data mode
+        f.begin_indep()
+        bufs = [np.empty((1, xdim), 'i4') for v in variables]
+        reqs = [v.iget_var(buf, start = [rank, 0], count = [1, xdim]) for v, buf in zip(variables, bufs)]
+        errs = await f.wait_async(reqs)
+        assert_array_equal(errs, [pnetcdf.NC_NOERR] * NUM_VARS)
+        assert_array_equal(bufs[NUM_VARS - 1][0], row(NUM_VARS - 1))
+        f.end_indep()
+
+        # errors are raised by awaiting the futures
+        with self.assertRaises(IndexError):
+            await variables[0].aget(np.s_[rank, xdim + 1])
+
+        task.cancel()
+        self.assertGreater(counter[0], 0)
+
+    def runTest(self):
+        """testing asyncio interface for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        if MPI.Query_thread() < MPI.THREAD_SERIALIZED:
+            async def insufficient():
+                with self.assertRaises(RuntimeError):
+                    await f.wait_all_async([])
+            asyncio.run(insufficient())
+        else:
+            asyncio.run(self.run_async(f))
+            # must be called from a running event loop
+            self.assertRaises(RuntimeError, f.wait_all_async, [])
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,147 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the self-managing attached buffer of File.auto_buff.
+   Buffered write requests overflowing the buffer flush the pending requests,
+   requests larger than the buffer grow it, the buffer is shrunk once it is
+   empty and much larger than the recent usage, and requests larger than the
+   maximum size are written from a copy by iput requests. The data written and
+   the statistics returned by File.inq_buff_stats are checked.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_auto_buff.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_auto_buff.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 16; NUM_VARS = 8
+# size in bytes of a row of a variable
+ROW = xdim * 4
+
+def row(i, n = xdim):
+    # data written by this process to variable i
+    return np.arange(n, dtype = 'i4') + 1000 * i + 10 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        f.def_dim('big', 8 * xdim)
+        f.def_dim('huge', 32 * xdim)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, pnetcdf.NC_INT, ('y', 'x'))
+        f.def_var('big', pnetcdf.NC_INT, ('y', 'big'))
+        f.def_var('huge', pnetcdf.NC_INT, ('y', 'huge'))
+        f.enddef()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing self-managing attached buffer for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        variables = [f.variables['var%d' % i] for i in range(NUM_VARS)]
+        self.assertRaises(RuntimeError, f.inq_buff_stats)
+        self.assertRaises(ValueError, f.auto_buff, ROW, 2 * ROW)
+        f.auto_buff(max_size = 16 * ROW, init_size = 2 * ROW)
+        self.assertEqual(f.inq_buff_size(), 2 * ROW)
+
+        # requests overflowing the buffer flush the pending ones
+        buf = np.empty(xdim, 'i4')
+        reqs = []
+        for i, v in enumerate(variables):
+            buf[:] = row(i)
+            reqs.append(v.bput_var(buf, start = [rank, 0], count = [1, xdim]))
+            self.assertLessEqual(f.inq_buff_usage(), f.inq_buff_size())
+        stats = f.inq_buff_stats()
+        self.assertGreater(stats['flushes'], 0)
+        self.assertLessEqual(stats['high_water'], 2 * ROW)
+        self.assertEqual(stats['resizes'], 0)
+        self.assertEqual(stats['spills'], 0)
+        self.assertTrue(reqs[0].test())
+        f.wait_all()
+        for i, v in enumerate(variables):
+            assert_array_equal(v[rank], row(i))
+
+        # a larger request grows the buffer
+        f.variables['big'].bput_var(row(NUM_VARS, 8 * xdim), start = [rank, 0], count = [1, 8 * xdim])
+        stats = f.inq_buff_stats()
+        self.assertEqual(stats['size'], 8 * ROW)
+        self.assertEqual(stats['largest'], 8 * ROW)
+        self.assertEqual(stats['resizes'], 1)
+        f.wait_all()
+
+        # small requests shrink the empty buffer
+        for i in range(2):
+            variables[0].bput_varn(row(0, 2), 2, [[rank, 0], [rank, 1]])
+            f.wait_all()
+        stats = f.inq_buff_stats()
+        self.assertLess(stats['size'], stats['largest'])
+        self.assertEqual(stats['resizes'], 2)
+        self.assertEqual(stats['high_water'], 8 * ROW)
+
+        # requests larger than the maximum size are written from a copy
+        data = row(NUM_VARS + 1, 32 * xdim)
+        req = f.variables['huge'].bput_var(data, start = [rank, 0], count = [1, 32 * xdim])
+        self.assertIsNotNone(req.buffer)
+        data[:] = -1
+        self.assertEqual(f.inq_buff_stats()['spills'], 1)
+        f.wait_all()
+        assert_array_equal(f.variables['huge'][rank], row(NUM_VARS + 1, 32 * xdim))
+
+        # independent data mode
+        f.begin_indep()
+        for i, v in enumerate(variables):
+            v.bput_var(row(i) + 1, start = [rank, 0], count = [1, xdim])
+        f.wait()
+        f.end_indep()
+        for i, v in enumerate(variables):
+            assert_array_equal(v[rank], row(i) + 1)
+
+        f.detach_buff()
+        self.assertRaises(RuntimeError, f.inq_buff_stats)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,142 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the batched lazy reads of File.batch_reads. Within the
+   with block, Variable.lazy returns LazyArray placeholders, whose read
+   requests are completed together at the exit of the block or when the data
+   of a placeholder is first accessed. The data, shape and data type of the
+   placeholders must be the same as those returned by indexing the variables,
+   for basic indexing, negative steps, orthogonal indexing, a scalar variable
+   and a character variable converted to strings.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_batch_reads.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_batch_reads.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 12; NUM_VARS = 4
+
+def row(i):
+    # data written by this process to variable i
+    return np.arange(xdim, dtype = 'f8') + 100 * i + 10 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        f.def_dim('nchar', 4)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, pnetcdf.NC_DOUBLE, ('y', 'x'))
+        f.def_var('scalar', pnetcdf.NC_INT)
+        v = f.def_var('text', pnetcdf.NC_CHAR, ('y', 'nchar'))
+        v._Encoding = 'ascii'
+        f.enddef()
+        for i in range(NUM_VARS):
+            f.variables['var%d' % i][rank, :] = row(i)
+        f.variables['scalar'].put_var_all(np.array(7, 'i4'))
+        f.variables['text'][rank] = 'ab%d' % (rank % 10)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing batched lazy reads for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v = f.variables['var0']
+        keys = [np.s_[rank, :], np.s_[rank], np.s_[rank, 3], np.s_[:, ::-2],
+                np.s_[rank, 1:10:3], np.s_[[rank], [5, 1, 5]], np.s_[..., 2]]
+
+        # the reads are completed at the exit of the block
+        with f.batch_reads():
+            lazies = [v.lazy[key] for key in keys]
+            self.assertEqual(f.inq_nreqs(), len(keys))
+            for lazy in lazies:
+                self.assertFalse(lazy.resolved)
+            scalar = f.variables['scalar'].lazy[...]
+            text = f.variables['text'].lazy[rank]
+            rows = [f.variables['var%d' % i].lazy[rank] for i in range(NUM_VARS)]
+        self.assertEqual(f.inq_nreqs(), 0)
+        for key, lazy in zip(keys, lazies):
+            self.assertTrue(lazy.resolved)
+            ref = v[key]
+            self.assertEqual(lazy.shape, np.shape(ref))
+            self.assertEqual(lazy.dtype, ref.dtype)
+            assert_array_equal(np.asarray(lazy), ref)
+        self.assertEqual(scalar.value, 7)
+        self.assertEqual(text.value, 'ab%d' % (rank % 10))
+        self.assertEqual(text.shape, ())
+        for i, lazy in enumerate(rows):
+            assert_array_equal(lazy[:], row(i))
+
+        # the first access to a placeholder completes the batch
+        with f.batch_reads() as batch:
+            first = f.variables['var1'].lazy[rank, :]
+            second = f.variables['var2'].lazy[rank, 2:4]
+            assert_array_equal(first.value, row(1))
+            self.assertTrue(second.resolved)
+            self.assertEqual(f.inq_nreqs(), 0)
+            # placeholders created afterwards form a new batch
+            third = f.variables['var3'].lazy[rank, ::-1]
+            self.assertFalse(third.resolved)
+            batch.resolve()
+            self.assertTrue(third.resolved)
+        assert_array_equal(second.value, row(2)[2:4])
+        assert_array_equal(third.value, row(3)[::-1])
+
+        # independent data mode
+        f.begin_indep()
+        with f.batch_reads():
+            lazy = v.lazy[rank, 1:3]
+        assert_array_equal(lazy.value, row(0)[1:3])
+        f.end_indep()
+
+        # Variable.lazy outside File.batch_reads
+        self.assertRaises(RuntimeError, v.lazy.__getitem__, rank)
+        with f.batch_reads():
+            self.assertRaises(RuntimeError, f.batch_reads)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
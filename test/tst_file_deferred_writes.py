@@ -0,0 +1,167 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the deferred write mode of File.deferred_writes. Within
+   the with block, writes made by Variable.__setitem__ (basic, general and
+   orthogonal indexing), put_var_all and put_var are posted as nonblocking
+   requests, which are flushed at the exit of the block, when the request or
+   byte thresholds are reached, before reads and when changing the data mode.
+   Write buffers whose references are dropped must be kept alive until the
+   flush, and with copy=True modifying a buffer after the write must not
+   change the data written.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_deferred_writes.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys, gc
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_deferred_writes.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 20; NUM_VARS = 8
+
+def row(i):
+    # data written by this process to variable i
+    return np.arange(xdim, dtype = 'i4') + 1000 * i + 10 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('time', -1)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, pnetcdf.NC_INT, ('y', 'x'))
+        f.def_var('rec', pnetcdf.NC_INT, ('time', 'y', 'x'))
+        f.enddef()
+
+        # writes of temporary arrays are deferred until the exit of the block
+        with f.deferred_writes():
+            for i in range(NUM_VARS):
+                f.variables['var%d' % i][rank, :] = row(i)
+            gc.collect()
+            # overwrite freed memory, if any
+            junk = [np.full(xdim, -1, 'i4') for i in range(NUM_VARS)]
+            self.assertEqual(f.inq_nreqs(), NUM_VARS)
+        self.assertEqual(f.inq_nreqs(), 0)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing deferred write mode for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        variables = [f.variables['var%d' % i] for i in range(NUM_VARS)]
+        for i, v in enumerate(variables):
+            assert_array_equal(v[rank], row(i))
+
+        # request-count threshold, put_var_all and reading in the block
+        with f.deferred_writes(max_requests = 3) as dw:
+            for i, v in enumerate(variables):
+                v.put_var_all(row(i).reshape(1, xdim) + 1, start = [rank, 0], count = [1, xdim])
+                self.assertEqual(f.inq_nreqs(), (i + 1) % 3)
+            # reads flush the pending writes first
+            assert_array_equal(variables[-1][rank], row(NUM_VARS - 1) + 1)
+            self.assertEqual(f.inq_nreqs(), 0)
+
+        # byte threshold, agreed among processes every 32 writes
+        with f.deferred_writes(max_bytes = 2 * xdim * 4):
+            # single elements, in total less than the threshold
+            for i in range(31):
+                variables[i // xdim][rank, i % xdim] = row(i // xdim)[i % xdim]
+            self.assertEqual(f.inq_nreqs(), 31)
+            variables[2][rank, :] = row(2)
+            self.assertEqual(f.inq_nreqs(), 0)
+
+        # general path (record variable), orthogonal indexing and strided data
+        with f.deferred_writes() as dw:
+            f.variables['rec'][0:1, rank, :] = row(NUM_VARS).reshape(1, xdim)
+            f.variables['rec'][1, rank] = row(NUM_VARS) + 1
+            variables[2][[rank], [0, 3, 1]] = np.array([-1, -3, -2], dtype = 'i4')
+            variables[3][rank, ::-1] = row(3)
+            buf = np.stack([row(4), row(4)], axis = 1)
+            variables[4][rank, :] = buf[:, 1]
+            dw.flush()
+            self.assertEqual(f.inq_nreqs(), 0)
+        self.assertEqual(f.variables['rec'].shape[0], 2)
+        assert_array_equal(f.variables['rec'][:, rank], [row(NUM_VARS), row(NUM_VARS) + 1])
+        assert_array_equal(variables[2][rank, :4], [-1, -2, 2000 + 10 * rank + 2, -3])
+        assert_array_equal(variables[3][rank], row(3)[::-1])
+        assert_array_equal(variables[4][rank], row(4))
+
+        # the write buffers are copied when requested
+        buf = row(5)
+        with f.deferred_writes(copy = True):
+            variables[5][rank, :] = buf
+            buf[:] = -1
+        assert_array_equal(variables[5][rank], row(5))
+
+        # nested deferred write mode
+        with f.deferred_writes():
+            self.assertRaises(RuntimeError, f.deferred_writes)
+
+        # independent data mode, flushed when leaving it
+        f.begin_indep()
+        # byte threshold checked at each write
+        with f.deferred_writes(max_bytes = 2 * xdim * 4):
+            variables[6].put_var(row(6) + 2, start = [rank, 0], count = [1, xdim])
+            self.assertEqual(f.inq_nreqs(), 1)
+            variables[7].put_var(row(7) + 3, start = [rank, 0], count = [1, xdim])
+            self.assertEqual(f.inq_nreqs(), 0)
+        with f.deferred_writes():
+            variables[6].put_var(row(6) + 2, start = [rank, 0], count = [1, xdim])
+            self.assertEqual(f.inq_nreqs(), 1)
+            f.end_indep()
+            self.assertEqual(f.inq_nreqs(), 0)
+        assert_array_equal(variables[6][rank], row(6) + 2)
+
+        # close flushes the pending writes
+        dw = f.deferred_writes()
+        dw.__enter__()
+        variables[7][rank, :] = row(7) + 3
+        f.close()
+        dw.__exit__(None, None, None)
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        assert_array_equal(f.variables['var7'][rank], row(7) + 3)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,168 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests IOExecutor. Worker threads queue writes and reads by
+   IOExecutor.put and IOExecutor.get, which are merged per variable and
+   completed by IOExecutor.wait_all, carried out by the I/O thread shared by
+   all executors. Errors of the requests of a variable are set to their futures.
+   When MPI only provides MPI_THREAD_FUNNELED, the operations are carried out
+   by the main thread in IOExecutor.serve, and with MPI_THREAD_SINGLE the
+   constructor must raise a RuntimeError.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_io_executor.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+import threading
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_io_executor.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+NUM_THREADS = 4; xdim = 8 * NUM_THREADS; NUM_VARS = 2
+
+def chunk(i, t):
+    # data written by thread t of this process to variable i
+    n = xdim // NUM_THREADS
+    return np.arange(t * n, (t + 1) * n, dtype = 'i4') + 1000 * i + 100 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('time', -1)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, pnetcdf.NC_INT, ('y', 'x'))
+        f.def_var('rec', pnetcdf.NC_DOUBLE, ('time', 'y'))
+        f.enddef()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def run_workers(self, ex, f):
+        variables = [f.variables['var%d' % i] for i in range(NUM_VARS)]
+        n = xdim // NUM_THREADS
+        results = [None] * NUM_THREADS
+
+        def worker(t):
+            # writes queued by several threads, merged per variable
+            results[t] = [ex.put(v, chunk(i, t), start = [rank, t * n], count = [1, n])
+                          for i, v in enumerate(variables)]
+
+        threads = [threading.Thread(target = worker, args = (t,)) for t in range(NUM_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # record variable, single elements
+        recs = [ex.put(f.variables['rec'], np.float64(step + rank), start = [step, rank])
+                for step in range(3)]
+        ex.wait_all(f).result()
+        for futs in results + [recs]:
+            for fut in futs:
+                self.assertIsNone(fut.result())
+
+        # reads, including the entire variable
+        gets = [ex.get(v, start = [rank, 0], count = [1, xdim]) for v in variables]
+        whole = ex.get(variables[0])
+        # an invalid read fails without failing the requests to other variables
+        bad = ex.get(f.variables['rec'], start = [5, rank])
+        self.assertFalse(gets[0].done())
+        ex.wait_all(f).result()
+        for i, fut in enumerate(gets):
+            expected = np.concatenate([chunk(i, t) for t in range(NUM_THREADS)])
+            assert_array_equal(fut.result(), expected.reshape(1, xdim))
+        self.assertEqual(whole.result().shape, (size, xdim))
+        assert_array_equal(whole.result()[rank], gets[0].result()[0])
+        self.assertRaises(RuntimeError, bad.result)
+
+        # other operations, carried out in order
+        self.assertEqual(ex.submit(lambda: f.variables['rec'].shape[0]).result(), 3)
+        ex.submit(f.begin_indep).result()
+        fut = ex.get(variables[1], start = [rank, 0], count = [1, 2])
+        elem = ex.get(f.variables['rec'], start = [2, rank])
+        ex.wait(f).result()
+        assert_array_equal(fut.result()[0], chunk(1, 0)[:2])
+        assert_array_equal(elem.result(), [2.0 + rank])
+        ex.submit(f.end_indep).result()
+
+        # reads and writes never waited for fail at shutdown
+        fut = ex.get(variables[1], start = [rank, 0])
+        ex.shutdown()
+        self.assertRaises(RuntimeError, fut.result)
+        self.assertRaises(RuntimeError, ex.get, variables[0])
+
+    def runTest(self):
+        """testing IOExecutor for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        level = MPI.Query_thread()
+        if level >= MPI.THREAD_SERIALIZED:
+            ex = pnetcdf.IOExecutor()
+            self.assertFalse(ex.funneled)
+            self.run_workers(ex, f)
+            # all executors share the same I/O thread
+            with pnetcdf.IOExecutor() as ex1, pnetcdf.IOExecutor() as ex2:
+                thread = ex1.submit(threading.current_thread).result()
+                self.assertIsNot(thread, threading.current_thread())
+                self.assertIs(ex2.submit(threading.current_thread).result(), thread)
+        elif level == MPI.THREAD_FUNNELED:
+            # the main thread carries out the operations
+            ex = pnetcdf.IOExecutor()
+            self.assertTrue(ex.funneled)
+            failures = []
+            def client():
+                try:
+                    self.run_workers(ex, f)
+                except BaseException as e:
+                    failures.append(e)
+                    ex.shutdown(wait = False)
+            thread = threading.Thread(target = client)
+            thread.start()
+            ex.serve()
+            thread.join()
+            if failures:
+                raise failures[0]
+        else:
+            self.assertRaises(RuntimeError, pnetcdf.IOExecutor)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the dimension and variable metadata of a file opened
+   for read. `File.dimensions` and `File.variables` are indexed when the file
+   is opened, while their `Dimension` and `Variable` instances are created only
+   when first accessed. The program checks the indexed metadata is consistent
+   with the one defined when the file was created, including after renaming
+   dimensions and variables.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_metadata.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_metadata.nc"
+xdim = 9; ydim = 10; zdim = 11
+NUM_VARS = 100
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        # select next file format for testing
+        self._file_format = file_formats.pop(0)
+
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        dim_t = f.def_dim('t', -1)
+        dim_x = f.def_dim('x', xdim)
+        dim_y = f.def_dim('y', ydim)
+        dim_z = f.def_dim('z', zdim)
+        for i in range(NUM_VARS):
+            dims = (dim_t, dim_y, dim_z) if i % 2 else (dim_x, dim_y, dim_z)
+            f.def_var(f'data{i}', pnetcdf.NC_INT, dims)
+        f.def_var('scalar', pnetcdf.NC_DOUBLE)
+        # rename a dimension and a variable so that names differ from the
+        # order they were defined
+        f.rename_dim('y', 'new_y')
+        f.rename_var('data0', 'new_data0')
+        f.enddef()
+        # write 2 records
+        v = f.variables['data1']
+        v[:2] = np.zeros((2, ydim, zdim), dtype = np.int32)
+        f.close()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def runTest(self):
+        """testing indexed file metadata for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+
+        # check names, order and membership without creating instances
+        self.assertEqual(list(f.dimensions.keys()), ['t', 'x', 'new_y', 'z'])
+        self.assertEqual(len(f.variables), NUM_VARS + 1)
+        self.assertTrue('new_data0' in f.variables)
+        self.assertFalse('data0' in f.variables)
+        self.assertEqual(list(f.variables)[:2], ['new_data0', 'data1'])
+        self.assertRaises(KeyError, f.variables.__getitem__, 'data0')
+
+        # check instances created on first access
+        v = f.variables['data1']
+        self.assertTrue(v is f.variables['data1'])
+        self.assertEqual(v.dimensions, ('t', 'new_y', 'z'))
+        self.assertEqual(v.shape, (2, ydim, zdim))
+        self.assertEqual(f.variables['new_data0'].shape, (xdim, ydim, zdim))
+        self.assertEqual(f.variables['scalar'].shape, ())
+        self.assertEqual(f.variables['scalar'].dtype, np.float64)
+        self.assertTrue(v.get_dims()[0] is f.dimensions['t'])
+        self.assertEqual(f.inq_unlimdim().name, 't')
+        self.assertEqual(len(f.dimensions['new_y']), ydim)
+
+        # check iterating over all entries
+        for name, var in f.variables.items():
+            self.assertEqual(var.name, name)
+        for name, dim in f.dimensions.items():
+            self.assertEqual(dim.name, name)
+        f.close()
+
+    def tearDown(self):
+        # remove the temporary files
+        comm.Barrier()
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
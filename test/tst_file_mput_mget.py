@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests writing and reading subarrays of multiple variables by a
+   single call, using File.put_vars_all and File.get_vars_all (collective) and
+   File.put_vars and File.get_vars (independent). Variables of different data
+   types and numbers of dimensions, including a record variable and a scalar
+   variable, are accessed together. A process with no requests must still be
+   able to take part in the collective calls.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_mput_mget.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_mput_mget.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 10; NUM_VARS = 6
+datatypes = [pnetcdf.NC_INT, pnetcdf.NC_FLOAT, pnetcdf.NC_DOUBLE, pnetcdf.NC_SHORT]
+
+def row(i, n):
+    # data written by this process to variable i
+    return np.arange(n, dtype = 'f8') + 100 * i + 10 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('time', -1)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        for i in range(NUM_VARS):
+            f.def_var('var%d' % i, datatypes[i % len(datatypes)], ('y', 'x'))
+        f.def_var('rec', pnetcdf.NC_INT, ('time', 'y', 'x'))
+        f.def_var('scalar', pnetcdf.NC_DOUBLE)
+        f.enddef()
+
+        # all variables in one collective call, given by Variable or name
+        reqs = {}
+        for i in range(NUM_VARS):
+            v = f.variables['var%d' % i]
+            key = v if i % 2 else v.name
+            reqs[key] = ([rank, 0], [1, xdim], row(i, xdim))
+        reqs['rec'] = ([0, rank, 0], [1, 1, xdim], row(NUM_VARS, xdim).astype('i4'))
+        if rank == 0:
+            reqs['scalar'] = ([], [], np.array(3.5))
+        f.put_vars_all(reqs)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check_get(self, f, get):
+        reqs = {'var%d' % i: ([rank, 0], [1, xdim]) for i in range(NUM_VARS)}
+        reqs['rec'] = (None, None)
+        out = np.zeros(3, 'f8')
+        reqs['scalar'] = ([], [], np.zeros((), 'f8'))
+        reqs[f.variables['var0']] = ([rank, 2], [1, 3], out)
+        res = get(reqs)
+        self.assertEqual(set(res), set(reqs))
+        for i in range(1, NUM_VARS):
+            v = f.variables['var%d' % i]
+            self.assertEqual(res['var%d' % i].shape, (1, xdim))
+            self.assertEqual(res['var%d' % i].dtype, v.dtype)
+            assert_array_equal(res['var%d' % i][0], row(i, xdim).astype(v.dtype))
+        # the whole record variable
+        self.assertEqual(res['rec'].shape, (1, size, xdim))
+        assert_array_equal(res['rec'][0, rank], row(NUM_VARS, xdim))
+        self.assertEqual(res['scalar'], 3.5)
+        # read into an existing array, converted from NC_INT
+        self.assertIs(res[f.variables['var0']], out)
+        assert_array_equal(out, row(0, xdim)[2:5])
+        # a process with no requests
+        res = get({} if rank == 0 else {'var1': ([rank, 0], [1, xdim])})
+        if rank == 0:
+            self.assertEqual(res, {})
+
+    def runTest(self):
+        """testing multi-variable put and get for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        self.check_get(f, f.get_vars_all)
+
+        # independent mode
+        f.begin_indep()
+        f.put_vars({'var1': ([rank, 0], [1, 2], [-1, -2])})
+        res = f.get_vars({'var1': ([rank, 0], [1, 2])})
+        assert_array_equal(res['var1'], [[-1, -2]])
+        f.put_vars({'var1': ([rank, 0], [1, 2], row(1, 2))})
+        f.end_indep()
+        self.check_get(f, f.get_vars_all)
+
+        # invalid requests
+        self.assertRaises(ValueError, f.put_vars_all, {'var0': ([rank, 0], [1, xdim])})
+        self.assertRaises(ValueError, f.put_vars_all, {'var0': ([rank, 0], [1, xdim], np.zeros(xdim + 1))})
+        self.assertRaises(ValueError, f.get_vars_all, {'var0': ([rank], [1])})
+        self.assertRaises(KeyError, f.get_vars_all, {'none': ([rank, 0], [1, xdim])})
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
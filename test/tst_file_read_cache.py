@@ -0,0 +1,162 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the block cache of independent reads enabled by
+   File.cache_reads. Reads of the indexer syntax, including strided and
+   reversed slices, are served from blocks of records and checked against the
+   data written, together with the hit, miss, eviction and invalidation
+   counters returned by File.inq_cache_stats. Blocking and nonblocking writes
+   through the same File drop the blocks of the variable written, reads whose
+   blocks do not fit in the cache are made directly, and reads in collective
+   data mode are not cached. Each process reads and writes its own row.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_read_cache.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_read_cache.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+# records per process, record length, records per block
+ndim = 12; xdim = 8; BLOCK = 4
+# size in bytes of a block
+BLOCK_BYTES = BLOCK * xdim * 4
+
+def rows(n):
+    # the records of this process
+    return np.arange(n * xdim, dtype = 'i4').reshape(n, xdim) + 10000 * rank
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('time', -1)
+        f.def_dim('y', size)
+        f.def_dim('n', ndim)
+        f.def_dim('x', xdim)
+        v = f.def_var('data', pnetcdf.NC_INT, ('y', 'n', 'x'))
+        r = f.def_var('rec', pnetcdf.NC_INT, ('time', 'y', 'x'))
+        f.enddef()
+        v.put_var_all(rows(ndim), start = [rank, 0, 0], count = [1, ndim, xdim])
+        r.put_var_all(rows(2), start = [0, rank, 0], count = [2, 1, xdim])
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def assertStats(self, f, **expected):
+        stats = f.inq_cache_stats()
+        for key, value in expected.items():
+            self.assertEqual(stats[key], value, key)
+
+    def runTest(self):
+        """testing block cache of independent reads for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        v = f.variables['data']
+        self.assertRaises(RuntimeError, f.inq_cache_stats)
+        self.assertRaises(ValueError, f.cache_reads, 0)
+        self.assertRaises(ValueError, f.cache_reads, BLOCK_BYTES, block_shape = (1, 0))
+        # blocks of one row of y and BLOCK records
+        f.cache_reads(16 * BLOCK_BYTES, block_shape = (1, BLOCK))
+        f.begin_indep()
+        expected = rows(ndim)
+
+        # overlapping reads are served from the blocks read
+        assert_array_equal(v[rank, 5], expected[5])
+        self.assertStats(f, misses = 1, hits = 0, blocks = 1, size = BLOCK_BYTES)
+        assert_array_equal(v[rank, 6, 2:5], expected[6, 2:5])
+        self.assertStats(f, misses = 1, hits = 1)
+        assert_array_equal(v[rank, 3:9], expected[3:9])
+        self.assertStats(f, misses = 3, hits = 2, blocks = 3)
+        assert_array_equal(v[rank, 10:1:-3, ::2], expected[10:1:-3, ::2])
+        assert_array_equal(v[rank:rank + 1, ..., -1], expected[np.newaxis, :, -1])
+        self.assertEqual(v[rank, 11, 7], expected[11, 7])
+        self.assertStats(f, misses = 3, evictions = 0, bypasses = 0)
+
+        # blocking and nonblocking writes drop the blocks of the variable
+        v[rank, 6] = expected[6] + 1
+        self.assertStats(f, blocks = 0, invalidations = 3)
+        assert_array_equal(v[rank, 6], expected[6] + 1)
+        self.assertStats(f, misses = 4, blocks = 1)
+        req = v.iput_var(expected[7] + 2, start = [rank, 7, 0], count = [1, 1, xdim])
+        self.assertStats(f, blocks = 0, invalidations = 4)
+        # reads of a variable with pending writes are not cached
+        v[rank, 0]
+        self.assertStats(f, blocks = 0, bypasses = 1)
+        f.wait([req])
+        assert_array_equal(v[rank, 7], expected[7] + 2)
+        self.assertStats(f, blocks = 1)
+
+        # records added by writes of a record variable are read
+        r = f.variables['rec']
+        assert_array_equal(r[1, rank], rows(2)[1])
+        r[2, rank] = expected[0]
+        assert_array_equal(r[0:3, rank], np.concatenate((rows(2), expected[:1])))
+
+        # least recently used blocks are evicted, reads larger than the
+        # cache are made directly
+        f.cache_reads(2 * BLOCK_BYTES, block_shape = (1, BLOCK))
+        for i in range(0, ndim, BLOCK):
+            v[rank, i]
+        self.assertStats(f, misses = 3, evictions = 1, blocks = 2, size = 2 * BLOCK_BYTES)
+        v[rank, 0]
+        self.assertStats(f, misses = 4, evictions = 2)
+        assert_array_equal(v[rank, :, 0], np.concatenate((expected[:6, 0], [expected[6, 0] + 1, expected[7, 0] + 2], expected[8:, 0])))
+        self.assertStats(f, bypasses = 1)
+
+        # reads in collective mode are not cached, sync drops all blocks
+        f.end_indep()
+        assert_array_equal(v[rank, 1], expected[1])
+        self.assertStats(f, misses = 4, hits = 0)
+        f.sync()
+        self.assertStats(f, blocks = 0, size = 0)
+
+        # default block shape, as many rows of y as fit in 64 KiB
+        f.cache_reads(1048576)
+        f.begin_indep()
+        assert_array_equal(v[rank, 2], expected[2])
+        self.assertStats(f, blocks = 1, size = 4 * ndim * xdim * min(size, 65536 // (4 * ndim * xdim)))
+        f.end_indep()
+        f.cache_reads(None)
+        self.assertRaises(RuntimeError, f.inq_cache_stats)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests RecordWriter, writing one record per step to record
+   variables from staging buffers by iput requests, from the attached buffer
+   by bput requests, and through an IOExecutor when MPI provides thread
+   support level MPI_THREAD_SERIALIZED. The arrays passed to write are
+   modified right after each call, which must not change the data written.
+   Each process writes its own row of the records, and the records written by
+   each mode are read back and checked. Entire records are written when no
+   subarray is given.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_file_record_writer.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_file_record_writer.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 10; NUM_STEPS = 5
+
+def record(name, step):
+    # data written by this process at a step
+    if name == 'temp':
+        return np.arange(xdim, dtype = 'f8') + 100 * step + rank
+    return np.int32(step * 10 + rank)
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('time', -1)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        f.def_var('temp', pnetcdf.NC_DOUBLE, ('time', 'y', 'x'))
+        f.def_var('step', pnetcdf.NC_INT, ('time', 'y'))
+        f.def_var('fixed', pnetcdf.NC_INT, ('y',))
+        f.enddef()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def write_steps(self, w, first):
+        temp = np.empty(xdim, 'f8')
+        for n in range(NUM_STEPS):
+            temp[:] = record('temp', n)
+            self.assertEqual(w.write({'temp': temp, 'step': record('step', n)}), first + n)
+            # the arrays can be modified once write returns
+            temp[:] = -1
+
+    def runTest(self):
+        """testing RecordWriter for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        self.assertRaises(ValueError, pnetcdf.RecordWriter, f, ['fixed'])
+        self.assertRaises(ValueError, pnetcdf.RecordWriter, f, {'temp': ([rank], [1])})
+        modes = [{}, {'buffered': True}]
+        executor = None
+        if MPI.Query_thread() >= MPI.THREAD_SERIALIZED:
+            executor = pnetcdf.IOExecutor()
+            modes.append({'executor': executor})
+            self.assertRaises(ValueError, pnetcdf.RecordWriter, f, ['temp'], buffered = True, executor = executor)
+
+        for kwargs in modes:
+            first = f.variables['temp'].shape[0]
+            # each process writes its own row of the records
+            rows = {'temp': ([rank, 0], [1, xdim]), f.variables['step']: ([rank], [1])}
+            w = pnetcdf.RecordWriter(f, rows, **kwargs)
+            self.assertEqual(w.record, first)
+            self.write_steps(w, first)
+            self.assertRaises(KeyError, w.write, {'temp': record('temp', 0)})
+            w.close()
+            self.assertEqual(w.steps, NUM_STEPS)
+            self.assertRaises(RuntimeError, w.write, {'temp': record('temp', 0), 'step': 0})
+            if kwargs.get('buffered'):
+                # the attached buffer is detached
+                self.assertRaises(RuntimeError, f.inq_buff_size)
+            self.assertEqual(f.variables['temp'].shape[0], first + NUM_STEPS)
+            for n in range(NUM_STEPS):
+                assert_array_equal(f.variables['temp'][first + n, rank], record('temp', n))
+                self.assertEqual(f.variables['step'][first + n, rank], record('step', n))
+
+        # entire records, written by rank 0 in independent data mode
+        f.begin_indep()
+        if rank == 0:
+            with pnetcdf.RecordWriter(f, ['step'], record = 0) as w:
+                w.write({'step': np.arange(size, dtype = 'i4')})
+        f.end_indep()
+        assert_array_equal(f.variables['step'][0], np.arange(size))
+        if executor is not None:
+            executor.shutdown()
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,173 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests pnetcdf.ml.BatchDataset, reading minibatches of samples
+   given by shuffled, duplicate and sorted indices from an image and a label
+   variable. Batches are read directly, prefetched, iterated by iter_batches
+   and prefetching, and read through an IOExecutor when MPI provides thread
+   support level MPI_THREAD_SERIALIZED. The batch returned last must stay
+   valid while the next one is prefetched and read. Each process reads its
+   own batches in independent data mode.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_ml_batch_dataset.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from pnetcdf.ml import BatchDataset
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_ml_batch_dataset.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+# number of samples written by each process, sample shape
+NUM_SAMPLES = 10; ydim = 4; xdim = 3
+
+def images(idx):
+    # the images of samples idx
+    idx = np.asarray(idx).reshape(-1, 1, 1)
+    return (np.arange(ydim * xdim, dtype = 'i4').reshape(ydim, xdim) + 100 * idx).astype('i4')
+
+def labels(idx):
+    return np.asarray(idx, dtype = 'i2') % 10
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('n', NUM_SAMPLES * size)
+        f.def_dim('y', ydim)
+        f.def_dim('x', xdim)
+        f.def_dim('m', NUM_SAMPLES)
+        v = f.def_var('images', pnetcdf.NC_INT, ('n', 'y', 'x'))
+        l = f.def_var('labels', pnetcdf.NC_SHORT, ('n',))
+        f.def_var('other', pnetcdf.NC_INT, ('m',))
+        f.enddef()
+        # each process writes its own range of samples
+        mine = np.arange(NUM_SAMPLES) + NUM_SAMPLES * rank
+        v.put_var_all(images(mine), start = [mine[0], 0, 0], count = [NUM_SAMPLES, ydim, xdim])
+        l.put_var_all(labels(mine), start = [mine[0]], count = [NUM_SAMPLES])
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check(self, batch, idx):
+        idx = np.asarray(idx) % (NUM_SAMPLES * size)
+        self.assertEqual(len(batch), 2)
+        assert_array_equal(batch[0], images(idx))
+        assert_array_equal(batch[1], labels(idx))
+
+    def runTest(self):
+        """testing BatchDataset for CDF-1/CDF-2/CDF-5 file format"""
+        nsamples = NUM_SAMPLES * size
+        rng = np.random.default_rng(rank)
+
+        # the dataset opens and closes the file
+        with BatchDataset(self.file_path, ['images', 'labels'], comm = comm) as ds:
+            self.assertEqual(len(ds), nsamples)
+            image, label = ds[3]
+            assert_array_equal(image, images(3)[0])
+            self.assertEqual(label, labels(3))
+            self.check([a[np.newaxis] for a in ds[-1]], [nsamples - 1])
+            self.assertRaises(IndexError, ds.get_batch, [0, nsamples])
+
+            # shuffled indices with duplicates, sorted distinct indices
+            idx = np.concatenate((rng.permutation(nsamples)[:6], [0, 0]))
+            self.check(ds.get_batch(idx), idx)
+            self.check(ds.get_batch([1, 2, 3, 6]), [1, 2, 3, 6])
+            self.assertEqual(len(ds.get_batch([])[0]), 0)
+
+            # the batch returned last stays valid while the next one is read
+            a = rng.permutation(nsamples)[:5]; b = rng.permutation(nsamples)[:7]
+            first = ds.get_batch(a)
+            ds.prefetch(b)
+            self.check(first, a)
+            second = ds.get_batch(b)
+            self.check(first, a)
+            self.check(second, b)
+
+            # a batch prefetched for other indices is discarded
+            ds.prefetch(a)
+            self.check(ds.get_batch(b), b)
+
+            # minibatches of a permutation, the last one shorter
+            order = rng.permutation(nsamples)
+            batches = list(ds.iter_batches(order, batch_size = 4))
+            self.assertEqual(len(batches), (nsamples + 3) // 4)
+            self.check(batches[-1], order[4 * (len(batches) - 1):])
+            n = 0
+            for batch in ds.iter_batches(order, batch_size = 4, drop_last = True):
+                self.check(batch, order[n:n + 4])
+                n += 4
+            self.assertEqual(n, nsamples - nsamples % 4)
+            self.assertRaises(ValueError, next, ds.iter_batches(order, batch_size = 0))
+        self.assertRaises(RuntimeError, ds.get_batch, [0])
+
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        self.assertRaises(ValueError, BatchDataset, f, ['images', 'other'])
+        self.assertRaises(ValueError, BatchDataset, f, [])
+
+        # samples of a minibatch, transform applied to the images
+        ds = BatchDataset(f, [f.variables['images'], 'labels'], transform = lambda x: x * 2)
+        self.assertTrue(f.indep_mode)
+        idx = rng.permutation(nsamples)[:6]
+        samples = ds.__getitems__(idx)
+        self.assertEqual(len(samples), 6)
+        for i, (image, label) in zip(idx, samples):
+            assert_array_equal(image, images(i)[0] * 2)
+            self.assertEqual(label, labels(i))
+        image, label = ds[idx[0]]
+        assert_array_equal(image, images(idx[0])[0] * 2)
+        ds.close()
+        # a file given by the caller is left open
+        self.assertTrue(f._isopen)
+
+        # batches sampled by a batch sampler, read by the I/O thread
+        if MPI.Query_thread() >= MPI.THREAD_SERIALIZED:
+            executor = pnetcdf.IOExecutor()
+            ds = BatchDataset(f, ['images', 'labels'], executor = executor)
+            sampler = [rng.permutation(nsamples)[:5] for i in range(4)]
+            for idx, batch in zip(sampler, ds.prefetching(sampler)):
+                self.check(batch, idx)
+            ds.prefetch(sampler[0])
+            ds.close()
+            executor.shutdown()
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests pnetcdf.ml.EpochLoader, reading the minibatches of an
+   epoch collectively. The samples read by all processes must cover each
+   permutation exactly once, the permutations must be the same on all
+   processes and differ between epochs, and with option block_size the
+   samples of a block must stay together. The number of samples is not a
+   multiple of the number of samples per step, so the last processes read
+   fewer samples, or none, in the last step. A batch other than the one
+   prefetched must raise a ValueError in collective mode.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_ml_epoch_loader.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from pnetcdf.ml import EpochLoader
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_ml_epoch_loader.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+# number of samples, batch size and block size
+NUM_SAMPLES = 7 * size + 3; BATCH = 2; BLOCK = 4; xdim = 5
+
+def samples(idx):
+    idx = np.asarray(idx).reshape(-1, 1)
+    return (np.arange(xdim, dtype = 'f8') + 10 * idx)
+
+
+class FileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('n', NUM_SAMPLES)
+        f.def_dim('x', xdim)
+        v = f.def_var('samples', pnetcdf.NC_DOUBLE, ('n', 'x'))
+        l = f.def_var('labels', pnetcdf.NC_INT, ('n',))
+        f.enddef()
+        f.begin_indep()
+        if rank == 0:
+            v.put_var(samples(np.arange(NUM_SAMPLES)))
+            l.put_var(np.arange(NUM_SAMPLES, dtype = 'i4'))
+        f.end_indep()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def read_epoch(self, loader):
+        # the labels read by all processes, checking the samples
+        read = []
+        for x, labels in loader:
+            self.assertLessEqual(len(labels), BATCH)
+            assert_array_equal(x, samples(labels))
+            read.extend(labels.tolist())
+        return np.concatenate(comm.allgather(np.array(read, dtype = 'i4')))
+
+    def runTest(self):
+        """testing EpochLoader for CDF-1/CDF-2/CDF-5 file format"""
+        self.assertRaises(ValueError, EpochLoader, self.file_path, ['samples'], 0, comm = comm)
+        loader = EpochLoader(self.file_path, ['samples', 'labels'], BATCH, comm = comm, seed = 7)
+        self.assertFalse(loader.dataset.file.indep_mode)
+        self.assertEqual(len(loader), -(-NUM_SAMPLES // (BATCH * size)))
+
+        # each epoch reads a permutation of all samples, the same on all
+        # processes and different between epochs
+        perms = []
+        for epoch in range(2):
+            loader.set_epoch(epoch)
+            perm = loader.permutation()
+            assert_array_equal(comm.bcast(perm, root = 0), perm)
+            read = self.read_epoch(loader)
+            assert_array_equal(np.sort(read), np.arange(NUM_SAMPLES))
+            perms.append(perm)
+        self.assertFalse(np.array_equal(perms[0], perms[1]))
+        assert_array_equal(loader.permutation(0), perms[0])
+
+        # a batch other than the one prefetched is not read collectively
+        loader.dataset.prefetch([0, 1])
+        self.assertRaises(ValueError, loader.dataset.get_batch, [2, 3])
+        x, labels = loader.dataset.get_batch([2, 3])
+        assert_array_equal(labels, [2, 3])
+
+        # this process reads its slice of each step of a given permutation
+        perm = np.arange(NUM_SAMPLES)[::-1]
+        for s, (x, labels) in enumerate(loader.batches(perm)):
+            first = s * BATCH * size + rank * BATCH
+            assert_array_equal(labels, perm[first:first + BATCH])
+        loader.close()
+
+        # samples shuffled within blocks, the last step dropped
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        f.begin_indep()
+        with EpochLoader(f, ['samples', 'labels'], BATCH, block_size = BLOCK, drop_last = True) as loader:
+            self.assertFalse(f.indep_mode)
+            self.assertEqual(len(loader), NUM_SAMPLES // (BATCH * size))
+            perm = loader.permutation()
+            assert_array_equal(np.sort(perm), np.arange(NUM_SAMPLES))
+            # each block is visited at once
+            blocks = perm // BLOCK
+            self.assertEqual(np.count_nonzero(np.diff(blocks)), -(-NUM_SAMPLES // BLOCK) - 1)
+            read = self.read_epoch(loader)
+            self.assertEqual(len(read), len(loader) * BATCH * size)
+            self.assertEqual(len(np.unique(read)), len(read))
+
+        # no shuffle, reads through an IOExecutor
+        if MPI.Query_thread() >= MPI.THREAD_SERIALIZED:
+            executor = pnetcdf.IOExecutor()
+            loader = EpochLoader(f, ['samples', 'labels'], BATCH, shuffle = False, executor = executor)
+            assert_array_equal(loader.permutation(), np.arange(NUM_SAMPLES))
+            assert_array_equal(np.sort(self.read_epoch(loader)), np.arange(NUM_SAMPLES))
+            loader.close()
+            executor.shutdown()
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(FileTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
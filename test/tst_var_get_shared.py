@@ -0,0 +1,122 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests Variable.get_shared, reading data needed by all
+   processes into the shared memory of each node, read by the first process
+   of each node or by process 0 and broadcast to the other nodes. Entire
+   variables, subarrays with strided and reversed slices, empty selections
+   and scalar variables are read in collective and independent data mode.
+   The arrays returned must be read-only and equal to the data read by the
+   indexer syntax, and are released by free_shared.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_get_shared.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_get_shared.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 5; ydim = 6; zdim = 7
+data = np.arange(xdim * ydim * zdim, dtype = 'f4').reshape(xdim, ydim, zdim)
+
+keys = [Ellipsis,
+        np.s_[1, 2, 3],
+        np.s_[..., 0],
+        np.s_[0, :, 1:6:2],
+        np.s_[::-1, 2, ::-2],
+        np.s_[:, 2:2]]
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', xdim)
+        f.def_dim('y', ydim)
+        f.def_dim('z', zdim)
+        v = f.def_var('data', pnetcdf.NC_FLOAT, ('x', 'y', 'z'))
+        s = f.def_var('scalar', pnetcdf.NC_INT, ())
+        f.enddef()
+        v[:] = data
+        s.put_var_all(np.array(42, dtype = 'i4'))
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing Variable.get_shared for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v = f.variables['data']
+        for broadcast in [False, True]:
+            # collective data mode
+            for key in keys:
+                a = v.get_shared(key, broadcast = broadcast)
+                self.assertFalse(a.flags.writeable)
+                self.assertEqual(a.dtype, v.dtype)
+                assert_array_equal(a, data[key])
+                pnetcdf.free_shared(a)
+            # independent data mode
+            f.begin_indep()
+            a = v.get_shared(np.s_[1:4, ::3], broadcast = broadcast)
+            assert_array_equal(a, data[1:4, ::3])
+            pnetcdf.free_shared(a)
+            f.end_indep()
+
+        # scalar variable
+        a = f.variables['scalar'].get_shared()
+        self.assertEqual(a.shape, ())
+        self.assertEqual(a[()], 42)
+        pnetcdf.free_shared(a)
+
+        # the arrays stay valid after the file is closed
+        a = v.get_shared(np.s_[2])
+        b = v.get_shared(broadcast = True)
+        self.assertRaises(IndexError, v.get_shared, np.s_[[0, 2]])
+        f.close()
+        assert_array_equal(a, data[2])
+        assert_array_equal(b, data)
+        self.assertRaises(ValueError, a.fill, 0)
+        pnetcdf.free_shared(b)
+        pnetcdf.free_shared(a)
+        self.assertRaises(ValueError, pnetcdf.free_shared, a)
+        self.assertRaises(ValueError, pnetcdf.free_shared, data)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests reading and writing variables using indexer operators
+   with basic indices, i.e. integers, slices and Ellipsis. Such indices are
+   converted directly into the arguments of ncmpi_get_vara/vars and
+   ncmpi_put_vara/vars. Slices with negative steps are read and written
+   without temporary copies, using MPI derived datatypes describing the
+   reversed axes of the numpy arrays. Results are compared with the same indexing applied to
+   numpy arrays, in collective and independent data modes. In collective mode,
+   some processes select no data.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_indexer_basic.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_indexer_basic.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 5; ydim = 6; zdim = 7
+data = np.arange(xdim * ydim * zdim, dtype = 'i4').reshape(xdim, ydim, zdim)
+
+keys = [(1, 2, 3),
+        (-1, slice(None), 4),
+        (2,),
+        np.int64(3),
+        (Ellipsis, 0),
+        (0, Ellipsis, slice(1, 6, 2)),
+        (slice(1, 4), slice(None, None, 3)),
+        (slice(None), slice(2, 2), slice(None)),
+        (slice(10, 20),),
+        (slice(None, None, -1),),
+        (1, slice(None, None, -2), slice(5, 1, -1)),
+        (Ellipsis, slice(None, None, -3)),
+        # one-element lists take the general path
+        ([2], slice(None, None, -1), 3),
+        ([0], slice(4, None, -2), slice(None, None, -1))]
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check_var(self, v):
+        for key in keys:
+            ref = data.copy()
+            v[:] = data
+            value = np.asarray(data[key] + 1000)
+            v[key] = value
+            ref[key] = value
+            assert_array_equal(v[:], ref)
+            out = v[key]
+            self.assertEqual(np.shape(out), np.shape(ref[key]))
+            assert_array_equal(out, ref[key])
+
+    def runTest(self):
+        """testing basic indexing for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', xdim)
+        f.def_dim('xu', -1)
+        f.def_dim('y', ydim)
+        f.def_dim('z', zdim)
+        v = f.def_var('data', pnetcdf.NC_INT, ('x', 'y', 'z'))
+        v_u = f.def_var('datau', pnetcdf.NC_INT, ('xu', 'y', 'z'))
+        f.enddef()
+
+        # collective data mode
+        self.check_var(v)
+        self.check_var(v_u)
+
+        # a process reading or writing no data takes part in the collective call
+        n = 1 if rank == 0 else 0
+        v[0, 0, 0:n] = np.zeros(n, 'i4')
+        assert_array_equal(v[0, 0, 0:n], np.zeros(n, 'i4'))
+
+        # integers are checked against the dimension lengths, except for
+        # writes along the unlimited dimension
+        self.assertRaises(IndexError, v.__getitem__, (xdim, 0, 0))
+        self.assertRaises(IndexError, v.__getitem__, (0, -ydim-1, 0))
+
+        # independent data mode
+        f.begin_indep()
+        self.check_var(v)
+        self.check_var(v_u)
+        f.end_indep()
+
+        v_u[xdim, 0, :] = data[0, 0]
+        self.assertEqual(v_u.shape, (xdim + 1, ydim, zdim))
+        assert_array_equal(v_u[-1, 0], data[0, 0])
+        f.close()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
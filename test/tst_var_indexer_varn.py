@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests reading and writing variables using indexer operators
+   with integer sequences and boolean arrays (orthogonal indexing). Such a
+   selection is made of multiple data chunks, which the library internally
+   reads/writes with a single call to ncmpi_get_varn/ncmpi_put_varn (or their
+   collective counterparts). The indices may be unsorted and contain
+   duplicates, in which case the last assigned value is written. Results are
+   compared with the same indexing applied to numpy arrays.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_indexer_varn.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_indexer_varn.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 9; ydim = 10; zdim = 11
+data = np.arange(xdim * ydim * zdim, dtype = 'i4').reshape(xdim, ydim, zdim)
+
+# orthogonal selections, the numpy reference is computed using np.ix_
+xsel = [7, 1, 1, 4]
+ysel = np.array([True, False, True, True, False, False, True, False, False, True])
+zsel = [10, 0, 3, 2, 3]
+keys = [(xsel, slice(None), 2),
+        (slice(1, 6), ysel, zsel),
+        (xsel, 4, zsel),
+        (slice(None, None, 2), slice(None), [0, 5]),
+        (-1, [3, 2], slice(None, None, -3))]
+
+def ref_index(key):
+    idx = []
+    for n, k in zip(data.shape, key):
+        if isinstance(k, slice):
+            idx.append(np.arange(n)[k])
+        elif np.ndim(k) == 0:
+            idx.append([k])
+        else:
+            k = np.asarray(k)
+            idx.append(np.flatnonzero(k) if k.dtype == bool else k.astype(int))
+    return np.ix_(*idx)
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check_var(self, v):
+        for key in keys:
+            ref = data.copy()
+            v[:] = data
+            value = np.random.randint(0, 100, size = v[key].shape).astype('i4')
+            # all processes write the same values
+            comm.Bcast(value, root = 0)
+            v[key] = value
+            ref[ref_index(key)] = value.reshape(ref[ref_index(key)].shape)
+            assert_array_equal(v[:], ref)
+            # duplicated indices hold the last assigned value
+            assert_array_equal(v[key], ref[ref_index(key)].reshape(value.shape))
+
+    def runTest(self):
+        """testing orthogonal indexing with varn for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', xdim)
+        f.def_dim('xu', -1)
+        f.def_dim('y', ydim)
+        f.def_dim('z', zdim)
+        v = f.def_var('data', pnetcdf.NC_INT, ('x', 'y', 'z'))
+        v_u = f.def_var('datau', pnetcdf.NC_INT, ('xu', 'y', 'z'))
+        f.enddef()
+
+        # collective data mode
+        self.check_var(v)
+        self.check_var(v_u)
+
+        # independent data mode
+        f.begin_indep()
+        self.check_var(v)
+        self.check_var(v_u)
+        f.end_indep()
+
+        # duplicated indices in the same selection
+        v[:] = data
+        v[[2, 5, 2], 0, 0] = np.array([100, 200, 300], dtype = 'i4')
+        assert_array_equal(v[[5, 2, 2], 0, 0], [200, 300, 300])
+        f.close()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,156 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests File.set_max_transfer_bytes and the argument
+   max_transfer_bytes of put_var_all, get_var_all, put_var and get_var. Writes
+   and reads of subarrays, strided subarrays and entire variables larger than
+   the limit are split into nonblocking requests, which must leave no pending
+   request behind. Non-contiguous buffers and the indexer syntax are split as
+   well. The data written is read back and checked with and without a limit.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_max_transfer.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_max_transfer.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+zdim = 4; ydim = 6; xdim = 10
+# a limit of less than a row of the variables, in bytes
+LIMIT = 8 * xdim - 8
+
+def block(shift = 0):
+    # data written by this process
+    return np.arange(zdim * ydim * xdim, dtype = 'f8').reshape(zdim, ydim, xdim) + 1000 * rank + shift
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('p', size)
+        f.def_dim('z', zdim)
+        f.def_dim('y', ydim)
+        f.def_dim('x', xdim)
+        f.def_dim('s', 2 * xdim)
+        f.def_var('data', pnetcdf.NC_DOUBLE, ('p', 'z', 'y', 'x'))
+        f.def_var('strided', pnetcdf.NC_DOUBLE, ('p', 'z', 'y', 's'))
+        f.def_var('whole', pnetcdf.NC_INT, ('z', 'y', 'x'))
+        f.enddef()
+
+        self.assertIsNone(f.set_max_transfer_bytes(LIMIT))
+        self.assertRaises(ValueError, f.set_max_transfer_bytes, 0)
+        # a subarray, given as a flat array
+        start = [rank, 0, 0, 0]
+        count = [1, zdim, ydim, xdim]
+        f.variables['data'].put_var_all(block().ravel(), start = start, count = count)
+        self.assertEqual(f.inq_nreqs(), 0)
+        # a strided subarray, from a non-contiguous array
+        buf = np.asfortranarray(block())
+        f.variables['strided'].put_var_all(buf, start = start, count = count, stride = [1, 1, 1, 2])
+        # an entire variable, without splitting
+        v = f.variables['whole']
+        v.put_var_all(np.arange(zdim * ydim * xdim, dtype = 'i4'), max_transfer_bytes = 0)
+        self.assertEqual(f.set_max_transfer_bytes(None), LIMIT)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing splitting transfers larger than max_transfer_bytes for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        v = f.variables['data']
+        start = [rank, 0, 0, 0]
+        count = [1, zdim, ydim, xdim]
+
+        # the data written by the split requests, read without a limit
+        buf = np.empty(count, 'f8')
+        v.get_var_all(buf, start = start, count = count)
+        assert_array_equal(buf[0], block())
+        buf = np.empty(count, 'f8')
+        f.variables['strided'].get_var_all(buf, start = start, count = count, stride = [1, 1, 1, 2])
+        assert_array_equal(buf[0], block())
+
+        # split reads, into a contiguous and a strided array
+        buf = np.empty(count, 'f8')
+        v.get_var_all(buf, start = start, count = count, max_transfer_bytes = LIMIT)
+        assert_array_equal(buf[0], block())
+        out = np.zeros((zdim, ydim, 2 * xdim), 'f8')
+        v.get_var_all(out[:, :, ::2], start = start, count = count, max_transfer_bytes = 8 * xdim)
+        assert_array_equal(out[:, :, ::2], block())
+        assert_array_equal(out[:, :, 1::2], 0)
+        self.assertEqual(f.inq_nreqs(), 0)
+
+        # arrays that cannot be viewed in the shape of the subarray are
+        # staged through contiguous copies
+        buf = np.asfortranarray(block(3).reshape(zdim, ydim, xdim // 2, 2))
+        v.put_var_all(buf, start = start, count = count, max_transfer_bytes = LIMIT)
+        out = np.zeros((zdim, ydim, xdim // 2, 2), 'f8', order = 'F')
+        v.get_var_all(out, start = start, count = count, max_transfer_bytes = LIMIT)
+        assert_array_equal(out.reshape(zdim, ydim, xdim), block(3))
+        self.assertRaises(ValueError, v.get_var_all, np.empty(3), start = start, count = count, max_transfer_bytes = LIMIT)
+
+        # an entire variable
+        f.set_max_transfer_bytes(4 * xdim)
+        whole = np.empty((zdim, ydim, xdim), 'i4')
+        f.variables['whole'].get_var_all(whole)
+        assert_array_equal(whole.ravel(), np.arange(zdim * ydim * xdim))
+
+        # the indexer syntax, with an integer index
+        f.set_max_transfer_bytes(LIMIT)
+        v[rank] = block(1)
+        assert_array_equal(v[rank], block(1))
+        assert_array_equal(v[rank, :, ::-1], block(1)[:, ::-1])
+
+        # independent data mode, only the requests larger than the limit are
+        # split
+        f.begin_indep()
+        v.put_var(block(2)[1:2], start = [rank, 1, 0, 0], count = [1, 1, ydim, xdim])
+        v.put_var(block(2)[0, 0], start = [rank, 0, 0, 0], count = [1, 1, 1, xdim], max_transfer_bytes = 8 * xdim)
+        buf = np.empty((1, 2, ydim, xdim), 'f8')
+        v.get_var(buf, start = [rank, 0, 0, 0], count = [1, 2, ydim, xdim])
+        assert_array_equal(buf[0, 0, 0], block(2)[0, 0])
+        assert_array_equal(buf[0, 1], block(2)[1])
+        f.end_indep()
+        self.assertEqual(f.inq_nreqs(), 0)
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,114 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests writing non-contiguous numpy arrays, i.e. strided
+   slices of larger arrays, transposed and Fortran-ordered arrays, using the
+   indexer syntax, put_var_all, iput_var and bput_var. Such arrays are
+   described to PnetCDF by MPI derived datatypes instead of being copied. The
+   contents of the variables are compared with the same arrays written from
+   C-contiguous copies.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_put_strided.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_put_strided.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 6; ydim = size * 8
+# each process writes its own xdim x 8 block of the variables
+start = [0, rank * 8]
+count = [xdim, 8]
+big = np.arange(4 * xdim * 4 * 8, dtype = 'f8').reshape(4 * xdim, 4 * 8) + rank * 1000
+arrays = [big[::4, 2::4],                         # strided slice
+          big[:8, :xdim].T,                       # transposed
+          np.asfortranarray(big[:xdim, :8]),      # Fortran-ordered
+          big[xdim:0:-1, ::-3][:, :8],            # negative strides
+          np.broadcast_to(big[0, :8], count)]     # zero strides
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing writing non-contiguous arrays for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', xdim)
+        f.def_dim('y', ydim)
+        methods = ['indexer', 'put_var_all', 'put_var', 'iput_var', 'bput_var']
+        for m in methods:
+            for i in range(len(arrays)):
+                f.def_var(f'{m}{i}', pnetcdf.NC_DOUBLE, ('x', 'y'))
+                f.def_var(f'{m}{i}_f4', pnetcdf.NC_FLOAT, ('x', 'y'))
+        f.enddef()
+        f.attach_buff(2 * sum(a.size for a in arrays) * 8)
+
+        req_ids = []
+        sl = (slice(None), slice(start[1], start[1] + count[1]))
+        for i, a in enumerate(arrays):
+            self.assertFalse(a.flags.c_contiguous)
+            for suffix in ['', '_f4']:
+                f.variables[f'indexer{i}{suffix}'][sl] = a
+                f.variables[f'put_var_all{i}{suffix}'].put_var_all(a, start = start, count = count)
+            req_ids.append(f.variables[f'iput_var{i}'].iput_var(a, start = start, count = count))
+            req_ids.append(f.variables[f'bput_var{i}'].bput_var(a, start = start, count = count))
+        f.wait_all(len(req_ids), req_ids, [None] * len(req_ids))
+        f.detach_buff()
+
+        f.begin_indep()
+        for i, a in enumerate(arrays):
+            f.variables[f'put_var{i}'].put_var(a, start = start, count = count)
+        f.end_indep()
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        for i, a in enumerate(arrays):
+            ref = np.ascontiguousarray(a)
+            for m in methods:
+                assert_array_equal(f.variables[f'{m}{i}'][sl], ref)
+            for m in ['indexer', 'put_var_all']:
+                assert_array_equal(f.variables[f'{m}{i}_f4'][sl], ref.astype('f4'))
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
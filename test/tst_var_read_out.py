@@ -0,0 +1,124 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests reading variables into existing numpy arrays using
+   Variable.read_all (collective) and Variable.read (independent). The output
+   arrays are C-contiguous arrays and strided views of larger arrays, and the
+   elements outside of the views must be left unchanged. Invalid output
+   arrays must raise exceptions.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_read_out.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_read_out.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 5; ydim = 6; zdim = 7
+data = np.arange(xdim * ydim * zdim, dtype = 'f8').reshape(xdim, ydim, zdim)
+
+keys = [np.s_[1, 2, 3],
+        np.s_[2],
+        np.s_[..., 0],
+        np.s_[0, :, 1:6:2],
+        np.s_[1:4, ::3],
+        np.s_[::-1, 2, ::-2],
+        np.s_[:, 2:2]]
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', xdim)
+        f.def_dim('y', ydim)
+        f.def_dim('z', zdim)
+        v = f.def_var('data', pnetcdf.NC_DOUBLE, ('x', 'y', 'z'))
+        f.enddef()
+        v[:] = data
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check_read(self, read):
+        for key in keys:
+            ref = np.asarray(data[key])
+            # allocate a new array
+            assert_array_equal(read(key), ref)
+            # C-contiguous array
+            out = np.empty(ref.shape, 'f8')
+            self.assertIs(read(key, out = out), out)
+            assert_array_equal(out, ref)
+            if ref.ndim == 0:
+                continue
+            # strided view of a larger array, reversed along the last axis
+            big = np.full(tuple(2 * n for n in ref.shape), -1.0)
+            view = big[tuple(slice(None, None, 2) for n in ref.shape)]
+            view = view[..., ::-1]
+            read(key, out = view)
+            assert_array_equal(view, ref)
+            self.assertEqual(np.count_nonzero(big == -1), big.size - ref.size)
+            # transposed array
+            if ref.ndim == 2:
+                out = np.empty(ref.shape[::-1], 'f8').T
+                read(key, out = out)
+                assert_array_equal(out, ref)
+
+    def runTest(self):
+        """testing reading into existing arrays for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v = f.variables['data']
+        self.check_read(v.read_all)
+
+        # invalid output arrays
+        self.assertRaises(ValueError, v.read_all, np.s_[0], out = np.empty((ydim, zdim + 1), 'f8'))
+        self.assertRaises(TypeError, v.read_all, np.s_[0], out = np.empty((ydim, zdim), 'S1'))
+        out = np.empty((ydim, zdim), 'f8')
+        out.flags.writeable = False
+        self.assertRaises(ValueError, v.read_all, np.s_[0], out = out)
+        self.assertRaises(IndexError, v.read_all, np.s_[[0, 1]])
+
+        f.begin_indep()
+        self.check_read(v.read)
+        f.end_indep()
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,165 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the Request objects returned by the nonblocking methods
+   of Variable. Write buffers whose references are dropped by the program
+   must be kept alive by the requests until they complete. Requests are
+   completed by File.wait_all given a list of requests, by Request.wait, by
+   File.wait_all with NC_REQ_ALL and by File.cancel, and their status, test()
+   and buffer are checked. Requests must also work with the integer request
+   ID interface of File.wait_all.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_request.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys, gc
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_request.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 100; num_reqs = 10
+
+def row(i):
+    # data written by this process to variable i
+    return np.arange(xdim, dtype = 'i4') + 1000 * i + rank
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        for i in range(num_reqs):
+            f.def_var('data%d' % i, pnetcdf.NC_INT, ('y', 'x'))
+        f.enddef()
+
+        # post write requests without keeping references to the buffers
+        reqs = []
+        for i in range(num_reqs):
+            v = f.variables['data%d' % i]
+            req = v.iput_var(row(i).reshape(1, xdim), start = [rank, 0], count = [1, xdim])
+            self.assertIsInstance(req, pnetcdf.Request)
+            self.assertTrue(req.put)
+            self.assertFalse(req.test())
+            self.assertIsNone(req.status)
+            reqs.append(req)
+        gc.collect()
+        # overwrite freed memory, if any
+        junk = [np.full(xdim, -1, 'i4') for i in range(num_reqs)]
+        self.assertEqual(f.inq_nreqs(), num_reqs)
+        errs = f.wait_all(reqs)
+        self.assertIsInstance(errs, np.ndarray)
+        self.assertEqual(errs.dtype, np.int32)
+        assert_array_equal(errs, [pnetcdf.NC_NOERR] * num_reqs)
+        for req in reqs:
+            self.assertTrue(req.test())
+            self.assertEqual(req.status, pnetcdf.NC_NOERR)
+            self.assertTrue(req == pnetcdf.NC_REQ_NULL)
+            self.assertRaises(TypeError, hash, req)
+        self.assertEqual(f.inq_nreqs(), 0)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing nonblocking request objects for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        variables = [f.variables['data%d' % i] for i in range(num_reqs)]
+
+        # read requests, buffers only referenced by the requests
+        reqs = [v.iget_var(np.empty((1, xdim), 'i4'), start = [rank, 0], count = [1, xdim]) for v in variables]
+        self.assertFalse(reqs[0].put)
+        # complete a single request
+        self.assertEqual(reqs[0].wait(), pnetcdf.NC_NOERR)
+        self.assertTrue(reqs[0].test())
+        self.assertFalse(reqs[1].test())
+        # the remaining requests, and the completed one again
+        errs = f.wait_all(reqs)
+        assert_array_equal(errs, [pnetcdf.NC_NOERR] * num_reqs)
+        for i, req in enumerate(reqs):
+            assert_array_equal(req.buffer[0], row(i))
+
+        # integer request ID interface
+        bufs = [np.empty((1, xdim), 'i4') for v in variables]
+        reqs = [v.iget_var(buf, start = [rank, 0], count = [1, xdim]) for v, buf in zip(variables, bufs)]
+        req_ids = [int(req) for req in reqs]
+        req_errs = [None] * num_reqs
+        f.wait_all(num_reqs, req_ids, req_errs)
+        self.assertEqual(req_errs, [pnetcdf.NC_NOERR] * num_reqs)
+        self.assertEqual(req_ids, [pnetcdf.NC_REQ_NULL] * num_reqs)
+        for i, req in enumerate(reqs):
+            self.assertEqual(req.status, pnetcdf.NC_NOERR)
+            assert_array_equal(bufs[i][0], row(i))
+
+        # requests mixed with integer IDs in a list
+        reqs = [v.iget_var(np.empty((1, xdim), 'i4'), start = [rank, 0], count = [1, xdim]) for v in variables]
+        mixed = [req if i % 2 else int(req) for i, req in enumerate(reqs)]
+        f.wait_all(num_reqs, mixed, [None] * num_reqs)
+        for i, req in enumerate(reqs):
+            self.assertTrue(req.test())
+            self.assertTrue(mixed[i] == pnetcdf.NC_REQ_NULL)
+
+        # completed by NC_REQ_ALL
+        reqs = [v.iput_var(row(i).reshape(1, xdim), start = [rank, 0], count = [1, xdim]) for i, v in enumerate(variables)]
+        self.assertIsNone(f.wait_all())
+        for req in reqs:
+            self.assertEqual(req.status, pnetcdf.NC_NOERR)
+
+        # buffered write requests do not keep their buffers
+        f.attach_buff(num_reqs * xdim * 4)
+        reqs = [v.bput_var(row(i).reshape(1, xdim), start = [rank, 0], count = [1, xdim]) for i, v in enumerate(variables)]
+        self.assertIsNone(reqs[0].buffer)
+        f.wait_all(reqs)
+        f.detach_buff()
+
+        # cancelled requests
+        reqs = [v.iget_var(np.empty((1, xdim), 'i4'), start = [rank, 0], count = [1, xdim]) for v in variables]
+        f.cancel(reqs)
+        for req in reqs:
+            self.assertTrue(req.test())
+        self.assertEqual(f.inq_nreqs(), 0)
+
+        # processes with no requests take part in wait_all
+        reqs = [variables[0].iget_var(np.empty((1, xdim), 'i4'), start = [rank, 0], count = [1, xdim])] if rank == 0 else []
+        self.assertEqual(len(f.wait_all(reqs)), len(reqs))
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
@@ -0,0 +1,103 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the shape of record and fixed-size variables. The
+   dimension lengths are cached by `Variable` instances, while the number of
+   records is refreshed after the operations that may change it, i.e. writes,
+   wait/wait_all, sync and enddef. The shape is checked after writing records
+   in collective and independent data modes, and with nonblocking requests.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_shape.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_shape.nc"
+xdim = 9; ydim = 10
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+data = np.arange(ydim, dtype = 'i4')
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+
+    def runTest(self):
+        """testing variable shape for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        dim_t = f.def_dim('t', -1)
+        dim_x = f.def_dim('x', xdim)
+        dim_y = f.def_dim('y', ydim)
+        v_rec = f.def_var('rec', pnetcdf.NC_INT, (dim_t, dim_y))
+        v_fix = f.def_var('fix', pnetcdf.NC_INT, (dim_x, dim_y))
+        self.assertTrue(dim_t.isunlimited())
+        self.assertFalse(dim_x.isunlimited())
+        self.assertEqual(v_rec.shape, (0, ydim))
+        self.assertEqual(v_fix.shape, (xdim, ydim))
+        f.enddef()
+
+        # collective write of 2 records
+        v_rec[0:2] = np.stack((data, data))
+        self.assertEqual(v_rec.shape, (2, ydim))
+        self.assertEqual(len(dim_t), 2)
+
+        # independent write of 1 more record by all processes
+        f.begin_indep()
+        v_rec[2] = data
+        self.assertEqual(v_rec.shape, (3, ydim))
+        f.end_indep()
+        self.assertEqual(v_rec.shape, (3, ydim))
+
+        # nonblocking write, number of records changes after wait_all
+        req_id = v_rec.iput_var(data, start = [4, 0], count = [1, ydim])
+        f.wait_all(1, [req_id], [None])
+        self.assertEqual(v_rec.shape, (5, ydim))
+        self.assertEqual(v_fix.shape, (xdim, ydim))
+        f.close()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+        # reopen the file and check the shape and contents
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v_rec = f.variables['rec']
+        self.assertEqual(v_rec.shape, (5, ydim))
+        self.assertEqual(v_rec.dimensions, ('t', 'y'))
+        assert_array_equal(v_rec[4], data)
+        self.assertEqual(f.variables['fix'].shape, (xdim, ydim))
+        f.close()
+
+    def tearDown(self):
+        # remove the temporary files
+        comm.Barrier()
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
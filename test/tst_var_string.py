@@ -51,6 +51,8 @@ for nrec in range(nrecs):
         data[nrec,n] = generateString(nchar)
 datau = data.astype('U').copy()
 datac = stringtochar(data, encoding='ascii')
+# non-ASCII strings, encoded in UTF-8 into at most nchar bytes
+datan = np.array([['\u00e9t\u00e9 %d' % (nrec * n2 + n) for n in range(n2)] for nrec in range(nrecs)], 'U'+repr(nchar))
 
 class VariablesTestCase(unittest.TestCase):
 
@@ -70,11 +72,13 @@ class VariablesTestCase(unittest.TestCase):
         v1 = f.def_var('string1', pnetcdf.NC_CHAR, ('n1','n2','nchar'))
         v2 = f.def_var('string2', pnetcdf.NC_CHAR, ('n1','n2','nchar'))
         v3 = f.def_var('string3', pnetcdf.NC_CHAR, ('n1','n2','nchar'))
+        v4 = f.def_var('string4', pnetcdf.NC_CHAR, ('n1','n2','nchar'))
         # if _Encoding set, string array should automatically be converted to a char array
         f.set_fill(pnetcdf.NC_FILL)
 
         v2._Encoding = 'ascii'
         v3._Encoding = 'ascii'
+        v4._Encoding = 'utf-8'
 
         f.enddef()
         for nrec in range(nrecs):
@@ -87,6 +91,7 @@ class VariablesTestCase(unittest.TestCase):
         v2[-1,-1] = data[-1,-1].tobytes() # write single python string
         # _Encoding should be ignored if an array of characters is specified
         v3[:] = stringtochar(data, encoding='ascii')
+        v4[0:nrecs] = datan
         f.close()
 
         # Validate the created data file using ncvalidator tool
@@ -120,6 +125,11 @@ class VariablesTestCase(unittest.TestCase):
         assert_array_equal(data2,datau)
         data3 = v3[:]
         assert_array_equal(data3,datau)
+        assert_array_equal(f.variables['string4'][:], datan)
+        # the characters of byte strings are not copied
+        assert(np.shares_memory(datac, data))
+        assert_array_equal(chartostring(datac, encoding='bytes'), data)
+        assert_array_equal(chartostring(stringtochar(datan), encoding='utf-8'), datan)
         # these slices should return a char array, not a string array
         data4 = v2[:,:,0]
         assert(data4.dtype.itemsize == 1)
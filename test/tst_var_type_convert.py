@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests writing and reading numpy arrays whose data type differs
+   from the variable's data type, which are converted by PnetCDF during the
+   transfer. Arrays are written with the indexer syntax, put_var_all and
+   iput_var, and read with read_all, get_var_all and iget_var. Writing values
+   out of the range of the variable's data type must raise NC_ERANGE, and
+   arrays of data types that cannot be converted must raise TypeError.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_type_convert.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_type_convert.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+ydim = 10
+# each process writes its own row of every variable
+data = np.arange(ydim, dtype = 'f8') + 10 * (rank % 10)
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', size)
+        f.def_dim('y', ydim)
+        f.def_var('float', pnetcdf.NC_FLOAT, ('x', 'y'))
+        f.def_var('short', pnetcdf.NC_SHORT, ('x', 'y'))
+        f.def_var('double', pnetcdf.NC_DOUBLE, ('x', 'y'))
+        f.def_var('byte', pnetcdf.NC_BYTE, ('x', 'y'))
+        f.enddef()
+        # float64 array into an NC_FLOAT variable, using the indexer
+        f.variables['float'][rank, :] = data
+        # int64 array into an NC_SHORT variable, using put_var_all
+        f.variables['short'].put_var_all(data.astype('i8').reshape(1, ydim), start = [rank, 0], count = [1, ydim])
+        # strided int32 array into an NC_DOUBLE variable, using iput_var
+        buf = np.repeat(data.astype('i4'), 2)[::2]
+        f.variables['double'].iput_var(buf.reshape(1, ydim), start = [rank, 0], count = [1, ydim])
+        f.wait_all()
+        # int16 array into an NC_BYTE variable
+        f.variables['byte'][rank] = data.astype('i2')
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing type conversion of put and get for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        for name in ['float', 'short', 'double', 'byte']:
+            v = f.variables[name]
+            ref = data.astype(v.dtype)
+            # read with the variable's data type
+            assert_array_equal(v[rank], ref)
+            # read into arrays of another data type
+            out = np.empty(ydim, 'f8')
+            v.read_all(np.s_[rank], out = out)
+            assert_array_equal(out, ref)
+            out = np.zeros((ydim, 2), 'i8')[:, 0]
+            v.read_all(np.s_[rank, :], out = out)
+            assert_array_equal(out, ref)
+            out = np.empty((1, ydim), 'f4')
+            v.get_var_all(out, start = [rank, 0], count = [1, ydim])
+            assert_array_equal(out[0], ref)
+            out = np.empty((1, ydim), 'u2')
+            v.iget_var(out, start = [rank, 0], count = [1, ydim])
+            f.wait_all()
+            assert_array_equal(out[0], ref)
+        # out arrays which cannot be converted
+        v = f.variables['float']
+        self.assertRaises(TypeError, v.read_all, np.s_[rank], out = np.empty(ydim, 'S1'))
+        self.assertRaises(TypeError, v.get_var_all, np.empty((1, ydim), '>f8'), start = [rank, 0], count = [1, ydim])
+        f.close()
+
+        # values out of the range of NC_BYTE
+        f = pnetcdf.File(filename=self.file_path, mode = 'a', comm=comm, info=None)
+        v = f.variables['byte']
+        self.assertRaises(RuntimeError, v.__setitem__, (rank, slice(None)), np.full(ydim, 300, 'i4'))
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
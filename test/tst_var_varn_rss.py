@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests the marshalling of the starts and counts arguments of
+   the varn methods with many subarray requests. Each process writes and
+   reads NUM_REQS single elements of a variable with put_varn_all,
+   get_varn_all, iput_varn, iget_varn and bput_varn, repeatedly. The resident
+   memory of the process must not grow over the repeated calls. starts and
+   counts given as int64 arrays, lists and counts=None must give the same
+   results.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_varn_rss.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_varn_rss.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+NUM_REQS = 100000 # number of subarray requests per process
+NUM_CALLS = 20    # number of calls of each method
+MAX_GROWTH = 4    # allowed growth of the resident memory in MiB
+
+ydim = 2 * NUM_REQS
+# each process accesses every other element of its own row
+starts = np.zeros((NUM_REQS, 2), np.int64)
+starts[:, 0] = rank
+starts[:, 1] = np.arange(0, ydim, 2)
+counts = np.ones((NUM_REQS, 2), np.int64)
+data = np.arange(NUM_REQS, dtype = 'i4') + rank
+
+def resident_mib():
+    # current resident set size of this process, or None if not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576.0
+    except (OSError, ValueError):
+        return None
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('x', size)
+        f.def_dim('y', ydim)
+        f.def_var('var', pnetcdf.NC_INT, ('x', 'y'))
+        f.enddef()
+        f.close()
+        comm.Barrier()
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def check_rss(self, func):
+        # call func repeatedly and check the resident memory stays flat
+        func()
+        before = resident_mib()
+        for i in range(NUM_CALLS):
+            func()
+        after = resident_mib()
+        if before is not None:
+            self.assertLess(after - before, MAX_GROWTH)
+
+    def runTest(self):
+        """testing varn marshalling for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r+', comm=comm, info=None)
+        v = f.variables['var']
+        buf = np.empty(NUM_REQS, 'i4')
+
+        def put_get():
+            v.put_varn_all(data, NUM_REQS, starts, counts)
+            buf.fill(-1)
+            v.get_varn_all(buf, NUM_REQS, starts, counts)
+            assert_array_equal(buf, data)
+        self.check_rss(put_get)
+
+        def nonblocking():
+            v.iput_varn(data, NUM_REQS, starts, counts)
+            f.wait_all()
+            buf.fill(-1)
+            v.iget_varn(buf, NUM_REQS, starts, counts)
+            f.wait_all()
+            assert_array_equal(buf, data)
+        self.check_rss(nonblocking)
+
+        f.attach_buff(data.nbytes)
+        def buffered():
+            v.bput_varn(data, NUM_REQS, starts, counts)
+            f.wait_all()
+        self.check_rss(buffered)
+        f.detach_buff()
+
+        # counts=None selects a single element per request
+        v.put_varn_all(data + 1, NUM_REQS, starts)
+        buf.fill(-1)
+        v.get_varn_all(buf, NUM_REQS, starts)
+        assert_array_equal(buf, data + 1)
+
+        # starts and counts given as lists, and fewer requests than rows
+        num = 10
+        v.get_varn_all(buf[:num], num, starts.tolist(), counts.tolist())
+        assert_array_equal(buf[:num], data[:num] + 1)
+
+        # starts of a wrong shape
+        self.assertRaises(ValueError, v.get_varn_all, buf, NUM_REQS, starts[:, :1], counts)
+        self.assertRaises(ValueError, v.get_varn_all, buf, NUM_REQS + 1, starts, counts)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)
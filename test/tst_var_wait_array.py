@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2024, Northwestern University and Argonne National Laboratory
+# See COPYRIGHT notice in top-level directory.
+#
+
+"""
+   This program tests File.wait_all, File.wait and File.cancel given the
+   request IDs as numpy int32 arrays. Writable contiguous arrays are updated
+   in place with NC_REQ_NULL, read-only arrays are left unchanged, error codes
+   are written into a given int32 status array, and the Request objects of
+   the completed requests are updated. Requests posted with track=False
+   return their integer IDs, and File.inq_pending_ids returns the IDs of all
+   the pending requests. Option failed_only returns the indices of the
+   failed requests.
+
+   To run the test, execute the following
+    `mpiexec -n [num_process] python3 tst_var_wait_array.py [test_file_output_dir](optional)`
+
+"""
+import pnetcdf
+from numpy.testing import assert_array_equal
+import unittest, os, sys
+import numpy as np
+from mpi4py import MPI
+from utils import validate_nc_file
+import io
+
+file_formats = ['NC_64BIT_DATA', 'NC_64BIT_OFFSET', None]
+file_name = "tst_var_wait_array.nc"
+
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+xdim = 1000
+
+def row():
+    # data written by this process
+    return np.arange(xdim, dtype = 'i4') + 10000 * rank
+
+
+class VariablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if (len(sys.argv) == 2) and os.path.isdir(sys.argv[1]):
+            self.file_path = os.path.join(sys.argv[1], file_name)
+        else:
+            self.file_path = file_name
+        self._file_format = file_formats.pop(0)
+        f = pnetcdf.File(filename=self.file_path, mode = 'w', format=self._file_format, comm=comm, info=None)
+        f.def_dim('y', size)
+        f.def_dim('x', xdim)
+        v = f.def_var('data', pnetcdf.NC_INT, ('y', 'x'))
+        f.enddef()
+
+        # one write request per element, waited for by an array of IDs
+        data = row()
+        for i in range(xdim):
+            req = v.iput_var(data[i:i+1], start = [rank, i], count = [1, 1], track = False)
+            self.assertIsInstance(req, int)
+        ids = f.inq_pending_ids()
+        self.assertEqual(ids.dtype, np.int32)
+        self.assertEqual(len(ids), xdim)
+        errs = f.wait_all(ids)
+        self.assertEqual(errs.dtype, np.int32)
+        assert_array_equal(errs, np.zeros(xdim))
+        assert_array_equal(ids, np.full(xdim, pnetcdf.NC_REQ_NULL))
+        self.assertEqual(len(f.inq_pending_ids()), 0)
+        self.assertEqual(f.inq_nreqs(), 0)
+        f.close()
+        comm.Barrier()
+        assert validate_nc_file(os.environ.get('PNETCDF_DIR'), self.file_path) == 0 if os.environ.get('PNETCDF_DIR') is not None else True
+
+    def tearDown(self):
+        # Wait for all processes to finish testing (in multiprocessing mode)
+        comm.Barrier()
+        # Remove testing file
+        if (rank == 0) and not((len(sys.argv) == 2) and os.path.isdir(sys.argv[1])):
+            os.remove(self.file_path)
+
+    def runTest(self):
+        """testing wait and cancel with request ID arrays for CDF-1/CDF-2/CDF-5 file format"""
+        f = pnetcdf.File(filename=self.file_path, mode = 'r', comm=comm, info=None)
+        v = f.variables['data']
+        buf = np.empty(xdim, 'i4')
+
+        # given status array, number of requests smaller than the array
+        ids = np.full(xdim + 1, pnetcdf.NC_REQ_NULL, dtype = np.int32)
+        for i in range(xdim):
+            ids[i] = v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1], track = False)
+        status = np.full(xdim, -1, dtype = np.int32)
+        errs = f.wait_all(xdim, ids, status)
+        assert_array_equal(status, np.zeros(xdim))
+        assert_array_equal(errs, status)
+        assert_array_equal(buf, row())
+        self.assertEqual(f.inq_nreqs(), 0)
+
+        # read-only array of IDs, left unchanged, and the Request objects
+        # among them updated
+        reqs = [v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1]) for i in range(5)]
+        for i in range(5, 10):
+            v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1], track = False)
+        ids = f.inq_pending_ids()
+        assert_array_equal(ids[:5], [req.id for req in reqs])
+        ids.flags.writeable = False
+        self.assertEqual(len(f.wait_all(ids, failed_only = True)), 0)
+        self.assertTrue(all(req.test() for req in reqs))
+        self.assertNotEqual(ids[0], pnetcdf.NC_REQ_NULL)
+
+        # IDs of another integer type, status list, independent data mode
+        f.begin_indep()
+        for i in range(10):
+            v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1], track = False)
+        ids = f.inq_pending_ids().astype(np.int64)
+        status = [None] * 10
+        f.wait(ids, status = status)
+        self.assertEqual(status, [pnetcdf.NC_NOERR] * 10)
+        f.end_indep()
+
+        # cancelled requests
+        reqs = [v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1]) for i in range(5)]
+        for i in range(5, 10):
+            v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1], track = False)
+        f.cancel(f.inq_pending_ids())
+        self.assertTrue(all(req.test() for req in reqs))
+        self.assertEqual(len(f.inq_pending_ids()), 0)
+        self.assertEqual(f.inq_nreqs(), 0)
+
+        # requests posted with track=False completed by NC_REQ_ALL
+        for i in range(10):
+            v.iget_var(buf[i:i+1], start = [rank, i], count = [1, 1], track = False)
+        f.wait_all()
+        self.assertEqual(len(f.inq_pending_ids()), 0)
+        assert_array_equal(buf[:10], row()[:10])
+
+        # processes with no requests take part in wait_all
+        self.assertEqual(len(f.wait_all(np.empty(0, np.int32))), 0)
+        self.assertRaises(ValueError, f.wait_all, 2, np.zeros(1, np.int32))
+        f.close()
+
+
+if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    for i in range(len(file_formats)):
+        suite.addTest(VariablesTestCase())
+    runner = unittest.TextTestRunner()
+    output = io.StringIO()
+    runner = unittest.TextTestRunner(stream=output)
+    result = runner.run(suite)
+    if not result.wasSuccessful():
+        print(output.getvalue())
+        sys.exit(1)